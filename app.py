@@ -5,12 +5,18 @@ E-Ticaret Simülatörü - Ana Uygulama Modülü
 Flask uygulama fabrikası ve yapılandırması
 """
 
+import time
+_import_started = time.perf_counter()
+
 import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from dotenv import load_dotenv
 
+# Çerçeve modüllerinin içe aktarılma süresi (başlangıç raporu için)
+IMPORT_MS = (time.perf_counter() - _import_started) * 1000
+
 # Veritabanı nesnesi
 db = SQLAlchemy()
 # Giriş yöneticisi
@@ -18,6 +24,102 @@ login_manager = LoginManager()
 
 def create_app():
     """Flask uygulaması oluşturur ve yapılandırır"""
+    from utils.startup import StartupTimer
+    timer = StartupTimer(IMPORT_MS)
+    
+    with timer.phase('yapılandırma'):
+        app = _configure_app()
+    app.extensions['startup_timer'] = timer
+    
+    # Uzantıları başlat
+    with timer.phase('uzantılar'):
+        db.init_app(app)
+        login_manager.init_app(app)
+        login_manager.login_view = 'auth.giris'  # type: ignore
+        login_manager.login_message = 'Bu sayfaya erişmek için lütfen giriş yapın.'
+        login_manager.login_message_category = 'info'
+        
+        # Kullanıcı yükleyici
+        from models.user import User
+        
+        @login_manager.user_loader
+        def load_user(user_id):
+            return User.query.get(int(user_id))
+        
+        # Ürün resmi işleme hattı
+        from utils.images import init_images
+        init_images(app)
+        
+        # Şifre özetleri için süreç havuzu ve hatalı giriş önbelleği
+        from utils.passwords import init_passwords
+        init_passwords(app)
+        
+        # Sipariş sonrası işler için kalıcı arka plan iş kuyruğu
+        from utils.jobs import init_jobs
+        init_jobs(app)
+    
+    # Blueprint'leri kaydet (rotalar, formlar ve modeller burada içe aktarılır)
+    with timer.phase('blueprintler'):
+        from routes.main import main_bp
+        from routes.auth import auth_bp
+        from routes.products import products_bp
+        from routes.cart import cart_bp
+        from routes.admin import admin_bp
+        
+        app.register_blueprint(main_bp)
+        app.register_blueprint(auth_bp, url_prefix='/auth')
+        app.register_blueprint(products_bp, url_prefix='/urunler')
+        app.register_blueprint(cart_bp, url_prefix='/sepet')
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        
+        # Liste filtreleri için şablon yardımcısı
+        from utils.facets import init_facets
+        init_facets(app)
+    
+    # Komut satırı komutları
+    with timer.phase('komutlar'):
+        from utils.startup import init_db_command, seed_command, startup_report_command
+        from utils.ratings import rebuild_ratings_command
+        from utils.dashboard import reconcile_stats_command
+        from utils.sample_data import generate_data_command
+        from utils.jobs import run_jobs_command
+        from utils.product_import import import_products_command
+        for command in (init_db_command, seed_command, startup_report_command,
+                        rebuild_ratings_command, reconcile_stats_command, generate_data_command,
+                        run_jobs_command, import_products_command):
+            app.cli.add_command(command)
+    
+    with app.app_context():
+        from utils.database import apply_profile
+        apply_profile(db.engine, app.config['DATABASE_PROFILE'])
+        
+        # SQL profili açıksa sorgu olaylarını bağla
+        from utils.profiler import init_profiler
+        init_profiler(app, db.engine)
+        
+        # Şema, indeksler, türetilmiş veriler ve başlangıç verisi; veritabanı
+        # güncel şemayla kurulmuşsa atlanır, sunucu kipinde hiç çalışmaz
+        if app.config['DATABASE_AUTO_INIT']:
+            with timer.phase('veritabanı'):
+                from utils.startup import init_database
+                init_database()
+        
+        # Katalog önbelleğini yapılandır
+        with timer.phase('önbellek'):
+            from utils.cache import init_cache
+            init_cache(app)
+            
+            # Arama önerisi indeksi (sunucu kipinde ilk öneri isteğinde kurulur)
+            from utils.suggest import init_suggestions
+            init_suggestions(app, build=app.config['DATABASE_AUTO_INIT'])
+    
+    if os.environ.get('STARTUP_TIMING'):
+        app.logger.warning('Başlangıç süreleri: %s', timer.as_dict())
+    
+    return app
+
+def _configure_app():
+    """Ortam değişkenlerinden yapılandırılmış Flask uygulamasını döndürür"""
     
     # .env dosyasını yükle
     load_dotenv()
@@ -31,39 +133,75 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['WTF_CSRF_ENABLED'] = True
     
-    # Uzantıları başlat
-    db.init_app(app)
-    login_manager.init_app(app)
-    login_manager.login_view = 'auth.giris'  # type: ignore
-    login_manager.login_message = 'Bu sayfaya erişmek için lütfen giriş yapın.'
-    login_manager.login_message_category = 'info'
-    
-    # Kullanıcı yükleyici
-    from models.user import User
-    
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
-    
-    # Blueprint'leri kaydet
-    from routes.main import main_bp
-    from routes.auth import auth_bp
-    from routes.products import products_bp
-    from routes.cart import cart_bp
-    from routes.admin import admin_bp
-    
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(products_bp, url_prefix='/urunler')
-    app.register_blueprint(cart_bp, url_prefix='/sepet')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    
-    # Veritabanı tablolarını oluştur
-    with app.app_context():
-        db.create_all()
-        
-        # Örnek veriler ekle
-        from utils.sample_data import create_sample_data
-        create_sample_data()
+    # Veritabanı motoru profili (default / production) ve havuz boyutları
+    from utils.database import engine_options
+    app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'default')
+    app.config['DATABASE_POOL_SIZE'] = int(os.environ.get('DATABASE_POOL_SIZE', 16))
+    app.config['DATABASE_MAX_OVERFLOW'] = int(os.environ.get('DATABASE_MAX_OVERFLOW', 16))
+    app.config['DATABASE_POOL_TIMEOUT'] = int(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    
+    # 0 ise (sunucu kipi) create_app veritabanına dokunmaz; şema `flask init-db` ile kurulur
+    app.config['DATABASE_AUTO_INIT'] = os.environ.get('DATABASE_AUTO_INIT', '1') != '0'
+    
+    # Katalog önbelleği boyutları
+    app.config['CATALOG_CACHE_SIZE'] = int(os.environ.get('CATALOG_CACHE_SIZE', 256))
+    app.config['CATALOG_CACHE_TTL'] = int(os.environ.get('CATALOG_CACHE_TTL', 300))
+    app.config['PRODUCT_CARD_CACHE_SIZE'] = int(os.environ.get('PRODUCT_CARD_CACHE_SIZE', 5000))
+    app.config['PRODUCT_CARD_CACHE_TTL'] = int(os.environ.get('PRODUCT_CARD_CACHE_TTL', 600))
+    app.config['COUNT_CACHE_SIZE'] = int(os.environ.get('COUNT_CACHE_SIZE', 1024))
+    app.config['COUNT_CACHE_TTL'] = int(os.environ.get('COUNT_CACHE_TTL', 60))
+    app.config['CARD_FRAGMENT_CACHE_SIZE'] = int(os.environ.get('CARD_FRAGMENT_CACHE_SIZE', 5000))
+    app.config['CARD_FRAGMENT_CACHE_TTL'] = int(os.environ.get('CARD_FRAGMENT_CACHE_TTL', 600))
+    
+    # Anonim ürün sayfalarının paylaşılan önbelleklerde yeniden doğrulamasız tutulma süresi (sn)
+    app.config['HTTP_CACHE_MAX_AGE'] = int(os.environ.get('HTTP_CACHE_MAX_AGE', 0))
+    
+    # Arama önerisi indeksinin bellek bütçesi (MB); dolunca daha az popüler ürünler indekslenmez
+    app.config['SUGGEST_MEMORY_MB'] = int(os.environ.get('SUGGEST_MEMORY_MB', 64))
+    
+    # Süreç başına bir seferde ayrılan sipariş numarası sayısı
+    app.config['ORDER_NUMBER_BLOCK_SIZE'] = int(os.environ.get('ORDER_NUMBER_BLOCK_SIZE', 100))
+    
+    # İstek başına SQL profili (isteğe bağlı): saklanan istek sayısı ve N+1 eşiği
+    app.config['SQL_PROFILER'] = os.environ.get('SQL_PROFILER', '0') == '1'
+    app.config['SQL_PROFILER_HISTORY'] = int(os.environ.get('SQL_PROFILER_HISTORY', 200))
+    app.config['SQL_PROFILER_N_PLUS_ONE'] = int(os.environ.get('SQL_PROFILER_N_PLUS_ONE', 5))
+    
+    # Ürün resmi yüklemeleri: varyant klasörü, URL öneki ve arka plan iş parçacığı sayısı (0: istek içinde)
+    app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', os.path.join(app.root_path, 'static', 'uploads'))
+    app.config['UPLOAD_URL_PREFIX'] = os.environ.get('UPLOAD_URL_PREFIX', '/static/uploads')
+    app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+    
+    # Arka plan işleri: süreç içi çalışan sayısı (0: yalnızca `flask run-jobs`), boşta bekleme
+    # aralığı (sn), deneme hakkı, yeniden deneme beklemesi ve üst sınırı (sn), kilit süresi (sn)
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+    app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    app.config['JOB_RETRY_DELAY'] = float(os.environ.get('JOB_RETRY_DELAY', 5))
+    app.config['JOB_RETRY_MAX_DELAY'] = float(os.environ.get('JOB_RETRY_MAX_DELAY', 600))
+    app.config['JOB_LEASE_SECONDS'] = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+    
+    # Dışa aktarımda tek bağlantıda okunan kayıt sayısı (bellek kullanımını sınırlar)
+    app.config['EXPORT_CHUNK_SIZE'] = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    
+    # Toplu ürün içe aktarımı: yükleme klasörü, işlem başına satır sayısı ve istek içinde
+    # içe aktarılan en büyük dosya (bayt; daha büyükleri arka plan işine verilir)
+    app.config['IMPORT_FOLDER'] = os.environ.get('IMPORT_FOLDER', os.path.join(app.instance_path, 'imports'))
+    app.config['IMPORT_BATCH_SIZE'] = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    app.config['IMPORT_INLINE_MAX_BYTES'] = int(os.environ.get('IMPORT_INLINE_MAX_BYTES', 1024 * 1024))
+    
+    # Şifre özetleri: algoritma (pbkdf2/bcrypt), maliyet (boş: algoritmanın varsayılanı), süreç
+    # havuzu boyutu (0: istek içinde), havuz kuyruğu ve kuyrukta en fazla bekleme (sn)
+    app.config['PASSWORD_ALGORITHM'] = os.environ.get('PASSWORD_ALGORITHM', 'pbkdf2')
+    app.config['PASSWORD_COST'] = int(os.environ.get('PASSWORD_COST', 0)) or None
+    app.config['PASSWORD_WORKERS'] = int(os.environ.get('PASSWORD_WORKERS', 2))
+    app.config['PASSWORD_QUEUE_SIZE'] = int(os.environ.get('PASSWORD_QUEUE_SIZE', 32))
+    app.config['PASSWORD_QUEUE_TIMEOUT'] = float(os.environ.get('PASSWORD_QUEUE_TIMEOUT', 5))
+    
+    # Hatalı giriş sınırları: pencere (sn) içinde kullanıcı adı ve istemci adresi başına deneme
+    app.config['LOGIN_MAX_FAILURES'] = int(os.environ.get('LOGIN_MAX_FAILURES', 5))
+    app.config['LOGIN_MAX_FAILURES_PER_ADDRESS'] = int(os.environ.get('LOGIN_MAX_FAILURES_PER_ADDRESS', 50))
+    app.config['LOGIN_FAILURE_WINDOW'] = int(os.environ.get('LOGIN_FAILURE_WINDOW', 300))
     
     return app
\ No newline at end of file
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yük Testi ve Gecikme Ölçümü
+Gezinme, arama, ürün detayı, sepet, ödeme ve admin listeleme akışlarını
+eşzamanlı sanal kullanıcılarla çalıştırır; sonuçları JSON olarak raporlar
+
+Örnekler:
+    python benchmark.py --products 5000 --users 200 --vus 8 --iterations 20 --out sonuc.json
+    python benchmark.py --baseline temel.json --out sonuc.json
+    python benchmark.py --database sqlite:///instance/eticaret.db --url http://localhost:5000 --no-seed
+    python benchmark.py --allocator --workers 8 --per-worker 20000 --block-size 100
+    python benchmark.py --contention --workers 8 --iterations 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='E-Ticaret Simülatörü yük testi')
+    parser.add_argument('--database', help='Veritabanı URL\'si (varsayılan: geçici SQLite dosyası)')
+    parser.add_argument('--url', help='Çalışan sunucu adresi; verilmezse istekler süreç içinde gönderilir')
+    parser.add_argument('--products', type=int, default=2000, help='Eklenecek ürün sayısı')
+    parser.add_argument('--users', type=int, default=100, help='Eklenecek kullanıcı sayısı')
+    parser.add_argument('--reviews', type=int, default=5000, help='Eklenecek yorum sayısı')
+    parser.add_argument('--orders', type=int, default=2000, help='Eklenecek geçmiş sipariş sayısı')
+    parser.add_argument('--no-seed', action='store_true', help='Veri ekleme, mevcut veriyi kullan')
+    parser.add_argument('--vus', type=int, default=4, help='Eşzamanlı sanal müşteri sayısı')
+    parser.add_argument('--admin-vus', type=int, default=1, help='Eşzamanlı sanal admin sayısı')
+    parser.add_argument('--iterations', type=int, default=10, help='Sanal kullanıcı başına akış tekrarı')
+    parser.add_argument('--seed', type=int, default=42, help='Rastgelelik tohumu')
+    parser.add_argument('--out', help='JSON raporunun yazılacağı dosya (varsayılan: standart çıktı)')
+    parser.add_argument('--baseline', help='Karşılaştırılacak önceki JSON raporu')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='İzin verilen p95 artış oranı')
+    parser.add_argument('--allocator', action='store_true',
+                        help='Akışlar yerine sipariş numarası ayırma maliyetini ölç')
+    parser.add_argument('--contention', action='store_true',
+                        help='Akışlar yerine default ve production veritabanı profillerini '
+                             'eşzamanlı sepet yazmalarıyla karşılaştır')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Ayırıcı ve çekişme ölçümünde eşzamanlı işçi sayısı')
+    parser.add_argument('--per-worker', type=int, default=10000, help='İşçi başına ayrılacak numara')
+    parser.add_argument('--block-size', type=int, default=100, help='Bir seferde ayrılan numara bloğu')
+    parser.add_argument('--threads', action='store_true',
+                        help='Ayırıcı ve çekişme işçilerini süreç yerine iş parçacığı olarak çalıştır')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Ana yük testi fonksiyonu"""
+    args = parse_args(argv)
+
+    if args.contention:
+        # Her profil kendi geçici veritabanını oluşturur
+        from utils.benchmark import run_contention_benchmark, save_report
+        report = run_contention_benchmark(workers=args.workers, iterations=args.iterations,
+                                          products=args.products, processes=not args.threads,
+                                          seed=args.seed)
+        if args.out:
+            save_report(report, args.out)
+        else:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if report['profiles']['production']['errors'] else 0
+
+    temp_path = None
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    else:
+        handle, temp_path = tempfile.mkstemp(suffix='.db', prefix='yuktesti-')
+        os.close(handle)
+        os.environ['DATABASE_URL'] = f'sqlite:///{temp_path}'
+
+    from app import create_app, db
+    from utils.benchmark import (run_benchmark, run_allocator_benchmark, seed_benchmark_data,
+                                 compare_reports, load_report, save_report, stop_background_workers)
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    if args.allocator:
+        try:
+            report = run_allocator_benchmark(app, workers=args.workers, per_worker=args.per_worker,
+                                             block_size=args.block_size, processes=not args.threads)
+        finally:
+            stop_background_workers(app)
+            if temp_path:
+                with app.app_context():
+                    db.engine.dispose()
+                os.unlink(temp_path)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if report['duplicates'] else 0
+
+    try:
+        if not args.no_seed:
+            with app.app_context():
+                seeded = seed_benchmark_data(args.products, args.users, args.reviews,
+                                             args.orders, seed=args.seed)
+            print(f'Veri eklendi: {seeded}', file=sys.stderr)
+
+        report = run_benchmark(app, base_url=args.url, vus=args.vus, iterations=args.iterations,
+                               admin_vus=args.admin_vus, seed=args.seed)
+    finally:
+        # Ödemelerin başlattığı iş çalışanları veritabanı silinmeden durdurulur
+        stop_background_workers(app)
+        if temp_path:
+            with app.app_context():
+                db.engine.dispose()
+            os.unlink(temp_path)
+
+    if args.out:
+        save_report(report, args.out)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"{report['totals']['requests']} istek, {report['totals']['errors']} hata, "
+          f"{report['totals']['throughput_rps']} istek/sn", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare_reports(report, load_report(args.baseline), args.tolerance)
+        for item in regressions:
+            print(f"GERİLEME {item['endpoint']} {item['metric']}: "
+                  f"{item['baseline']} -> {item['current']}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,7 @@ Yönetici paneli formları
 
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, FloatField, IntegerField, SelectField, BooleanField, SubmitField
-from wtforms.validators import DataRequired, NumberRange, Length, Optional
+from wtforms.validators import DataRequired, InputRequired, NumberRange, Length, Optional
 
 class ProductForm(FlaskForm):
     """Ürün ekleme/düzenleme formu"""
@@ -32,7 +32,8 @@ class ProductForm(FlaskForm):
     ])
     
     stock_quantity = IntegerField('Stok Miktarı', validators=[
-        DataRequired(message='Bu alan zorunludur.'),
+        # DataRequired 0 stoğu boş sayardı
+        InputRequired(message='Bu alan zorunludur.'),
         NumberRange(min=0, message='Stok miktarı 0 veya daha büyük olmalıdır.')
     ])
     
@@ -70,8 +71,16 @@ class ProductForm(FlaskForm):
     
     submit = SubmitField('Kaydet')
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, category_choices=None, **kwargs):
         super(ProductForm, self).__init__(*args, **kwargs)
-        # Kategoriler dinamik olarak yüklenecek
-        from models.product import Category
-        self.category_id.choices = [(c.id, c.name) for c in Category.query.filter_by(is_active=True).all()]
\ No newline at end of file
+        # Kategoriler dinamik olarak yüklenecek (toplu içe aktarımda bir kez yüklenip verilir)
+        if category_choices is None:
+            from models.product import Category
+            category_choices = [(c.id, c.name) for c in Category.query.filter_by(is_active=True).all()]
+        self.category_id.choices = category_choices
+
+class ProductImportForm(ProductForm):
+    """Toplu ürün içe aktarımında tek satırın doğrulaması (ürün formunun kuralları)"""
+    
+    class Meta:
+        csrf = False
\ No newline at end of file
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arka Plan İşi Modeli
+Sipariş sonrası gibi istek dışında çalışan işlerin kalıcı kuyruğu
+"""
+
+from datetime import datetime
+from app import db
+
+class Job(db.Model):
+    """
+    Kuyruktaki iş; işi ekleyen işlemle birlikte commit edilir.
+
+    Başarıyla biten işler silinir; tabloda bekleyen, çalışan ve tüm
+    denemeleri başarısız olmuş işler kalır.
+    """
+
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Sıradaki iş: durum ve çalışma zamanı (bekleyen / süresi dolmuş kilit)
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+        db.Index('ix_jobs_status_locked_at', 'status', 'locked_at'),
+    )
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    # Aynı işin bekleyen bir kopyası varken yeniden kuyruğa girmemesi için isteğe bağlı anahtar
+    dedupe_key = db.Column(db.String(200), unique=True, nullable=True)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # İşi alan çalışan (makine:pid) ve alınma zamanı; kilit süresi dolunca iş yeniden alınabilir
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} {self.status}>'
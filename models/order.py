@@ -6,12 +6,20 @@ Sepet ve sipariş verilerini yöneten SQLAlchemy modelleri
 """
 
 from datetime import datetime
+from sqlalchemy import event, func, select, update, insert, inspect
+from sqlalchemy.orm import Session
 from app import db
+from models.product import Product
 
 class CartItem(db.Model):
     """Sepet öğesi modeli"""
     
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        # Kullanıcının sepeti / sepetteki ürün ve fiyat değişiminde etkilenen sepetler
+        db.Index('ix_cart_items_user_product', 'user_id', 'product_id'),
+        db.Index('ix_cart_items_product', 'product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -26,15 +34,118 @@ class CartItem(db.Model):
     def __repr__(self):
         return f'<CartItem {self.product.name} x{self.quantity}>'
 
+class CartSummary(db.Model):
+    """Kullanıcı başına sepet özeti (ürün adedi, satır sayısı, ara toplam)"""
+    
+    __tablename__ = 'cart_summaries'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    line_count = db.Column(db.Integer, nullable=False, default=0)
+    subtotal = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @staticmethod
+    def refresh(user_id, connection=None):
+        """Kullanıcının sepet özetini sepet satırlarından yeniden hesaplar"""
+        connection = connection or db.session.connection()
+        
+        item_count, line_count, subtotal = connection.execute(
+            select(
+                func.coalesce(func.sum(CartItem.quantity), 0),
+                func.count(CartItem.id),
+                func.coalesce(func.sum(CartItem.quantity * Product.price), 0.0)
+            ).select_from(CartItem).join(Product, Product.id == CartItem.product_id)
+            .where(CartItem.user_id == user_id)
+        ).one()
+        
+        values = {
+            'item_count': item_count,
+            'line_count': line_count,
+            'subtotal': subtotal,
+            'updated_at': datetime.utcnow()
+        }
+        table = CartSummary.__table__
+        result = connection.execute(
+            update(table).where(table.c.user_id == user_id).values(**values)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(user_id=user_id, **values))
+    
+    @staticmethod
+    def refresh_for_product(product_id, connection=None):
+        """Ürünü sepetinde bulunduran kullanıcıların ara toplamlarını günceller"""
+        connection = connection or db.session.connection()
+        
+        table = CartSummary.__table__
+        subtotal = select(
+            func.coalesce(func.sum(CartItem.quantity * Product.price), 0.0)
+        ).select_from(CartItem).join(
+            Product, Product.id == CartItem.product_id
+        ).where(CartItem.user_id == table.c.user_id).scalar_subquery()
+        
+        connection.execute(
+            update(table).where(
+                table.c.user_id.in_(
+                    select(CartItem.user_id).where(CartItem.product_id == product_id)
+                )
+            ).values(subtotal=subtotal, updated_at=datetime.utcnow())
+        )
+    
+    @staticmethod
+    def rebuild_missing():
+        """Sepeti olup özeti olmayan kullanıcılar için özetleri tek sorguda oluşturur"""
+        table = CartSummary.__table__
+        missing = select(
+            CartItem.user_id,
+            func.sum(CartItem.quantity),
+            func.count(CartItem.id),
+            func.sum(CartItem.quantity * Product.price),
+            func.max(CartItem.added_at)
+        ).join(Product, Product.id == CartItem.product_id).where(
+            ~select(table.c.user_id).where(table.c.user_id == CartItem.user_id).exists()
+        ).group_by(CartItem.user_id)
+        
+        result = db.session.execute(insert(table).from_select(
+            ['user_id', 'item_count', 'line_count', 'subtotal', 'updated_at'], missing
+        ))
+        db.session.commit()
+        return result.rowcount
+    
+    def __repr__(self):
+        return f'<CartSummary {self.user_id}: {self.item_count} adet>'
+
 class Order(db.Model):
     """Sipariş modeli"""
     
+    PENDING = 'Beklemede'
+    CONFIRMED = 'Onaylandı'
+    SHIPPED = 'Kargoda'
+    DELIVERED = 'Teslim Edildi'
+    CANCELLED = 'İptal'
+    STATUSES = (PENDING, CONFIRMED, SHIPPED, DELIVERED, CANCELLED)
+    
+    # Durum -> geçilebilecek durumlar; teslim edilen ve iptal edilen siparişler kapanmıştır
+    TRANSITIONS = {
+        PENDING: (CONFIRMED, SHIPPED, CANCELLED),
+        CONFIRMED: (SHIPPED, CANCELLED),
+        SHIPPED: (DELIVERED,),
+        DELIVERED: (),
+        CANCELLED: (),
+    }
+    
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Kullanıcının siparişleri, durum filtreli ve filtresiz admin listeleri
+        db.Index('ix_orders_user_created', 'user_id', 'created_at'),
+        db.Index('ix_orders_status_created', 'status', 'created_at'),
+        db.Index('ix_orders_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    status = db.Column(db.String(20), default='Beklemede')  # Beklemede, Onaylandı, Kargoda, Teslim Edildi, İptal
+    status = db.Column(db.String(20), default=PENDING)  # Beklemede, Onaylandı, Kargoda, Teslim Edildi, İptal
     total_amount = db.Column(db.Float, nullable=False)
     shipping_address = db.Column(db.Text, nullable=False)
     billing_address = db.Column(db.Text, nullable=True)
@@ -60,6 +171,10 @@ class Order(db.Model):
         }
         return status_classes.get(self.status, 'secondary')
     
+    def can_transition_to(self, status):
+        """Sipariş mevcut durumundan verilen duruma geçebilir mi"""
+        return status in self.TRANSITIONS.get(self.status, ())
+    
     def get_formatted_total(self):
         """Formatlanmış toplam fiyat döndürür"""
         return f"{self.total_amount:,.2f} ₺"
@@ -74,20 +189,39 @@ class Order(db.Model):
     
     @staticmethod
     def generate_order_number():
-        """Benzersiz sipariş numarası oluşturur"""
-        import random
-        import string
-        timestamp = datetime.now().strftime('%Y%m%d')
-        random_part = ''.join(random.choices(string.digits, k=4))
-        return f"TR{timestamp}{random_part}"
+        """
+        Benzersiz sipariş numarası oluşturur (TR + tarih + günlük sıra no).
+        
+        Numara, süreç başına ayrılan günlük sıra bloğundan bellekten verilir;
+        çakışma ve yeniden deneme olmaz. Blok ayırma ayrı bir kısa işlemde
+        yazdığı için SQLite'ta oturum yazma kilidini almadan önce çağrılmalıdır.
+        """
+        from utils.order_numbers import next_order_number
+        return next_order_number()
     
     def __repr__(self):
         return f'<Order {self.order_number}>'
 
+class OrderSequence(db.Model):
+    """Gün bazlı sipariş numarası sayacı (ayrılmış son sıra numarası)"""
+    
+    __tablename__ = 'order_sequences'
+    
+    day = db.Column(db.Date, primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<OrderSequence {self.day}: {self.last_value}>'
+
 class OrderItem(db.Model):
     """Sipariş öğesi modeli"""
     
     __tablename__ = 'order_items'
+    __table_args__ = (
+        db.Index('ix_order_items_order', 'order_id'),
+        # Ürünün satış adedi: sipariş durumu için yalnızca order_id'ye gidilir
+        db.Index('ix_order_items_product', 'product_id', 'order_id', 'quantity'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
@@ -97,4 +231,49 @@ class OrderItem(db.Model):
     total_price = db.Column(db.Float, nullable=False)
     
     def __repr__(self):
-        return f'<OrderItem {self.product.name} x{self.quantity}>'
\ No newline at end of file
+        return f'<OrderItem {self.product.name} x{self.quantity}>'
+
+class OrderStatusEvent(db.Model):
+    """Sipariş durum geçişi kaydı (yalnızca eklenir)"""
+    
+    __tablename__ = 'order_status_events'
+    __table_args__ = (
+        # Siparişin durum geçmişi
+        db.Index('ix_order_status_events_order', 'order_id', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    from_status = db.Column(db.String(20), nullable=True)
+    to_status = db.Column(db.String(20), nullable=False)
+    # Geçişi yapan kullanıcı (admin veya siparişi iptal eden müşteri)
+    actor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    note = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<OrderStatusEvent {self.order_id}: {self.from_status} -> {self.to_status}>'
+
+def _mark_cart_dirty(mapper, connection, cart_item):
+    """Değişen sepet satırının kullanıcısını özet yenilemesi için işaretler"""
+    session = inspect(cart_item).session
+    if session is not None:
+        session.info.setdefault('dirty_carts', set()).add(cart_item.user_id)
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(CartItem, _event_name, _mark_cart_dirty)
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_dirty_carts(session, flush_context):
+    """Aynı işlem içinde değişen sepetlerin özetlerini yeniler"""
+    dirty = session.info.pop('dirty_carts', None)
+    if dirty:
+        connection = session.connection()
+        for user_id in dirty:
+            CartSummary.refresh(user_id, connection)
+
+@event.listens_for(Product, 'after_update')
+def _refresh_carts_on_price_change(mapper, connection, product):
+    """Fiyat değişikliğini ürünü sepetinde tutan kullanıcıların özetine yansıtır"""
+    if inspect(product).attrs.price.history.has_changes():
+        CartSummary.refresh_for_product(product.id, connection)
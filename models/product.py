@@ -25,10 +25,69 @@ class Category(db.Model):
     def __repr__(self):
         return f'<Category {self.name}>'
 
-class Product(db.Model):
+class ProductDisplayMixin:
+    """Ürün kartı ve detay şablonlarının kullandığı gösterim yardımcıları"""
+    
+    def get_discount_percentage(self):
+        """İndirim yüzdesini hesaplar"""
+        if self.original_price and self.original_price > self.price:
+            return int(((self.original_price - self.price) / self.original_price) * 100)
+        return 0
+    
+    def is_in_stock(self):
+        """Stokta olup olmadığını kontrol eder"""
+        return self.stock_quantity > 0
+    
+    def get_rating_stars(self):
+        """Yıldız puanını döndürür"""
+        return int(self.rating)
+    
+    def get_formatted_price(self):
+        """Formatlanmış fiyat döndürür"""
+        return f"{self.price:,.2f} ₺"
+    
+    def get_formatted_original_price(self):
+        """Formatlanmış orijinal fiyat döndürür"""
+        if self.original_price:
+            return f"{self.original_price:,.2f} ₺"
+        return None
+    
+    def get_image_url(self):
+        """Resim URL'i (resim yoksa yer tutucu)"""
+        return self.image_url or '/static/img/no-image.png'
+    
+    def get_image_srcset(self, fmt='jpeg'):
+        """Boyutlandırılmış varyantlar için srcset değeri (varyant yoksa None)"""
+        if not self.image_variants:
+            return None
+        return ', '.join(f'{url} {width}w' for width, url in self.image_variants[fmt])
+
+class Product(ProductDisplayMixin, db.Model):
     """Ürün modeli"""
     
     __tablename__ = 'products'
+    __table_args__ = (
+        # Vitrin listeleri: aktif ürünler, isteğe bağlı kategori, sıralama sütunu
+        db.Index('ix_products_active_category_name', 'is_active', 'category_id', 'name'),
+        db.Index('ix_products_active_category_price', 'is_active', 'category_id', 'price'),
+        db.Index('ix_products_active_category_rating', 'is_active', 'category_id', 'rating'),
+        db.Index('ix_products_active_category_created', 'is_active', 'category_id', 'created_at'),
+        db.Index('ix_products_active_name', 'is_active', 'name'),
+        db.Index('ix_products_active_price', 'is_active', 'price'),
+        db.Index('ix_products_active_rating', 'is_active', 'rating'),
+        # Admin listesi ve "en yeni" sıralaması
+        db.Index('ix_products_created_at', 'created_at'),
+        # Öne çıkanlar ve düşük stok uyarısı
+        db.Index('ix_products_featured', 'is_featured', 'is_active'),
+        db.Index('ix_products_active_stock', 'is_active', 'stock_quantity'),
+        # Çok satanlar
+        db.Index('ix_products_active_sales', 'is_active', 'sales_count'),
+        # Toplu içe aktarımda ürün eşleştirme anahtarı
+        db.Index('ix_products_brand_model', 'brand', 'model'),
+        # Yüzey sayımları: gruplanan tüm sütunları kapsar, tablo satırı okunmaz
+        db.Index('ix_products_facets', 'is_active', 'category_id', 'brand', 'price',
+                 'stock_quantity', 'rating'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -44,10 +103,14 @@ class Product(db.Model):
     weight = db.Column(db.Float, nullable=True)
     dimensions = db.Column(db.String(100), nullable=True)
     image_url = db.Column(db.String(255), nullable=True)
+    # Biçim -> [[genişlik, URL], ...] (yüklenen resimlerden üretilen varyantlar)
+    image_variants = db.Column(db.JSON, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     is_featured = db.Column(db.Boolean, default=False)
     rating = db.Column(db.Float, default=0.0)
     review_count = db.Column(db.Integer, default=0)
+    # İptal edilmemiş siparişlerdeki toplam adet (sipariş sonrası arka plan işiyle güncellenir)
+    sales_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -56,29 +119,27 @@ class Product(db.Model):
     order_items = db.relationship('OrderItem', backref='product', lazy=True)
     reviews = db.relationship('Review', backref='product', lazy=True)
     
-    def get_discount_percentage(self):
-        """İndirim yüzdesini hesaplar"""
-        if self.original_price and self.original_price > self.price:
-            return int(((self.original_price - self.price) / self.original_price) * 100)
-        return 0
+    def __repr__(self):
+        return f'<Product {self.name}>'
+
+class ProductCard(ProductDisplayMixin):
+    """Listeleme şablonları için oturumdan bağımsız, salt okunur ürün kartı"""
     
-    def is_in_stock(self):
-        """Stokta olup olmadığını kontrol eder"""
-        return self.stock_quantity > 0
+    __slots__ = ('id', 'name', 'brand', 'image_url', 'image_variants', 'price', 'original_price',
+                 'stock_quantity', 'rating', 'review_count', 'category_id',
+                 'is_featured', 'updated_at')
     
-    def get_rating_stars(self):
-        """Yıldız puanını döndürür"""
-        return int(self.rating)
+    # Kart satırı için veritabanından okunan sütunlar
+    columns = __slots__
     
-    def get_formatted_price(self):
-        """Formatlanmış fiyat döndürür"""
-        return f"{self.price:,.2f} ₺"
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
     
-    def get_formatted_original_price(self):
-        """Formatlanmış orijinal fiyat döndürür"""
-        if self.original_price:
-            return f"{self.original_price:,.2f} ₺"
-        return None
+    @classmethod
+    def from_row(cls, row):
+        """Sorgu satırından kart oluşturur"""
+        return cls(**row._asdict())
     
     def __repr__(self):
-        return f'<Product {self.name}>'
\ No newline at end of file
+        return f'<ProductCard {self.name}>'
\ No newline at end of file
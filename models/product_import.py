@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ürün İçe Aktarım Modeli
+Toplu ürün içe aktarımlarının durumu, ilerlemesi ve satır hataları
+"""
+
+from datetime import datetime
+from app import db
+
+class ProductImport(db.Model):
+    """
+    Bir CSV / JSONL ürün dosyasının içe aktarımı.
+
+    Arka planda çalışan içe aktarım her parti sonunda sayaçları ve okunan
+    bayt sayısını günceller; ilerleme bu kayıttan izlenir.
+    """
+
+    __tablename__ = 'product_imports'
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    format = db.Column(db.String(10), nullable=False)  # csv, jsonl
+    # Yüklenen dosyanın sunucudaki yolu (içe aktarım bitince silinir)
+    path = db.Column(db.String(500), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    file_size = db.Column(db.Integer, nullable=False, default=0)
+    bytes_read = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    # İlk satır hataları: [{"row": satır no, "message": hata}, ...]
+    errors = db.Column(db.JSON, nullable=True)
+    rows_per_second = db.Column(db.Float, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def progress(self):
+        """Okunan bayt oranı (0-100)"""
+        if self.status == self.DONE:
+            return 100
+        if not self.file_size:
+            return 0
+        return min(100, int(self.bytes_read * 100 / self.file_size))
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'format': self.format,
+            'status': self.status,
+            'progress': self.progress,
+            'processed': self.processed,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors or [],
+            'rows_per_second': self.rows_per_second,
+            'last_error': self.last_error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ProductImport {self.id} {self.filename} {self.status}>'
@@ -12,6 +12,12 @@ class Review(db.Model):
     """Ürün değerlendirmesi modeli"""
     
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Ürün sayfası yorumları, ana sayfa son yorumlar / onay bekleyenler, admin listesi
+        db.Index('ix_reviews_product_approved_created', 'product_id', 'is_approved', 'created_at'),
+        db.Index('ix_reviews_approved_created', 'is_approved', 'created_at'),
+        db.Index('ix_reviews_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -25,6 +31,9 @@ class Review(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # İlişkiler
+    user = db.relationship('User', lazy=True)
+    
     def get_rating_stars(self):
         """Yıldız puanını döndürür"""
         return '★' * self.rating + '☆' * (5 - self.rating)
@@ -41,12 +50,45 @@ class Review(db.Model):
     
     @staticmethod
     def get_average_rating(product_id):
-        """Belirli bir ürün için ortalama puanı hesaplar"""
-        reviews = Review.query.filter_by(product_id=product_id, is_approved=True).all()
-        if not reviews:
+        """Belirli bir ürün için ortalama puanı puan özetinden döndürür"""
+        stats = ProductRatingStats.query.get(product_id)
+        return stats.get_average() if stats else 0
+    
+    def __repr__(self):
+        return f'<Review {self.product.name} - {self.rating}/5>'
+
+class ProductRatingStats(db.Model):
+    """Ürün başına onaylı yorumların puan toplamı, sayısı ve yıldız dağılımı"""
+    
+    __tablename__ = 'product_rating_stats'
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    star_1 = db.Column(db.Integer, nullable=False, default=0)
+    star_2 = db.Column(db.Integer, nullable=False, default=0)
+    star_3 = db.Column(db.Integer, nullable=False, default=0)
+    star_4 = db.Column(db.Integer, nullable=False, default=0)
+    star_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # İlişkiler
+    product = db.relationship('Product', backref=db.backref('rating_stats', uselist=False, lazy=True))
+    
+    def get_average(self):
+        """Ortalama puanı döndürür"""
+        if not self.rating_count:
             return 0
-        total_rating = sum(review.rating for review in reviews)
-        return total_rating / len(reviews)
+        return self.rating_sum / self.rating_count
+    
+    def get_histogram(self):
+        """5'ten 1'e yıldız başına (yıldız, adet, yüzde) listesi döndürür"""
+        histogram = []
+        for star in range(5, 0, -1):
+            count = getattr(self, f'star_{star}') or 0
+            percentage = (count / self.rating_count) * 100 if self.rating_count else 0
+            histogram.append((star, count, percentage))
+        return histogram
     
     def __repr__(self):
-        return f'<Review {self.product.name} - {self.rating}/5>'
\ No newline at end of file
+        return f'<ProductRatingStats {self.product_id}: {self.rating_count} yorum>'
\ No newline at end of file
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İstatistik Modelleri
+Admin paneli için yazma anında güncellenen sayaç ve günlük satış tabloları
+"""
+
+from datetime import datetime
+from app import db
+
+class StoreCounter(db.Model):
+    """Mağaza geneli sayaç (kullanıcı, ürün, sipariş, yorum sayıları)"""
+
+    __tablename__ = 'store_counters'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoreCounter {self.name}={self.value}>'
+
+class DailySales(db.Model):
+    """Gün başına sipariş sayısı, iptal sayısı ve ciro (UTC gün)"""
+
+    __tablename__ = 'daily_sales'
+
+    day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def get_completed_count(self):
+        """İptal edilmemiş sipariş sayısını döndürür"""
+        return self.order_count - self.cancelled_count
+
+    def __repr__(self):
+        return f'<DailySales {self.day}: {self.revenue:.2f}>'
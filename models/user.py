@@ -8,13 +8,17 @@ Kullanıcı verilerini yöneten SQLAlchemy modeli
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from utils.passwords import get_password_service
 
 class User(UserMixin, db.Model):
     """Simplified User model for gaming store"""
     
     __tablename__ = 'users'
+    __table_args__ = (
+        # Admin kullanıcı listesi (yeniden eskiye)
+        db.Index('ix_users_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -31,6 +35,8 @@ class User(UserMixin, db.Model):
     # İlişkiler
     orders = db.relationship('Order', backref='customer', lazy=True)
     cart_items = db.relationship('CartItem', backref='user', lazy=True)
+    # Kullanıcıyla aynı sorguda yüklenir; sepet rozeti ek sorgu gerektirmez
+    cart_summary = db.relationship('CartSummary', uselist=False, lazy='joined')
     
     def __init__(self, username=None, email=None, first_name=None, last_name=None, is_admin=False, **kwargs):
         """User constructor"""
@@ -51,40 +57,31 @@ class User(UserMixin, db.Model):
         return self.active
     
     def set_password(self, password):
-        """Şifreyi hashler ve kaydeder"""
-        self.password_hash = generate_password_hash(password)
+        """Şifreyi hashler ve kaydeder (şifre servisinin havuzunda)"""
+        self.password_hash = get_password_service().hash(password)
     
     def check_password(self, password):
-        """Şifreyi doğrular"""
-        return check_password_hash(self.password_hash, password)
+        """Şifreyi doğrular (şifre servisinin havuzunda)"""
+        return get_password_service().verify(self.password_hash, password)
     
     def get_full_name(self):
         """Tam adı döndürür"""
         return f"{self.first_name} {self.last_name}"
     
     def get_cart_total(self):
-        """Sepet toplam fiyatını hesaplar"""
-        from models.order import CartItem
-        total = 0
-        try:
-            cart_items = CartItem.query.filter_by(user_id=self.id).all()
-            for item in cart_items:
-                total += item.product.price * item.quantity
-        except:
-            pass
-        return total
+        """Sepet toplam fiyatını sepet özetinden döndürür"""
+        summary = self.cart_summary
+        return summary.subtotal if summary else 0
     
     def get_cart_item_count(self):
-        """Sepetteki toplam ürün sayısını döndürür"""
-        from models.order import CartItem
-        total = 0
-        try:
-            cart_items = CartItem.query.filter_by(user_id=self.id).all()
-            for item in cart_items:
-                total += item.quantity
-        except:
-            pass
-        return total
+        """Sepetteki toplam ürün sayısını sepet özetinden döndürür"""
+        summary = self.cart_summary
+        return summary.item_count if summary else 0
+    
+    def get_cart_line_count(self):
+        """Sepetteki farklı ürün sayısını sepet özetinden döndürür"""
+        summary = self.cart_summary
+        return summary.line_count if summary else 0
     
     def get_order_count(self):
         """Toplam sipariş sayısını döndürür"""
@@ -101,7 +98,7 @@ class User(UserMixin, db.Model):
         try:
             orders = Order.query.filter_by(user_id=self.id).all()
             for order in orders:
-                if order.status != 'İptal Edildi':
+                if order.status != Order.CANCELLED:
                     total += order.total_amount
         except:
             pass
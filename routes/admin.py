@@ -5,18 +5,27 @@ Admin Rotaları
 Yönetici paneli rotaları
 """
 
-import os
-import uuid
-from werkzeug.utils import secure_filename
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, Response, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required, current_user
 from functools import wraps
+from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
 from models.user import User
-from models.product import Product, Category
+from models.product import Product
 from models.order import Order, OrderItem
 from models.review import Review
+from models.product_import import ProductImport
 from forms.admin import ProductForm
+from utils.cache import get_all_categories, cache_stats, invalidate_products
+from utils.ratings import rebuild_rating_stats
+from utils.dashboard import load_dashboard_stats, bump_counter, get_counter
+from utils.exports import ExportError, check_format, export_orders, export_products, order_filters, product_filters
+from utils.order_status import InvalidTransition, transition_orders
+from utils.pagination import keyset_paginate, newest_first
+from utils.profiler import profile_log
+from utils.images import ImageError, store_product_image
+from utils.product_import import ProductImportError, start_import
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -35,32 +44,24 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Admin ana paneli"""
-    # İstatistikler
-    total_users = User.query.count()
-    total_products = Product.query.count()
-    total_orders = Order.query.count()
-    total_reviews = Review.query.count()
+    # İstatistikler (yazma anında güncellenen sayaçlardan)
+    stats = load_dashboard_stats()
     
     # Son siparişler
-    recent_orders = Order.query.order_by(Order.created_at.desc()).limit(5).all()
+    recent_orders = Order.query.options(joinedload(Order.customer)).order_by(
+        Order.created_at.desc()
+    ).limit(5).all()
     
     # Düşük stoklu ürünler
-    low_stock_products = Product.query.filter(
+    low_stock_products = Product.query.options(joinedload(Product.category)).filter(
         Product.stock_quantity <= 10,
         Product.is_active == True
     ).limit(5).all()
     
-    # Son yorumlar
-    recent_reviews = Review.query.order_by(Review.created_at.desc()).limit(5).all()
-    
     return render_template('admin/dashboard.html',
-                         total_users=total_users,
-                         total_products=total_products,
-                         total_orders=total_orders,
-                         total_reviews=total_reviews,
+                         stats=stats,
                          recent_orders=recent_orders,
-                         low_stock_products=low_stock_products,
-                         recent_reviews=recent_reviews)
+                         low_stock_products=low_stock_products)
 
 @admin_bp.route('/urunler')
 @login_required
@@ -81,11 +82,13 @@ def products():
     if category_id:
         query = query.filter_by(category_id=category_id)
     
-    products = query.order_by(Product.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    products = keyset_paginate(
+        query.options(joinedload(Product.category)), newest_first(Product),
+        page=page, per_page=20, cursor=request.args.get('imlec'),
+        total=None if search or category_id else get_counter('products')
     )
     
-    categories = Category.query.all()
+    categories = get_all_categories()
     
     return render_template('admin/products.html', 
                          products=products, 
@@ -112,35 +115,21 @@ def add_product():
         is_featured = 'is_featured' in request.form
         is_active = 'is_active' in request.form
         
-        # Resim yükleme işlemi
+        # Resim yükleme işlemi (varyantlar ürün kaydedildikten sonra üretilir)
         image_url = request.form.get('image_url')  # URL ile resim
         uploaded_file = request.files.get('product_image')  # Dosya yükleme
+        pending_image = None
         
         if uploaded_file and uploaded_file.filename != '':
-            # Dosya yükleme işlemi
-            if uploaded_file.filename and allowed_file(uploaded_file.filename):
-                filename = secure_filename(uploaded_file.filename)
-                # Benzersiz dosya adı oluştur
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                file_path = os.path.join('static', 'uploads', unique_filename)
-                
-                # Dosyayı kaydet
-                try:
-                    uploaded_file.save(file_path)
-                    image_url = f"/static/uploads/{unique_filename}"
-                except Exception as e:
-                    flash(f'Dosya yüklenirken hata oluştu: {str(e)}', 'error')
-                    return render_template('admin/add_product.html', 
-                                         categories=Category.query.all())
-            else:
-                flash('Geçersiz dosya formatı! Sadece JPG, PNG ve GIF dosyaları kabul edilir.', 'error')
+            pending_image = prepare_upload(uploaded_file)
+            if pending_image is None:
                 return render_template('admin/add_product.html', 
-                                     categories=Category.query.all())
+                                     categories=get_all_categories())
         
         if not all([name, price, stock_quantity, category_id]):
             flash('Gerekli alanları doldurunuz!', 'error')
             return render_template('admin/add_product.html', 
-                                 categories=Category.query.all())
+                                 categories=get_all_categories())
         
         product = Product(
             name=name,
@@ -161,18 +150,32 @@ def add_product():
         db.session.add(product)
         db.session.commit()
         
+        if pending_image:
+            store_product_image(product.id, pending_image)
+        
         flash('Ürün başarıyla eklendi!', 'success')
         return redirect(url_for('admin.products'))
     
-    categories = Category.query.all()
+    categories = get_all_categories()
     return render_template('admin/add_product.html', categories=categories)
 
 def allowed_file(filename):
     """İzin verilen dosya uzantılarını kontrol eder"""
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def prepare_upload(uploaded_file):
+    """Yüklenen resmi doğrular; geçersizse hata mesajı gösterip None döndürür"""
+    if not allowed_file(uploaded_file.filename):
+        flash('Geçersiz dosya formatı! Sadece JPG, PNG, GIF ve WebP dosyaları kabul edilir.', 'error')
+        return None
+    try:
+        return current_app.extensions['image_pipeline'].prepare(uploaded_file.read())
+    except ImageError as e:
+        flash(f'Dosya yüklenirken hata oluştu: {str(e)}', 'error')
+        return None
+
 @admin_bp.route('/urunler/<int:product_id>/duzenle', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -181,6 +184,17 @@ def edit_product(product_id):
     product = Product.query.get_or_404(product_id)
     
     if request.method == 'POST':
+        # Yeni resim: yüklenen dosya veya değiştirilen URL
+        uploaded_file = request.files.get('product_image')
+        pending_image = None
+        if uploaded_file and uploaded_file.filename != '':
+            pending_image = prepare_upload(uploaded_file)
+            if pending_image is None:
+                return redirect(url_for('admin.edit_product', product_id=product.id))
+        elif 'image_url' in request.form and request.form['image_url'] != (product.image_url or ''):
+            product.image_url = request.form['image_url'] or None
+            product.image_variants = None
+        
         product.name = request.form.get('name')
         product.description = request.form.get('description')
         product.price = request.form.get('price', type=float)
@@ -195,14 +209,89 @@ def edit_product(product_id):
         product.is_active = 'is_active' in request.form
         
         db.session.commit()
+        
+        if pending_image:
+            store_product_image(product.id, pending_image)
+        
         flash('Ürün güncellendi!', 'success')
         return redirect(url_for('admin.products'))
     
-    categories = Category.query.all()
+    categories = get_all_categories()
     return render_template('admin/edit_product.html', 
                          product=product, 
+                         form=ProductForm(obj=product),
                          categories=categories)
 
+@admin_bp.route('/urunler/<int:product_id>/sil', methods=['POST'])
+@login_required
+@admin_required
+def delete_product(product_id):
+    """Ürün silme (sipariş veya yorum geçmişi olan ürünler pasife alınır)"""
+    product = Product.query.get_or_404(product_id)
+    
+    for cart_item in product.cart_items:
+        db.session.delete(cart_item)
+    
+    if product.order_items or product.reviews:
+        product.is_active = False
+        flash('Ürünün sipariş veya yorum geçmişi olduğu için pasife alındı.', 'info')
+    else:
+        if product.rating_stats:
+            db.session.delete(product.rating_stats)
+        db.session.delete(product)
+        flash('Ürün silindi!', 'info')
+    
+    db.session.commit()
+    return redirect(url_for('admin.products'))
+
+@admin_bp.route('/urunler/ice-aktar', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_products():
+    """
+    Toplu ürün içe aktarımı (CSV / JSONL).
+    
+    Küçük dosyalar istek içinde, büyükleri arka planda içe aktarılır.
+    Accept: application/json ile çağrılırsa içe aktarım durumu JSON döner
+    (arka plandakiler için 202 ve ilerleme adresi).
+    """
+    if request.method == 'POST':
+        wants_json = request.accept_mimetypes.best == 'application/json'
+        upload = request.files.get('file')
+        try:
+            if not upload or upload.filename == '':
+                raise ProductImportError('Lütfen bir dosya seçiniz!')
+            record = start_import(upload, request.form.get('bicim') or None, current_user.id)
+        except ProductImportError as error:
+            if wants_json:
+                return jsonify({'success': False, 'message': str(error)}), 400
+            flash(str(error), 'error')
+            return redirect(url_for('admin.import_products'))
+        
+        if wants_json:
+            finished = record.status in (ProductImport.DONE, ProductImport.FAILED)
+            return jsonify(dict(record.as_dict(), status_url=url_for('admin.product_import_status',
+                                                                     import_id=record.id))), \
+                200 if finished else 202
+        if record.status == ProductImport.DONE:
+            flash(f'{record.created} ürün eklendi, {record.updated} ürün güncellendi, '
+                  f'{record.failed} satır hatalı.', 'success' if not record.failed else 'warning')
+        elif record.status == ProductImport.FAILED:
+            flash(f'İçe aktarım başarısız: {record.last_error}', 'error')
+        else:
+            flash('Dosya arka planda içe aktarılıyor.', 'info')
+        return redirect(url_for('admin.import_products'))
+    
+    imports = ProductImport.query.order_by(ProductImport.id.desc()).limit(10).all()
+    return render_template('admin/import_products.html', imports=imports)
+
+@admin_bp.route('/urunler/ice-aktar/<int:import_id>')
+@login_required
+@admin_required
+def product_import_status(import_id):
+    """İçe aktarımın ilerlemesi ve satır hataları (JSON)"""
+    return jsonify(ProductImport.query.get_or_404(import_id).as_dict())
+
 @admin_bp.route('/siparisler')
 @login_required
 @admin_required
@@ -216,11 +305,14 @@ def orders():
     if status:
         query = query.filter_by(status=status)
     
-    orders = query.order_by(Order.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    orders = keyset_paginate(
+        query.options(joinedload(Order.customer), selectinload(Order.items).joinedload(OrderItem.product)),
+        newest_first(Order), page=page, per_page=20, cursor=request.args.get('imlec'),
+        total=None if status else get_counter('orders')
     )
     
-    return render_template('admin/orders.html', orders=orders, current_status=status)
+    return render_template('admin/orders.html', orders=orders, current_status=status,
+                           statuses=Order.STATUSES)
 
 @admin_bp.route('/siparisler/<int:order_id>/duzenle', methods=['POST'])
 @login_required
@@ -230,23 +322,107 @@ def update_order_status(order_id):
     order = Order.query.get_or_404(order_id)
     new_status = request.form.get('status')
     
-    if new_status in ['Beklemede', 'Onaylandı', 'Kargoda', 'Teslim Edildi', 'İptal']:
-        order.status = new_status
-        
-        if new_status == 'Kargoda':
-            from datetime import datetime
-            order.shipped_at = datetime.utcnow()
-        elif new_status == 'Teslim Edildi':
-            from datetime import datetime
-            order.delivered_at = datetime.utcnow()
-        
+    try:
+        result = transition_orders(new_status, [order.id], actor_id=current_user.id)
+    except InvalidTransition:
+        flash('Geçersiz durum!', 'error')
+        return redirect(url_for('admin.orders'))
+    
+    if result.updated:
         db.session.commit()
         flash('Sipariş durumu güncellendi!', 'success')
     else:
-        flash('Geçersiz durum!', 'error')
+        flash(f'"{order.status}" durumundaki sipariş "{new_status}" durumuna geçirilemez.', 'error')
     
     return redirect(url_for('admin.orders'))
 
+@admin_bp.route('/siparisler/toplu-durum', methods=['POST'])
+@login_required
+@admin_required
+def bulk_update_order_status():
+    """
+    Toplu sipariş durumu güncelleme.
+    
+    Seçili siparişler (order_ids) veya bir durumdaki tüm siparişler
+    (from_status) tek istekte, küme tabanlı olarak taşınır. JSON gövdeyle
+    çağrılırsa sonuç JSON döner.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        status = payload.get('status')
+        from_status = payload.get('from_status') or None
+        order_ids = payload.get('order_ids')
+    else:
+        status = request.form.get('status')
+        # Kapsam: seçili siparişler veya bir durumdaki tüm siparişler
+        from_status = request.form.get('from_status') or None
+        order_ids = None if from_status else request.form.getlist('order_ids', type=int)
+    
+    try:
+        if order_ids is not None and not all(isinstance(order_id, int) for order_id in order_ids):
+            raise InvalidTransition('Sipariş numaraları tam sayı olmalı')
+        result = transition_orders(status, order_ids, from_status, actor_id=current_user.id,
+                                   note='Toplu güncelleme')
+    except (InvalidTransition, ValueError) as error:
+        db.session.rollback()
+        if request.is_json:
+            return jsonify({'success': False, 'message': str(error)}), 400
+        flash(str(error), 'error')
+        return redirect(url_for('admin.orders', durum=from_status))
+    
+    db.session.commit()
+    if request.is_json:
+        return jsonify({'success': True, 'status': status,
+                        'updated': result.updated, 'skipped': result.skipped})
+    
+    message = f'{result.updated} sipariş "{status}" durumuna taşındı.'
+    if result.skipped:
+        message += f' Durumu uygun olmayan {result.skipped} sipariş atlandı.'
+    flash(message, 'success' if result.updated else 'warning')
+    return redirect(url_for('admin.orders', durum=from_status))
+
+def export_response(name, export_format, stream):
+    """Dışa aktarım üretecini indirilebilir akış yanıtına çevirir"""
+    filename = f'{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}'
+    return Response(stream, content_type=check_format(export_format),
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@admin_bp.route('/disa-aktar/siparisler')
+@login_required
+@admin_required
+def orders_export():
+    """Siparişleri kalemleriyle CSV / NDJSON olarak akıtır (durum ve tarih filtreli)"""
+    export_format = request.args.get('bicim', 'csv')
+    try:
+        check_format(export_format)
+        conditions = order_filters(request.args.get('durum') or None,
+                                   request.args.get('tarih_baslangic'), request.args.get('tarih_bitis'))
+    except ExportError as error:
+        return jsonify({'success': False, 'message': str(error)}), 400
+    
+    # Üreteç istek bittikten sonra çalışır; oturum yerine motorun kısa bağlantılarını kullanır
+    stream = export_orders(db.engine, export_format, conditions,
+                           chunk_size=current_app.config['EXPORT_CHUNK_SIZE'])
+    return export_response('siparisler', export_format, stream)
+
+@admin_bp.route('/disa-aktar/urunler')
+@login_required
+@admin_required
+def products_export():
+    """Ürünleri CSV / NDJSON olarak akıtır (kategori, aktiflik ve tarih filtreli)"""
+    export_format = request.args.get('bicim', 'csv')
+    active = {'1': True, '0': False}.get(request.args.get('durum'))
+    try:
+        check_format(export_format)
+        conditions = product_filters(request.args.get('kategori', type=int), active,
+                                     request.args.get('tarih_baslangic'), request.args.get('tarih_bitis'))
+    except ExportError as error:
+        return jsonify({'success': False, 'message': str(error)}), 400
+    
+    stream = export_products(db.engine, export_format, conditions,
+                             chunk_size=current_app.config['EXPORT_CHUNK_SIZE'])
+    return export_response('urunler', export_format, stream)
+
 @admin_bp.route('/yorumlar')
 @login_required
 @admin_required
@@ -254,8 +430,10 @@ def reviews():
     """Yorum yönetimi"""
     page = request.args.get('sayfa', 1, type=int)
     
-    reviews = Review.query.order_by(Review.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    reviews = keyset_paginate(
+        Review.query.options(joinedload(Review.product), joinedload(Review.user)),
+        newest_first(Review), page=page, per_page=20, cursor=request.args.get('imlec'),
+        total=get_counter('reviews')
     )
     
     return render_template('admin/reviews.html', reviews=reviews)
@@ -284,6 +462,53 @@ def reject_review(review_id):
     flash('Yorum reddedildi!', 'warning')
     return redirect(url_for('admin.reviews'))
 
+@admin_bp.route('/yorumlar/<int:review_id>/sil', methods=['POST'])
+@login_required
+@admin_required
+def delete_review(review_id):
+    """Yorum silme"""
+    review = Review.query.get_or_404(review_id)
+    db.session.delete(review)
+    db.session.commit()
+    
+    flash('Yorum silindi!', 'info')
+    return redirect(url_for('admin.reviews'))
+
+@admin_bp.route('/yorumlar/toplu-onayla', methods=['POST'])
+@login_required
+@admin_required
+def bulk_approve_reviews():
+    """Bekleyen tüm yorumları onaylama"""
+    product_ids = [product_id for product_id, in db.session.query(Review.product_id)
+                   .filter_by(is_approved=False).distinct()]
+    
+    approved = Review.query.filter_by(is_approved=False).update(
+        {Review.is_approved: True}, synchronize_session=False
+    )
+    bump_counter('pending_reviews', -approved)
+    # Toplu güncelleme yorum olaylarını tetiklemez, etkilenen ürünlerin özetlerini tek sorguda onar
+    if product_ids:
+        rebuild_rating_stats(product_ids)
+        invalidate_products(product_ids)
+    db.session.commit()
+    
+    flash(f'{approved} yorum onaylandı!', 'success')
+    return redirect(url_for('admin.reviews'))
+
+@admin_bp.route('/yorumlar/bekleyenleri-sil', methods=['POST'])
+@login_required
+@admin_required
+def delete_all_pending_reviews():
+    """Bekleyen tüm yorumları silme"""
+    # Onaylanmamış yorumlar puan özetine dahil değildir
+    deleted = Review.query.filter_by(is_approved=False).delete(synchronize_session=False)
+    bump_counter('reviews', -deleted)
+    bump_counter('pending_reviews', -deleted)
+    db.session.commit()
+    
+    flash(f'{deleted} bekleyen yorum silindi!', 'warning')
+    return redirect(url_for('admin.reviews'))
+
 @admin_bp.route('/kullanicilar')
 @login_required
 @admin_required
@@ -291,8 +516,49 @@ def users():
     """Kullanıcı yönetimi"""
     page = request.args.get('sayfa', 1, type=int)
     
-    users = User.query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    users = keyset_paginate(
+        User.query, newest_first(User), page=page, per_page=20,
+        cursor=request.args.get('imlec'), total=get_counter('users')
     )
     
-    return render_template('admin/users.html', users=users)
\ No newline at end of file
+    return render_template('admin/users.html', users=users)
+
+@admin_bp.route('/performans')
+@login_required
+@admin_required
+def performance():
+    """Son isteklerin SQL profilleri"""
+    n_plus_one_only = request.args.get('n1') == '1'
+    return render_template('admin/performance.html',
+                           profiles=profile_log.entries(n_plus_one_only),
+                           enabled=current_app.config['SQL_PROFILER'],
+                           threshold=current_app.config['SQL_PROFILER_N_PLUS_ONE'],
+                           n_plus_one_only=n_plus_one_only)
+
+@admin_bp.route('/performans/<int:profile_id>')
+@login_required
+@admin_required
+def performance_detail(profile_id):
+    """Tek bir isteğin sorgu parmak izleri"""
+    profile = profile_log.get(profile_id)
+    if profile is None:
+        flash('Profil bulunamadı (halka arabellekten düşmüş olabilir).', 'error')
+        return redirect(url_for('admin.performance'))
+    return render_template('admin/performance_detail.html', profile=profile,
+                           threshold=current_app.config['SQL_PROFILER_N_PLUS_ONE'])
+
+@admin_bp.route('/performans/temizle', methods=['POST'])
+@login_required
+@admin_required
+def clear_performance():
+    """Profil kayıtlarını temizler"""
+    profile_log.clear()
+    flash('Profil kayıtları temizlendi.', 'info')
+    return redirect(url_for('admin.performance'))
+
+@admin_bp.route('/api/onbellek')
+@login_required
+@admin_required
+def cache_statistics():
+    """Katalog önbelleği istatistikleri (JSON)"""
+    return jsonify(cache_stats())
\ No newline at end of file
@@ -8,10 +8,14 @@ Kullanıcı kaydı, girişi ve çıkışı rotaları
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.urls import url_parse
+import math
 from datetime import datetime
+from sqlalchemy.orm import selectinload
 from app import db
 from models.user import User
 from forms.auth import LoginForm, RegisterForm, EditProfileForm
+from utils.pagination import keyset_paginate, newest_first
+from utils.passwords import PasswordServiceBusy, get_password_service
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -24,9 +28,33 @@ def giris():
     
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
+        passwords = get_password_service()
+        username, address = form.username.data, request.remote_addr
         
-        if user and user.check_password(form.password.data):
+        # Sınırı aşan denemeler şifre özeti hesaplanmadan reddedilir
+        retry_after = passwords.failures.retry_after(username, address)
+        if retry_after:
+            flash(f'Çok fazla hatalı giriş denemesi! {math.ceil(retry_after / 60)} dakika sonra '
+                  'tekrar deneyin.', 'error')
+            return render_template('auth/login.html', form=form), 429, {'Retry-After': str(math.ceil(retry_after))}
+        
+        user = User.query.filter_by(username=username).first()
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except PasswordServiceBusy:
+            flash('Sistem şu anda yoğun, lütfen biraz sonra tekrar deneyin.', 'error')
+            return render_template('auth/login.html', form=form), 503
+        
+        if valid:
+            passwords.failures.reset(username)
+            # Özet eski algoritma veya maliyetle hesaplanmışsa yenisiyle değiştir
+            # (havuz doluysa bir sonraki girişe kalır)
+            if passwords.needs_rehash(user.password_hash):
+                try:
+                    user.set_password(form.password.data)
+                except PasswordServiceBusy:
+                    pass
+            
             # Son giriş zamanını güncelle
             user.last_login = datetime.now()
             db.session.commit()
@@ -40,6 +68,7 @@ def giris():
                 next_page = url_for('main.index')
             return redirect(next_page)
         else:
+            passwords.failures.record_failure(username, address)
             flash('Hatalı kullanıcı adı veya şifre!', 'error')
     
     return render_template('auth/login.html', form=form)
@@ -143,10 +172,13 @@ def edit_profile():
 @login_required
 def siparislerim():
     """Kullanıcının siparişleri"""
-    from models.order import Order
+    from models.order import Order, OrderItem
     page = request.args.get('sayfa', 1, type=int)
-    orders = Order.query.filter_by(user_id=current_user.id).order_by(Order.created_at.desc()).paginate(
-        page=page, per_page=10, error_out=False
+    orders = keyset_paginate(
+        Order.query.filter_by(user_id=current_user.id).options(
+            selectinload(Order.items).joinedload(OrderItem.product)
+        ),
+        newest_first(Order), page=page, per_page=10, cursor=request.args.get('imlec')
     )
     
     return render_template('auth/orders.html', orders=orders)
@@ -161,11 +193,18 @@ def cancel_order(order_id):
     if not order:
         return jsonify({'success': False, 'message': 'Sipariş bulunamadı'})
     
-    if order.status != 'Beklemede':
+    # Müşteri yalnızca henüz onaylanmamış siparişini iptal edebilir
+    if order.status != Order.PENDING:
         return jsonify({'success': False, 'message': 'Bu sipariş iptal edilemez'})
     
     try:
-        order.status = 'İptal Edildi'
+        from utils.order_status import transition_orders
+        result = transition_orders(Order.CANCELLED, [order.id], from_status=Order.PENDING,
+                                   actor_id=current_user.id, note='Müşteri iptali')
+        # Kontrolden sonra sipariş onaylanmış veya kargolanmış olabilir
+        if not result.updated:
+            db.session.rollback()
+            return jsonify({'success': False, 'message': 'Bu sipariş iptal edilemez'})
         db.session.commit()
         return jsonify({'success': True, 'message': 'Sipariş başarıyla iptal edildi'})
     except Exception as e:
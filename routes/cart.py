@@ -7,9 +7,13 @@ Sepet yönetimi rotaları
 
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.exc import IntegrityError
 from app import db
 from models.product import Product
-from models.order import CartItem, Order, OrderItem
+from models.order import CartItem, CartSummary, Order, OrderItem
+from utils.cart import load_cart_snapshot, reserve_stock
+from utils.cache import invalidate_products
+from utils.dashboard import enqueue_order_followup
 
 cart_bp = Blueprint('cart', __name__)
 
@@ -17,12 +21,9 @@ cart_bp = Blueprint('cart', __name__)
 @login_required
 def index():
     """Sepet sayfası"""
-    cart_items = CartItem.query.filter_by(user_id=current_user.id).all()
+    cart = load_cart_snapshot(current_user.id)
     
-    # Toplam hesapla
-    total = sum(item.get_total_price() for item in cart_items)
-    
-    return render_template('cart/index.html', cart_items=cart_items, total=total)
+    return render_template('cart/index.html', cart=cart)
 
 @cart_bp.route('/ekle/<int:product_id>', methods=['POST'])
 @login_required
@@ -127,6 +128,7 @@ def remove_item(item_id):
 def clear_cart():
     """Sepeti temizleme"""
     CartItem.query.filter_by(user_id=current_user.id).delete()
+    CartSummary.refresh(current_user.id)
     db.session.commit()
     
     flash('Sepet temizlendi!', 'info')
@@ -136,42 +138,26 @@ def clear_cart():
 @login_required
 def checkout():
     """Ödeme sayfası"""
-    cart_items = CartItem.query.filter_by(user_id=current_user.id).all()
+    cart = load_cart_snapshot(current_user.id)
     
-    if not cart_items:
+    if cart.is_empty:
         flash('Sepetiniz boş!', 'warning')
         return redirect(url_for('cart.index'))
     
     # Stok kontrolü
-    for item in cart_items:
-        if not item.product.is_in_stock():
-            flash(f'{item.product.name} stokta yok!', 'error')
-            return redirect(url_for('cart.index'))
-        
-        if item.quantity > item.product.stock_quantity:
-            flash(f'{item.product.name} için yeterli stok yok!', 'error')
-            return redirect(url_for('cart.index'))
-    
-    # Toplam hesapla
-    total = sum(item.get_total_price() for item in cart_items)
-    
-    # Kargo ücreti (100 TL üzeri ücretsiz)
-    shipping_cost = 0 if total >= 100 else 15
-    grand_total = total + shipping_cost
-    
-    return render_template('cart/checkout.html', 
-                         cart_items=cart_items,
-                         total=total,
-                         shipping_cost=shipping_cost,
-                         grand_total=grand_total)
+    if cart.stock_problems:
+        flash(cart.stock_problems[0], 'error')
+        return redirect(url_for('cart.index'))
+    
+    return render_template('cart/checkout.html', cart=cart)
 
 @cart_bp.route('/siparis-ver', methods=['POST'])
 @login_required
 def place_order():
     """Sipariş verme"""
-    cart_items = CartItem.query.filter_by(user_id=current_user.id).all()
+    cart = load_cart_snapshot(current_user.id)
     
-    if not cart_items:
+    if cart.is_empty:
         flash('Sepetiniz boş!', 'warning')
         return redirect(url_for('cart.index'))
     
@@ -189,21 +175,25 @@ def place_order():
         return redirect(url_for('cart.checkout'))
     
     # Stok kontrolü
-    for item in cart_items:
-        if item.quantity > item.product.stock_quantity:
-            flash(f'{item.product.name} için yeterli stok yok!', 'error')
-            return redirect(url_for('cart.checkout'))
+    if cart.stock_problems:
+        flash(cart.stock_problems[0], 'error')
+        return redirect(url_for('cart.checkout'))
+    
+    # Sipariş numarasını ayır (blok ayırma ayrı işlemde yazar, stok kilidinden önce yapılmalı)
+    order_number = Order.generate_order_number()
     
-    # Toplam hesapla
-    total = sum(item.get_total_price() for item in cart_items)
-    shipping_cost = 0 if total >= 100 else 15
-    grand_total = total + shipping_cost
+    # Stoktan düş (eşzamanlı siparişlerde aşırı satışı önleyen koşullu güncelleme)
+    shortages = reserve_stock(cart.lines)
+    if shortages:
+        for shortage in shortages:
+            flash(shortage.message, 'error')
+        return redirect(url_for('cart.checkout'))
     
     # Sipariş oluştur
     order = Order(
-        order_number=Order.generate_order_number(),
+        order_number=order_number,
         user_id=current_user.id,
-        total_amount=grand_total,
+        total_amount=cart.grand_total,
         shipping_address=shipping_address,
         payment_method=payment_method,
         notes=notes
@@ -213,23 +203,33 @@ def place_order():
     db.session.flush()  # ID'yi al
     
     # Sipariş öğelerini oluştur
-    for item in cart_items:
+    for line in cart.lines:
         order_item = OrderItem(
             order_id=order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            unit_price=item.product.price,
-            total_price=item.get_total_price()
+            product_id=line.product_id,
+            quantity=line.quantity,
+            unit_price=line.price,
+            total_price=line.line_total
         )
         db.session.add(order_item)
-        
-        # Stoktan düş
-        item.product.stock_quantity -= item.quantity
+    
+    # Toplu güncellemeler eşleyici olaylarını tetiklemez, kartları elle geçersiz kıl
+    invalidate_products(line.product_id for line in cart.lines)
     
     # Sepeti temizle
     CartItem.query.filter_by(user_id=current_user.id).delete()
+    CartSummary.refresh(current_user.id)
     
-    db.session.commit()
+    # Satış adetleri ve öneri popülerliği siparişle aynı işlemde kuyruğa eklenen işle güncellenir
+    enqueue_order_followup(order.id)
+    
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Stok düşüşleri dahil tüm işlem geri alınır
+        db.session.rollback()
+        flash('Siparişiniz oluşturulamadı, lütfen tekrar deneyin.', 'error')
+        return redirect(url_for('cart.checkout'))
     
     flash(f'Siparişiniz alındı! Sipariş numaranız: {order.order_number}', 'success')
     return redirect(url_for('cart.order_success', order_id=order.id))
@@ -5,9 +5,14 @@ Ana Sayfalar Rotaları
 Ana sayfa ve genel navigasyon rotaları
 """
 
-from flask import Blueprint, render_template, request
-from models.product import Product, Category
+from flask import Blueprint, render_template, request, jsonify, url_for
+from models.product import Product
 from models.review import Review
+from utils.search import apply_search
+from utils.cache import get_active_categories, get_featured_products, get_bestsellers
+from utils.facets import FacetSelection, compute_facets
+from utils.suggest import get_suggestion_index
+from utils.pagination import paginate_cards, product_sort
 
 main_bp = Blueprint('main', __name__)
 
@@ -15,13 +20,13 @@ main_bp = Blueprint('main', __name__)
 def index():
     """Ana sayfa"""
     # Öne çıkan ürünler
-    featured_products = Product.query.filter_by(is_featured=True, is_active=True).limit(8).all()
+    featured_products = get_featured_products(limit=8)
     
     # En çok satılan ürünler (örnek için random)
-    bestsellers = Product.query.filter_by(is_active=True).limit(6).all()
+    bestsellers = get_bestsellers(limit=6)
     
     # Kategoriler
-    categories = Category.query.filter_by(is_active=True).all()
+    categories = get_active_categories()
     
     # Son incelemeler
     recent_reviews = Review.query.filter_by(is_approved=True).order_by(Review.created_at.desc()).limit(5).all()
@@ -61,25 +66,18 @@ def terms():
 def search():
     """Ürün arama"""
     query = request.args.get('q', '')
-    category_id = request.args.get('kategori', type=int)
+    selection = FacetSelection.from_args(request.args)
     min_price = request.args.get('min_fiyat', type=float)
     max_price = request.args.get('max_fiyat', type=float)
-    sort_by = request.args.get('sirala', 'name')
+    sort_by = request.args.get('sirala', 'relevance' if query else 'name')
     
     # Temel sorgu
     products_query = Product.query.filter_by(is_active=True)
     
-    # Arama filtresi
+    # Arama filtresi (FTS5 indeksi, yoksa LIKE)
+    relevance = None
     if query:
-        products_query = products_query.filter(
-            Product.name.contains(query) | 
-            Product.description.contains(query) |
-            Product.brand.contains(query)
-        )
-    
-    # Kategori filtresi
-    if category_id:
-        products_query = products_query.filter_by(category_id=category_id)
+        products_query, relevance = apply_search(products_query, query)
     
     # Fiyat filtresi
     if min_price:
@@ -87,32 +85,46 @@ def search():
     if max_price:
         products_query = products_query.filter(Product.price <= max_price)
     
-    # Sıralama
-    if sort_by == 'price_asc':
-        products_query = products_query.order_by(Product.price.asc())
-    elif sort_by == 'price_desc':
-        products_query = products_query.order_by(Product.price.desc())
-    elif sort_by == 'rating':
-        products_query = products_query.order_by(Product.rating.desc())
-    elif sort_by == 'newest':
-        products_query = products_query.order_by(Product.created_at.desc())
-    else:
-        products_query = products_query.order_by(Product.name.asc())
+    # Yüzey sayımları (tek gruplanmış sorgu) ve kategori/marka/fiyat/stok/puan filtreleri
+    facets = compute_facets(products_query, selection)
+    products_query = selection.apply(products_query)
     
-    # Sayfalama
+    # Sıralama ve sayfalama (alaka sırası hesaplanan bir değer olduğundan OFFSET ile sayfalanır)
     page = request.args.get('sayfa', 1, type=int)
-    products = products_query.paginate(
-        page=page, per_page=12, error_out=False
-    )
+    if sort_by == 'relevance' and relevance is not None:
+        products_query = products_query.order_by(relevance, Product.id.asc())
+        products = paginate_cards(products_query, page=page, per_page=12, total=facets.total)
+    else:
+        products = paginate_cards(products_query, page=page, per_page=12, order=product_sort(sort_by),
+                                  cursor=request.args.get('imlec'), total=facets.total)
     
     # Kategoriler (filtre için)
-    categories = Category.query.filter_by(is_active=True).all()
+    categories = get_active_categories()
     
     return render_template('search.html', 
                          products=products,
                          categories=categories,
                          query=query,
-                         current_category=category_id,
+                         facets=facets,
+                         selection=selection,
+                         current_category=selection.category_id,
                          current_sort=sort_by,
                          min_price=min_price,
-                         max_price=max_price)
\ No newline at end of file
+                         max_price=max_price)
+
+@main_bp.route('/ara/oneri')
+def suggest():
+    """Arama kutusu için önek önerileri (JSON)"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 8, type=int)
+    suggestions = get_suggestion_index().suggest(query, limit=limit)
+    
+    for suggestion in suggestions:
+        if suggestion['type'] == 'product':
+            suggestion['url'] = url_for('products.detail', product_id=suggestion['id'])
+        elif suggestion['type'] == 'category':
+            suggestion['url'] = url_for('products.category', category_id=suggestion['id'])
+        else:
+            suggestion['url'] = url_for('main.search', marka=suggestion['text'])
+    
+    return jsonify({'query': query, 'suggestions': suggestions})
@@ -11,6 +11,10 @@ from app import db
 from models.product import Product, Category
 from models.review import Review
 from models.order import CartItem
+from utils.cache import get_active_categories, get_all_categories
+from utils.pagination import paginate_cards, product_sort
+from utils.conditional import conditional_response, page_signature
+from utils.facets import FacetSelection, compute_facets
 
 products_bp = Blueprint('products', __name__)
 
@@ -28,30 +32,27 @@ def index():
     if category_id:
         query = query.filter_by(category_id=category_id)
     
-    # Sıralama
-    if sort_by == 'price_asc':
-        query = query.order_by(Product.price.asc())
-    elif sort_by == 'price_desc':
-        query = query.order_by(Product.price.desc())
-    elif sort_by == 'rating':
-        query = query.order_by(Product.rating.desc())
-    elif sort_by == 'newest':
-        query = query.order_by(Product.created_at.desc())
-    else:
-        query = query.order_by(Product.name.asc())
-    
-    # Sayfalama
-    products = query.paginate(page=page, per_page=12, error_out=False)
+    # Sıralama ve anahtar kümesi sayfalaması
+    products = paginate_cards(query, page=page, per_page=12, order=product_sort(sort_by),
+                              cursor=request.args.get('imlec'))
     
     # Kategoriler
-    categories = Category.query.filter_by(is_active=True).all()
-    current_category = Category.query.get(category_id) if category_id else None
-    
-    return render_template('products/index.html', 
-                         products=products,
-                         categories=categories,
-                         current_category=current_category,
-                         current_sort=sort_by)
+    categories = get_active_categories()
+    current_category = next((c for c in categories if c.id == category_id), None)
+    if category_id and current_category is None:
+        current_category = Category.query.get(category_id)
+    
+    return conditional_response(
+        lambda: render_template('products/index.html', 
+                                products=products,
+                                categories=categories,
+                                current_category=current_category,
+                                current_sort=sort_by),
+        page_signature(products),
+        tuple((c.id, c.name, c.product_count) for c in categories),
+        (current_category.name, current_category.description) if current_category else None,
+        sort_by
+    )
 
 @products_bp.route('/kategori/<int:category_id>')
 def category(category_id):
@@ -63,35 +64,31 @@ def category(category_id):
     # Kategori ürünleri
     query = Product.query.filter_by(category_id=category_id, is_active=True)
     
-    # Sıralama
-    if sort_by == 'price_asc':
-        query = query.order_by(Product.price.asc())
-    elif sort_by == 'price_desc':
-        query = query.order_by(Product.price.desc())
-    elif sort_by == 'rating':
-        query = query.order_by(Product.rating.desc())
-    elif sort_by == 'newest':
-        query = query.order_by(Product.created_at.desc())
-    else:
-        query = query.order_by(Product.name.asc())
-    
-    products = query.paginate(page=page, per_page=12, error_out=False)
-    
-    return render_template('products/category.html', 
-                         category=category,
-                         products=products,
-                         current_sort=sort_by)
+    # Yüzey sayımları ve marka/fiyat/stok/puan filtreleri
+    selection = FacetSelection.from_args(request.args, with_category=False)
+    facets = compute_facets(query, selection)
+    query = selection.apply(query)
+    
+    # Sıralama ve anahtar kümesi sayfalaması
+    products = paginate_cards(query, page=page, per_page=12, order=product_sort(sort_by),
+                              cursor=request.args.get('imlec'), total=facets.total)
+    
+    return conditional_response(
+        lambda: render_template('products/category.html', 
+                                category=category,
+                                products=products,
+                                facets=facets,
+                                selection=selection,
+                                current_sort=sort_by),
+        page_signature(products), category.name, category.description, sort_by,
+        selection, facets
+    )
 
 @products_bp.route('/<int:product_id>')
 def detail(product_id):
     """Ürün detay sayfası"""
     product = Product.query.get_or_404(product_id)
-    
-    # Ürün yorumları
-    reviews = Review.query.filter_by(
-        product_id=product_id, 
-        is_approved=True
-    ).order_by(Review.created_at.desc()).limit(10).all()
+    stats = product.rating_stats
     
     # Benzer ürünler
     similar_products = Product.query.filter(
@@ -100,24 +97,48 @@ def detail(product_id):
         Product.is_active == True
     ).limit(4).all()
     
-    # Kullanıcının sepetinde bu ürün var mı?
-    in_cart = False
-    cart_quantity = 0
-    if current_user.is_authenticated:
-        cart_item = CartItem.query.filter_by(
-            user_id=current_user.id,
-            product_id=product_id
-        ).first()
-        if cart_item:
-            in_cart = True
-            cart_quantity = cart_item.quantity
-    
-    return render_template('products/detail.html',
-                         product=product,
-                         reviews=reviews,
-                         similar_products=similar_products,
-                         in_cart=in_cart,
-                         cart_quantity=cart_quantity)
+    def render():
+        # Ürün yorumları
+        reviews = Review.query.filter_by(
+            product_id=product_id, 
+            is_approved=True
+        ).order_by(Review.created_at.desc()).limit(10).all()
+        
+        # Kullanıcının sepetinde bu ürün var mı?
+        in_cart = False
+        cart_quantity = 0
+        if current_user.is_authenticated:
+            cart_item = CartItem.query.filter_by(
+                user_id=current_user.id,
+                product_id=product_id
+            ).first()
+            if cart_item:
+                in_cart = True
+                cart_quantity = cart_item.quantity
+        
+        # Yıldız dağılımı (puan özetinden)
+        rating_histogram = stats.get_histogram() if stats else []
+        
+        return render_template('products/detail.html',
+                             product=product,
+                             reviews=reviews,
+                             rating_histogram=rating_histogram,
+                             similar_products=similar_products,
+                             in_cart=in_cart,
+                             cart_quantity=cart_quantity)
+    
+    # Onaylı yorumlar değişince puan özeti de değişir
+    review_aggregate = (stats.rating_sum, stats.rating_count, stats.updated_at) if stats else None
+    category_name = next((c.name for c in get_all_categories() if c.id == product.category_id), None)
+    timestamps = [product.updated_at] + [similar.updated_at for similar in similar_products]
+    if stats:
+        timestamps.append(stats.updated_at)
+    
+    return conditional_response(
+        render, product.id, product.updated_at, review_aggregate, category_name,
+        tuple((similar.id, similar.updated_at) for similar in similar_products),
+        last_modified=max(filter(None, timestamps), default=None)
+    )
 
 @products_bp.route('/<int:product_id>/yorum-ekle', methods=['POST'])
 @login_required
@@ -152,18 +173,8 @@ def add_review(product_id):
         comment=comment
     )
     
+    # Ürünün puan özeti yorum eklenirken artımlı olarak güncellenir (utils.ratings)
     db.session.add(review)
-    
-    # Ürünün ortalama puanını güncelle
-    all_reviews = Review.query.filter_by(product_id=product_id, is_approved=True).all()
-    if all_reviews:
-        total_rating = sum(r.rating for r in all_reviews) + rating
-        product.rating = total_rating / (len(all_reviews) + 1)
-        product.review_count = len(all_reviews) + 1
-    else:
-        product.rating = rating
-        product.review_count = 1
-    
     db.session.commit()
     flash('Yorumunuz başarıyla eklendi!', 'success')
     
@@ -174,12 +185,17 @@ def quick_view(product_id):
     """Ürün hızlı bakış (AJAX)"""
     product = Product.query.get_or_404(product_id)
     
+    return conditional_response(lambda: _quick_view_json(product), product.id, product.updated_at,
+                                last_modified=product.updated_at)
+
+def _quick_view_json(product):
+    """Hızlı bakış yanıtı"""
     # Kullanıcının sepetinde bu ürün var mı?
     in_cart = False
     if current_user.is_authenticated:
         cart_item = CartItem.query.filter_by(
             user_id=current_user.id,
-            product_id=product_id
+            product_id=product.id
         ).first()
         in_cart = bool(cart_item)
     
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Harness Tests
+Test cases for the in-process load test and report comparison
+"""
+
+import json
+import pytest
+import os
+import tempfile
+import threading
+import benchmark
+from app import create_app, db
+from utils.benchmark import (seed_benchmark_data, run_benchmark, run_allocator_benchmark,
+                             run_contention_benchmark, compare_reports, percentile,
+                             save_report, load_report, stop_background_workers)
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    yield test_app
+
+    stop_background_workers(test_app)
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+class TestBenchmark:
+    """Test the load test harness"""
+
+    def test_percentile_interpolates(self):
+        """Percentiles interpolate between neighbouring samples"""
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentile(values, 0.5) == 3.0
+        assert percentile(values, 0.95) == pytest.approx(4.8)
+        assert percentile([], 0.99) == 0.0
+
+    def test_in_process_run_reports_all_flows(self, app, tmp_path):
+        """Every flow is measured with latency percentiles and query counts"""
+        with app.app_context():
+            seeded = seed_benchmark_data(products=50, users=3, reviews=40, orders=10, seed=1)
+        assert (seeded['users'], seeded['products'], seeded['reviews'], seeded['orders']) == (3, 50, 40, 10)
+
+        report = run_benchmark(app, vus=2, iterations=2, admin_vus=1, seed=1)
+        endpoints = report['endpoints']
+        assert set(endpoints) >= {'main.index', 'main.search', 'products.detail', 'cart.add_item',
+                                  'cart.place_order', 'admin.orders'}
+        assert report['totals']['errors'] == 0
+        assert report['meta']['exceptions'] == []
+        assert endpoints['cart.place_order']['count'] == 4
+        assert endpoints['products.detail']['queries_mean'] > 0
+        assert endpoints['main.index']['p50_ms'] <= endpoints['main.index']['p99_ms']
+
+        path = tmp_path / 'rapor.json'
+        save_report(report, path)
+        assert load_report(path) == json.loads(json.dumps(report))
+
+    def test_allocator_benchmark_reports_unique_numbers(self, app):
+        """Concurrent allocation reports cost and reserves one block per block_size numbers"""
+        report = run_allocator_benchmark(app, workers=4, per_worker=250, block_size=50, processes=False)
+        assert report['allocations'] == 1000
+        assert report['duplicates'] == 0
+        assert report['reservations'] == 20
+        assert report['legacy_collisions'] > 0
+        assert 0 < report['p50_us'] <= report['p99_us']
+
+    def test_contention_benchmark_compares_profiles(self):
+        """Both engine profiles run the concurrent cart workload on their own database"""
+        report = run_contention_benchmark(workers=3, iterations=4, products=20, processes=False)
+        profiles = report['profiles']
+        assert set(profiles) == {'default', 'production'}
+        assert profiles['default']['journal_mode'] == 'delete'
+        assert profiles['production']['journal_mode'] == 'wal'
+        for result in profiles.values():
+            assert result['requests'] == 3 * 4 * 2
+            assert result['errors'] == 0
+            assert 0 < result['write_p50_ms'] <= result['write_p99_ms']
+
+    def test_harness_stops_workers_before_removing_database(self, monkeypatch, tmp_path, caplog):
+        """Follow-up job workers started by checkouts are stopped before the temp database goes away"""
+        # main() points DATABASE_URL at its own temp file; monkeypatch restores it afterwards
+        monkeypatch.setenv('DATABASE_URL', 'sqlite://')
+        before = set(threading.enumerate())
+        path = tmp_path / 'rapor.json'
+        assert benchmark.main(['--products', '30', '--users', '2', '--reviews', '10', '--orders', '5',
+                               '--vus', '2', '--iterations', '2', '--out', str(path)]) == 0
+        report = load_report(path)
+        assert report['endpoints']['cart.place_order']['count'] == 4
+
+        workers = [thread for thread in set(threading.enumerate()) - before if thread.name.startswith('jobs-')]
+        assert workers == []
+        assert [record.getMessage() for record in caplog.records if record.levelname == 'ERROR'] == []
+
+    def test_compare_flags_regressions(self):
+        """Slower p95 beyond tolerance and extra queries are regressions"""
+        baseline = {'endpoints': {'main.index': {'p95_ms': 10.0, 'queries_mean': 2.0}}}
+        report = {'endpoints': {
+            'main.index': {'p95_ms': 11.0, 'queries_mean': 3.0},
+            'main.search': {'p95_ms': 50.0, 'queries_mean': 4.0}
+        }}
+        regressions = compare_reports(report, baseline, tolerance=0.2)
+        assert [(r['endpoint'], r['metric']) for r in regressions] == [('main.index', 'queries_mean')]
+
+        report['endpoints']['main.index']['p95_ms'] = 13.0
+        assert len(compare_reports(report, baseline, tolerance=0.2)) == 2
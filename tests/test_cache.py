@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catalog Cache Tests
+Test cases for the in-process LRU/TTL catalog cache and its invalidation
+"""
+
+import pytest
+import os
+import tempfile
+import time
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.review import Review
+from utils.cache import (LRUCache, catalog_cache, product_card_cache, card_fragment_cache,
+                         catalog_version, get_active_categories, get_featured_products)
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        db.session.add_all([
+            Product(name='Önbellek Ürünü', price=100.0, stock_quantity=3,
+                    category_id=category.id, is_featured=True),
+            Product(name='Pasif Ürün', price=50.0, stock_quantity=3,
+                    category_id=category.id, is_active=False),
+        ])
+        db.session.commit()
+
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+class TestLRUCache:
+    """Test the generic LRU/TTL cache"""
+
+    def test_eviction_and_stats(self):
+        """Least recently used entries are evicted past maxsize"""
+        cache = LRUCache('test', maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        stats = cache.stats()
+        assert stats['evictions'] == 1
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['size'] == 2
+
+    def test_ttl_expiry(self):
+        """Expired entries count as misses"""
+        cache = LRUCache('test', maxsize=10, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+class TestCatalogCache:
+    """Test catalog reads and write-through invalidation"""
+
+    def test_categories_are_cached_with_counts(self, app):
+        """Second read is served from the cache and counts active products only"""
+        with app.app_context():
+            first = get_active_categories()
+            hits = catalog_cache.hits
+            second = get_active_categories()
+            assert first is second
+            assert catalog_cache.hits == hits + 1
+            assert first[0].product_count == 1
+
+    def test_product_insert_bumps_version(self, app):
+        """Adding a product invalidates category and featured lists"""
+        with app.app_context():
+            version = catalog_version()
+            assert len(get_featured_products()) == 1
+
+            category = Category.query.first()
+            db.session.add(Product(name='Yeni Ürün', price=10.0, stock_quantity=1,
+                                   category_id=category.id, is_featured=True))
+            db.session.commit()
+
+            assert catalog_version() > version
+            assert len(get_featured_products()) == 2
+
+    def test_stock_change_invalidates_card(self, client, app):
+        """Stock updates evict only the affected product card"""
+        client.get('/urunler/')
+        with app.app_context():
+            product = Product.query.filter_by(name='Önbellek Ürünü').first()
+            assert product_card_cache.get(product.id).stock_quantity == 3
+            version = catalog_version()
+
+            product.stock_quantity = 0
+            db.session.commit()
+
+            assert product_card_cache.get(product.id) is None
+            assert catalog_version() == version
+
+    def test_rollback_keeps_cache(self, client, app):
+        """Rolled back writes do not invalidate cached cards"""
+        client.get('/urunler/')
+        with app.app_context():
+            product = Product.query.filter_by(name='Önbellek Ürünü').first()
+            product.price = 1.0
+            db.session.flush()
+            db.session.rollback()
+            assert product_card_cache.get(product.id).price == 100.0
+
+    def test_listing_reflects_admin_edit(self, client, app):
+        """Listing pages show edited prices after an admin update"""
+        response = client.get('/urunler/')
+        assert '100.00 ₺' in response.data.decode('utf-8')
+
+        with app.app_context():
+            product = Product.query.filter_by(name='Önbellek Ürünü').first()
+            product.price = 75.0
+            db.session.commit()
+
+        response = client.get('/urunler/')
+        html = response.data.decode('utf-8')
+        assert '75.00 ₺' in html
+        assert 'Pasif Ürün' not in html
+
+    def test_stats_endpoint_requires_admin(self, client, app):
+        """Cache statistics are exposed to admins as JSON"""
+        response = client.get('/admin/api/onbellek')
+        assert response.status_code == 302
+
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+        response = client.get('/admin/api/onbellek')
+        assert response.status_code == 200
+        names = [cache['name'] for cache in response.get_json()['caches']]
+        assert names == ['catalog', 'product_cards', 'counts', 'card_fragments']
+
+class TestCardFragmentCache:
+    """Test the rendered product card cache"""
+
+    def test_card_reused_across_listings(self, client, app):
+        """A card rendered on one listing is reused by other pages and sorts"""
+        client.get('/urunler/')
+        with app.app_context():
+            product_id = Product.query.filter_by(name='Önbellek Ürünü').first().id
+        assert card_fragment_cache.get((product_id, False)) is not None
+
+        hits = card_fragment_cache.hits
+        client.get('/urunler/?sirala=price_desc')
+        client.get('/ara?q=Önbellek')
+        assert card_fragment_cache.hits >= hits + 2
+
+        # Logged-in visitors get their own variant with the add to cart form
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+        html = client.get('/urunler/').data.decode('utf-8')
+        assert 'Sepete Ekle' in html
+        assert card_fragment_cache.get((product_id, True)) is not None
+        client.get('/auth/cikis')
+        assert 'Sepete Ekle' not in client.get('/urunler/').data.decode('utf-8')
+
+    def test_review_aggregate_change_rerenders_card(self, client, app):
+        """Approved reviews update the stars shown on the cached card"""
+        assert 'bi-star-fill' not in client.get('/urunler/').data.decode('utf-8')
+        with app.app_context():
+            product = Product.query.filter_by(name='Önbellek Ürünü').first()
+            user = User.query.filter_by(username='admin').first()
+            db.session.add(Review(user_id=user.id, product_id=product.id, rating=5, is_approved=True))
+            db.session.commit()
+            assert card_fragment_cache.get((product.id, False)) is None
+
+        html = client.get('/urunler/').data.decode('utf-8')
+        assert html.count('bi-star-fill') == 5
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cart Tests
+Test cases for cart summaries, cart snapshots and checkout
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import event
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import CartItem, CartSummary
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        db.session.add_all([
+            Product(name='Kulaklık', price=300.0, stock_quantity=10, category_id=category.id),
+            Product(name='Şarj Kablosu', price=40.0, stock_quantity=5, category_id=category.id),
+        ])
+        shopper = User(username='alici', first_name='Ayşe', last_name='Yılmaz')
+        shopper.set_password('alici123')
+        db.session.add(shopper)
+        db.session.commit()
+
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create logged-in test client"""
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': 'alici', 'password': 'alici123'})
+    return client
+
+def product_id(name):
+    """Look up a product id by name"""
+    return Product.query.filter_by(name=name).first().id
+
+def summary_of(username='alici'):
+    """Fetch the cart summary row of a user"""
+    db.session.expire_all()
+    user = User.query.filter_by(username=username).first()
+    return CartSummary.query.get(user.id)
+
+class QueryCounter:
+    """Count SQL statements issued on an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+class TestCartSummary:
+    """Test the denormalized per-user cart summary"""
+
+    def test_summary_follows_cart_routes(self, client, app):
+        """Add, update and remove keep item count, line count and subtotal in sync"""
+        with app.app_context():
+            headphones = product_id('Kulaklık')
+            cable = product_id('Şarj Kablosu')
+
+            client.post(f'/sepet/ekle/{headphones}', data={'quantity': 2})
+            client.post(f'/sepet/ekle/{cable}', data={'quantity': 1})
+            summary = summary_of()
+            assert (summary.item_count, summary.line_count, summary.subtotal) == (3, 2, 640.0)
+
+            item = CartItem.query.filter_by(product_id=headphones).first()
+            client.post(f'/sepet/guncelle/{item.id}', data={'quantity': 1})
+            summary = summary_of()
+            assert (summary.item_count, summary.subtotal) == (2, 340.0)
+
+            client.post(f'/sepet/sil/{item.id}')
+            summary = summary_of()
+            assert (summary.item_count, summary.line_count, summary.subtotal) == (1, 1, 40.0)
+
+            client.post('/sepet/temizle')
+            summary = summary_of()
+            assert (summary.item_count, summary.line_count, summary.subtotal) == (0, 0, 0.0)
+
+    def test_summary_tracks_price_changes(self, client, app):
+        """Price edits are reflected in the subtotal of carts holding the product"""
+        with app.app_context():
+            headphones = product_id('Kulaklık')
+            client.post(f'/sepet/ekle/{headphones}', data={'quantity': 2})
+
+            product = Product.query.get(headphones)
+            product.price = 250.0
+            db.session.commit()
+
+            assert summary_of().subtotal == 500.0
+
+    def test_summary_cleared_after_order(self, client, app):
+        """Placing an order empties the summary"""
+        with app.app_context():
+            client.post(f'/sepet/ekle/{product_id("Kulaklık")}', data={'quantity': 1})
+            client.post('/sepet/siparis-ver', data={
+                'shipping_address': 'Kadıköy, İstanbul',
+                'payment_method': 'Kredi Kartı'
+            })
+            assert summary_of().item_count == 0
+
+    def test_cart_count_endpoint_is_one_query(self, client, app):
+        """The badge endpoint only loads the user row"""
+        with app.app_context():
+            client.post(f'/sepet/ekle/{product_id("Kulaklık")}', data={'quantity': 3})
+
+            with QueryCounter(db.engine) as counter:
+                response = client.get('/sepet/api/sepet-sayisi')
+            assert response.get_json() == {'count': 3}
+            assert counter.count == 1
+
+class TestCartSnapshot:
+    """Test the single-query cart snapshot used by cart, checkout and place_order"""
+
+    def test_snapshot_totals_and_shipping(self, client, app):
+        """Snapshot carries line totals, shipping and grand total"""
+        from utils.cart import load_cart_snapshot
+        with app.app_context():
+            client.post(f'/sepet/ekle/{product_id("Şarj Kablosu")}', data={'quantity': 2})
+            user = User.query.filter_by(username='alici').first()
+
+            cart = load_cart_snapshot(user.id)
+            assert cart.subtotal == 80.0
+            assert cart.shipping_cost == 15
+            assert cart.grand_total == 95.0
+            assert cart.amount_to_free_shipping == 20.0
+            assert cart.lines[0].category_name == Category.query.first().name
+            assert cart.stock_problems == []
+
+    def test_cart_pages_use_constant_queries(self, client, app):
+        """Cart and checkout cost the same number of queries for 1 or 2 lines"""
+        with app.app_context():
+            client.post(f'/sepet/ekle/{product_id("Kulaklık")}', data={'quantity': 1})
+            counts = []
+            for name in ('Şarj Kablosu', None):
+                with QueryCounter(db.engine) as index_counter:
+                    assert client.get('/sepet/').status_code == 200
+                with QueryCounter(db.engine) as checkout_counter:
+                    assert client.get('/sepet/odeme').status_code == 200
+                counts.append((index_counter.count, checkout_counter.count))
+                if name:
+                    client.post(f'/sepet/ekle/{product_id(name)}', data={'quantity': 1})
+            assert counts[0] == counts[1]
+            assert 'Şarj Kablosu' in client.get('/sepet/odeme').data.decode('utf-8')
+
+    def test_checkout_reports_stock_problem(self, client, app):
+        """Lines exceeding stock block checkout with a flash message"""
+        with app.app_context():
+            cable = product_id('Şarj Kablosu')
+            client.post(f'/sepet/ekle/{cable}', data={'quantity': 5})
+            Product.query.get(cable).stock_quantity = 2
+            db.session.commit()
+
+            response = client.get('/sepet/odeme', follow_redirects=True)
+            assert 'Şarj Kablosu için yeterli stok yok!' in response.data.decode('utf-8')
+
+    def test_place_order_uses_snapshot_prices(self, client, app):
+        """Order items and total are built from the snapshot"""
+        from models.order import Order
+        with app.app_context():
+            client.post(f'/sepet/ekle/{product_id("Kulaklık")}', data={'quantity': 2})
+            client.post('/sepet/siparis-ver', data={
+                'shipping_address': 'Çankaya, Ankara',
+                'payment_method': 'Havale/EFT'
+            })
+            order = Order.query.first()
+            assert order.total_amount == 600.0
+            assert [(i.quantity, i.unit_price, i.total_price) for i in order.items] == [(2, 300.0, 600.0)]
+            assert Product.query.get(product_id('Kulaklık')).stock_quantity == 8
+
+class TestConcurrentCheckout:
+    """Test atomic stock reservation under concurrent checkouts"""
+
+    def test_shortage_report_rolls_back_all_lines(self, client, app):
+        """A failing line leaves every product's stock untouched"""
+        from models.order import Order
+        with app.app_context():
+            headphones = product_id('Kulaklık')
+            cable = product_id('Şarj Kablosu')
+            client.post(f'/sepet/ekle/{headphones}', data={'quantity': 2})
+            client.post(f'/sepet/ekle/{cable}', data={'quantity': 5})
+
+            # As if another buyer lowered the stock after the snapshot was taken
+            from utils.cart import load_cart_snapshot, reserve_stock
+            user = User.query.filter_by(username='alici').first()
+            cart = load_cart_snapshot(user.id)
+            Product.query.get(cable).stock_quantity = 3
+            db.session.commit()
+
+            shortages = reserve_stock(cart.lines)
+            assert [(s.product_id, s.requested, s.available) for s in shortages] == [(cable, 5, 3)]
+            assert 'Stokta 3 adet var' in shortages[0].message
+            db.session.expire_all()
+            assert Product.query.get(headphones).stock_quantity == 10
+            assert Product.query.get(cable).stock_quantity == 3
+            assert Order.query.count() == 0
+
+    def test_no_oversell_under_200_concurrent_checkouts(self, app):
+        """200 buyers racing for 50 units sell out exactly, never oversell"""
+        import threading
+        from models.order import Order, OrderItem
+        buyers = 200
+        initial_stock = 50
+
+        with app.app_context():
+            hot = Product(name='Kampanya Ürünü', price=500.0, stock_quantity=initial_stock,
+                          category_id=Category.query.first().id)
+            db.session.add(hot)
+            db.session.flush()
+            users = [User(username=f'yarisci{i}', password_hash='-') for i in range(buyers)]
+            db.session.add_all(users)
+            db.session.flush()
+            db.session.add_all(CartItem(user_id=u.id, product_id=hot.id, quantity=1) for u in users)
+            db.session.commit()
+            hot_id = hot.id
+            user_ids = [u.id for u in users]
+
+        barrier = threading.Barrier(buyers)
+        statuses = []
+
+        def checkout(user_id):
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+            barrier.wait()
+            response = client.post('/sepet/siparis-ver', data={
+                'shipping_address': 'Test Adresi',
+                'payment_method': 'Kredi Kartı'
+            })
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=checkout, args=(uid,)) for uid in user_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            db.session.expire_all()
+            remaining = Product.query.get(hot_id).stock_quantity
+            sold = db.session.query(db.func.sum(OrderItem.quantity)).filter_by(product_id=hot_id).scalar() or 0
+            orders = Order.query.count()
+
+        assert statuses.count(302) == buyers
+        # Every unit is reserved despite the contention, and none twice
+        assert sold == initial_stock
+        assert remaining == 0
+        assert orders == sold
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conditional GET Tests
+Test cases for ETag / Last-Modified validation on product pages
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import event
+from app import create_app, db
+from models.user import User
+from models.product import Product
+from models.review import Review
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with a product and a pending review"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        user = User(username='alici', email='alici@example.com', first_name='Ali', last_name='Cı')
+        user.set_password('sifre123')
+        product = Product(name='Oyun Kolu', price=750.0, stock_quantity=10, category_id=1)
+        db.session.add_all([user, product])
+        db.session.commit()
+        db.session.add(Review(user_id=user.id, product_id=product.id, rating=4, is_approved=False))
+        db.session.commit()
+        test_app.config['PRODUCT_ID'] = product.id
+        db.session.remove()
+
+    # Requests must not share the setup session, or they would see stale rows
+    yield test_app
+
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def revalidate(client, url, response):
+    """Repeat a GET with the validators of an earlier response"""
+    return client.get(url, headers={'If-None-Match': response.headers['ETag']})
+
+def update_product(app, **values):
+    with app.app_context():
+        product = db.session.get(Product, app.config['PRODUCT_ID'])
+        for name, value in values.items():
+            setattr(product, name, value)
+        db.session.commit()
+
+class TestConditionalGet:
+    """Test validators and 304 responses"""
+
+    def test_detail_not_modified_skips_rendering(self, app):
+        """A matching ETag returns an empty 304 without loading the reviews"""
+        client = app.test_client()
+        url = f"/urunler/{app.config['PRODUCT_ID']}"
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['ETag'].startswith('W/"')
+        assert response.headers['Last-Modified']
+        assert 'public' in response.headers['Cache-Control']
+        assert 'Cookie' in response.headers['Vary']
+
+        statements = []
+        with app.app_context():
+            record = lambda conn, cursor, statement, *args: statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                not_modified = revalidate(client, url, response)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+        assert not_modified.status_code == 304
+        assert not_modified.data == b''
+        assert not_modified.headers['ETag'] == response.headers['ETag']
+        assert not any('FROM reviews' in statement for statement in statements)
+
+    def test_product_and_review_changes_invalidate(self, app):
+        """Price changes and newly approved reviews produce a new ETag"""
+        client = app.test_client()
+        url = f"/urunler/{app.config['PRODUCT_ID']}"
+        first = client.get(url)
+
+        update_product(app, price=700.0)
+        second = revalidate(client, url, first)
+        assert second.status_code == 200
+        assert '700' in second.get_data(as_text=True)
+
+        with app.app_context():
+            Review.query.one().is_approved = True
+            db.session.commit()
+        assert revalidate(client, url, second).status_code == 200
+
+    def test_logged_in_responses_are_private(self, app):
+        """User pages are private and change with the user's cart"""
+        client = app.test_client()
+        url = f"/urunler/{app.config['PRODUCT_ID']}"
+        anonymous = client.get(url)
+
+        client.post('/auth/giris', data={'username': 'alici', 'password': 'sifre123'})
+        # The welcome flash message is rendered, not revalidated
+        assert 'ETag' not in client.get(url).headers
+        response = client.get(url)
+        assert response.headers['ETag'] != anonymous.headers['ETag']
+        assert 'private' in response.headers['Cache-Control']
+        assert 'Last-Modified' not in response.headers
+        assert revalidate(client, url, response).status_code == 304
+
+        client.post(f"/sepet/ekle/{app.config['PRODUCT_ID']}", data={'quantity': 1})
+        client.get('/')
+        assert revalidate(client, url, response).status_code == 200
+
+    def test_listing_pages(self, app):
+        """Category and listing pages revalidate until a listed product changes"""
+        client = app.test_client()
+        for url in ('/urunler/', '/urunler/kategori/1'):
+            response = client.get(url)
+            assert revalidate(client, url, response).status_code == 304
+            assert client.get(url + '?sirala=price_desc').headers['ETag'] != response.headers['ETag']
+
+        update_product(app, stock_quantity=0)
+        assert revalidate(client, url, response).status_code == 200
+
+    def test_quick_view_if_modified_since(self, app):
+        """The JSON endpoint honours Last-Modified as well"""
+        client = app.test_client()
+        url = f"/urunler/api/hizli-bakis/{app.config['PRODUCT_ID']}"
+        response = client.get(url)
+        assert response.json['name'] == 'Oyun Kolu'
+        since = {'If-Modified-Since': response.headers['Last-Modified']}
+        assert client.get(url, headers=since).status_code == 304
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard Statistics Tests
+Test cases for materialized admin dashboard counters and their reconciliation
+"""
+
+import pytest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import Order
+from models.review import Review
+from models.stats import StoreCounter
+from utils.dashboard import load_dashboard_stats, reconcile_dashboard_stats, COUNTER_QUERIES
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create admin test client"""
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+def make_order(total, status='Beklemede', created_at=None):
+    """Insert an order for the admin user"""
+    admin = User.query.filter_by(username='admin').first()
+    order = Order(order_number=f'T{Order.query.count() + 1:06d}', user_id=admin.id,
+                  total_amount=total, status=status, shipping_address='Adres',
+                  payment_method='Kredi Kartı', created_at=created_at)
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+def actual_counts():
+    """Compute counter values directly from the source tables"""
+    return {name: db.session.execute(query()).scalar() for name, query in COUNTER_QUERIES.items()}
+
+class TestDashboardCounters:
+    """Test counters maintained on write"""
+
+    def test_counters_match_tables_after_sample_data(self, app):
+        """Startup counters agree with COUNT(*) over the tables"""
+        stats = load_dashboard_stats()
+        actual = actual_counts()
+        assert stats.total_users == actual['users']
+        assert stats.total_products == actual['products']
+        assert stats.active_products == actual['active_products']
+        assert stats.total_reviews == actual['reviews']
+
+    def test_writes_update_counters(self, app):
+        """Inserts, moderation, deactivation and deletes adjust the counters"""
+        before = load_dashboard_stats()
+        category = Category.query.first()
+        product = Product(name='Sayaç Ürünü', price=10.0, stock_quantity=1, category_id=category.id)
+        user = User(username='sayac', password_hash='-')
+        db.session.add_all([product, user])
+        db.session.commit()
+        review = Review(user_id=user.id, product_id=product.id, rating=4, is_approved=False)
+        db.session.add(review)
+        db.session.commit()
+
+        stats = load_dashboard_stats()
+        assert stats.total_users == before.total_users + 1
+        assert stats.total_products == before.total_products + 1
+        assert stats.active_products == before.active_products + 1
+        assert stats.pending_reviews == before.pending_reviews + 1
+
+        db.session.expire_all()
+        product.is_active = False
+        review.is_approved = True
+        db.session.commit()
+        stats = load_dashboard_stats()
+        assert stats.active_products == before.active_products
+        assert stats.pending_reviews == before.pending_reviews
+
+        db.session.delete(review)
+        db.session.commit()
+        assert load_dashboard_stats().total_reviews == before.total_reviews
+        assert actual_counts()['reviews'] == before.total_reviews
+
+    def test_revenue_today_and_month(self, app):
+        """Orders feed today's and this month's revenue; cancellations are excluded"""
+        today = datetime.utcnow()
+        make_order(100.0)
+        make_order(50.0)
+        cancelled = make_order(30.0)
+        older = today.replace(day=1) - timedelta(days=1)
+        make_order(999.0, created_at=older)
+
+        cancelled.status = 'İptal'
+        db.session.commit()
+
+        stats = load_dashboard_stats(today.date())
+        assert stats.total_orders == 4
+        assert stats.today_revenue == 150.0
+        assert stats.today_orders == 2
+        assert stats.monthly_revenue == 150.0
+        assert stats.average_order_value == 75.0
+
+    def test_reconcile_repairs_drift(self, app):
+        """The reconcile job reports and fixes drifted counters"""
+        make_order(80.0)
+        StoreCounter.query.get('orders').value = 42
+        db.session.commit()
+
+        drifted = reconcile_dashboard_stats()
+        db.session.commit()
+        stats = load_dashboard_stats()
+        assert drifted == ['orders']
+        assert stats.total_orders == 1
+        assert stats.today_revenue == 80.0
+
+    def test_reconcile_cli(self, app):
+        """reconcile-stats is registered as a CLI command"""
+        result = app.test_cli_runner().invoke(args=['reconcile-stats', '--days', '7'])
+        assert 'Tüm sayaçlar güncel.' in result.output
+
+class TestDashboardPage:
+    """Test the admin dashboard page"""
+
+    def test_dashboard_renders_materialized_stats(self, client, app):
+        """Dashboard shows pending reviews and revenue without table scans"""
+        make_order(120.0)
+        response = client.get('/admin/')
+        html = response.data.decode('utf-8')
+        assert response.status_code == 200
+        assert 'Onay Bekleyen Yorumlar:</strong> 0' in html
+        assert '120.00 TL' in html
+
+    def test_bulk_review_routes_keep_counters(self, client, app):
+        """Bulk approve and bulk delete adjust the pending counter"""
+        product = Product(name='Yorumlu Ürün', price=10.0, stock_quantity=1,
+                          category_id=Category.query.first().id)
+        db.session.add(product)
+        db.session.commit()
+        admin = User.query.filter_by(username='admin').first()
+        db.session.add_all(Review(user_id=admin.id, product_id=product.id, rating=3,
+                                  is_approved=False) for _ in range(3))
+        db.session.commit()
+        assert load_dashboard_stats().pending_reviews == 3
+
+        client.post('/admin/yorumlar/toplu-onayla')
+        db.session.expire_all()
+        assert load_dashboard_stats().pending_reviews == 0
+
+        db.session.add(Review(user_id=admin.id, product_id=product.id, rating=1, is_approved=False))
+        db.session.commit()
+        client.post('/admin/yorumlar/bekleyenleri-sil')
+        db.session.expire_all()
+        stats = load_dashboard_stats()
+        assert stats.pending_reviews == 0
+        assert stats.total_reviews == actual_counts()['reviews']
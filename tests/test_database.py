@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Database Profile Tests
+Test cases for the SQLite engine profiles and pool sizing
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import text
+from app import create_app, db
+from models.product import Category
+from utils.database import engine_options, profile_of
+
+def make_app(monkeypatch, db_path, profile):
+    """Create a test application with the given engine profile"""
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('DATABASE_PROFILE', profile)
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    return test_app
+
+@pytest.fixture
+def db_path():
+    """Temporary database file, removed with its WAL files"""
+    db_fd, path = tempfile.mkstemp()
+    yield path
+    os.close(db_fd)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+class TestDatabaseProfiles:
+    """Test engine profile selection"""
+
+    def test_production_profile_sets_pragmas(self, monkeypatch, db_path):
+        """Every pooled connection runs in WAL with the tuned settings"""
+        app = make_app(monkeypatch, db_path, 'production')
+        with app.app_context():
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1
+            assert pragma('foreign_keys') == 1
+            assert pragma('busy_timeout') == 10000
+            assert pragma('temp_store') == 2
+            assert db.engine.pool.size() == app.config['DATABASE_POOL_SIZE']
+            assert profile_of(db.engine) == 'production'
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_default_profile_is_unchanged(self, monkeypatch, db_path):
+        """The default profile keeps SQLite's rollback journal and settings"""
+        app = make_app(monkeypatch, db_path, 'default')
+        with app.app_context():
+            assert pragma('journal_mode') == 'delete'
+            assert pragma('foreign_keys') == 0
+            assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {}
+            assert Category.query.count() > 0
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_foreign_keys_are_enforced(self, monkeypatch, db_path):
+        """Production rejects rows that point at missing parents"""
+        app = make_app(monkeypatch, db_path, 'production')
+        with app.app_context():
+            with pytest.raises(Exception, match='FOREIGN KEY'):
+                db.session.execute(text(
+                    'INSERT INTO cart_items (user_id, product_id, quantity) VALUES (999, 999, 1)'
+                ))
+            db.session.rollback()
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_engine_options(self):
+        """Pool sizing applies to file databases only and profile names are validated"""
+        config = {'DATABASE_PROFILE': 'production', 'SQLALCHEMY_DATABASE_URI': 'sqlite:///x.db',
+                  'DATABASE_POOL_SIZE': 8, 'DATABASE_MAX_OVERFLOW': 4, 'DATABASE_POOL_TIMEOUT': 5}
+        assert engine_options(config) == {'pool_size': 8, 'max_overflow': 4, 'pool_timeout': 5}
+        assert engine_options(dict(config, SQLALCHEMY_DATABASE_URI='sqlite://')) == {}
+        with pytest.raises(ValueError):
+            engine_options(dict(config, DATABASE_PROFILE='turbo'))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export Tests
+Test cases for the streaming CSV / NDJSON exports of orders and products
+"""
+
+import csv
+import io
+import json
+import pytest
+import os
+import tempfile
+from datetime import datetime
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import Order, OrderItem
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with a few orders and a small export chunk size"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('EXPORT_CHUNK_SIZE', '3')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        products = [Product(name=f'Ürün {index}', price=10.0 * (index + 1), stock_quantity=5,
+                            category_id=category.id, is_active=index != 4,
+                            created_at=datetime(2024, 1, index + 1))
+                    for index in range(5)]
+        shopper = User(username='alici', first_name='Ayşe', last_name='Yılmaz', email='ayse@example.com')
+        shopper.set_password('alici123')
+        db.session.add_all(products + [shopper])
+        db.session.flush()
+
+        for index in range(7):
+            order = Order(order_number=f'E{index:04d}', user_id=shopper.id, total_amount=30.0,
+                          status=Order.DELIVERED if index % 2 else Order.PENDING,
+                          shipping_address='Çankaya, Ankara', payment_method='Kredi Kartı',
+                          created_at=datetime(2024, 3, index + 1, 12))
+            db.session.add(order)
+            db.session.flush()
+            # The last order has no items
+            for product in products[:2] if index < 6 else []:
+                db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=1,
+                                         unit_price=product.price, total_price=product.price))
+        db.session.commit()
+        db.session.remove()
+
+    yield test_app
+
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+class TestOrderExport:
+    """Test the order export endpoint"""
+
+    def test_csv_has_one_row_per_item(self, admin_client):
+        """Orders stream oldest first with their items and customer"""
+        response = admin_client.get('/admin/disa-aktar/siparisler')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'attachment; filename=siparisler-' in response.headers['Content-Disposition']
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == 6 * 2 + 1
+        assert [row['order_number'] for row in rows[:3]] == ['E0000', 'E0000', 'E0001']
+        assert rows[0]['username'] == 'alici'
+        assert rows[0]['product_name'] == 'Ürün 0'
+        assert rows[-1]['order_number'] == 'E0006'
+        assert rows[-1]['product_id'] == ''
+
+    def test_ndjson_with_filters(self, admin_client):
+        """Status and inclusive date filters select whole orders"""
+        response = admin_client.get('/admin/disa-aktar/siparisler?bicim=ndjson&durum=Beklemede'
+                                    '&tarih_baslangic=2024-03-02&tarih_bitis=2024-03-05')
+        assert response.mimetype == 'application/x-ndjson'
+        orders = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [order['order_number'] for order in orders] == ['E0002', 'E0004']
+        assert [item['product_name'] for item in orders[0]['items']] == ['Ürün 0', 'Ürün 1']
+        assert orders[0]['created_at'] == '2024-03-03T12:00:00'
+
+    def test_invalid_requests(self, app, admin_client):
+        """Unknown formats and bad filters are rejected, non-admins are redirected"""
+        assert admin_client.get('/admin/disa-aktar/siparisler?bicim=xml').status_code == 400
+        assert admin_client.get('/admin/disa-aktar/siparisler?durum=Kayıp').status_code == 400
+        assert admin_client.get('/admin/disa-aktar/urunler?tarih_baslangic=01.01.2024').status_code == 400
+
+        admin_client.get('/auth/cikis')
+        admin_client.post('/auth/giris', data={'username': 'alici', 'password': 'alici123'})
+        assert admin_client.get('/admin/disa-aktar/siparisler').status_code == 302
+
+    def test_stream_holds_no_connection_between_chunks(self, app, admin_client):
+        """Each chunk is read on its own connection which is returned before it is sent"""
+        response = admin_client.get('/admin/disa-aktar/siparisler?bicim=ndjson', buffered=False)
+        with app.app_context():
+            # Connections held by the test's own request context
+            held = db.engine.pool.checkedout()
+            chunks = iter(response.response)
+            first = next(chunks)
+            assert db.engine.pool.checkedout() == held
+        assert len(first.splitlines()) == 3
+        rest = b''.join(chunks)
+        assert len(rest.splitlines()) == 4
+        response.close()
+
+class TestProductExport:
+    """Test the product export endpoint"""
+
+    def test_products_with_filters(self, admin_client):
+        """Products stream with category names; inactive ones can be filtered out"""
+        rows = list(csv.DictReader(io.StringIO(
+            admin_client.get('/admin/disa-aktar/urunler').get_data(as_text=True))))
+        assert [row['name'] for row in rows] == [f'Ürün {index}' for index in range(5)]
+        assert rows[0]['category']
+
+        response = admin_client.get('/admin/disa-aktar/urunler?bicim=ndjson&durum=1&tarih_bitis=2024-01-04')
+        products = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [product['name'] for product in products] == ['Ürün 0', 'Ürün 1', 'Ürün 2', 'Ürün 3']
+
+    def test_empty_export_has_header(self, admin_client):
+        """A filter without matches still yields the CSV header"""
+        response = admin_client.get('/admin/disa-aktar/urunler?tarih_baslangic=2030-01-01')
+        assert response.get_data(as_text=True).strip().split(',')[0] == 'id'
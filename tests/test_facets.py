@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Faceted Search Tests
+Test cases for facet counts on the search and category pages
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import event
+from app import create_app, db
+from models.product import Product
+from utils.facets import FacetSelection, compute_facets
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with products across brands, prices and ratings"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+
+    with test_app.app_context():
+        db.session.add_all([
+            Product(name='Kol Alfa 1', brand='Alfa', price=100.0, stock_quantity=5, rating=4.5, category_id=1),
+            Product(name='Kol Alfa 2', brand='Alfa', price=300.0, stock_quantity=0, rating=3.2, category_id=1),
+            Product(name='Kol Beta 1', brand='Beta', price=700.0, stock_quantity=2, rating=4.0, category_id=1),
+            Product(name='Kol Beta 2', brand='Beta', price=3000.0, stock_quantity=1, rating=0.0, category_id=2),
+            Product(name='Kol Gama 1', brand='Gama', price=1200.0, stock_quantity=0, rating=2.7, category_id=2),
+        ])
+        db.session.commit()
+        db.session.remove()
+
+    yield test_app
+
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def facets_for(**selection):
+    return compute_facets(Product.query.filter_by(is_active=True), FacetSelection(**selection))
+
+class TestFacetCounts:
+    """Test the aggregation and roll-up"""
+
+    def test_counts_without_selection(self, app):
+        """Every facet counts the whole result set"""
+        with app.app_context():
+            facets = facets_for()
+        assert facets.total == 5
+        assert facets.categories == ((1, 3), (2, 2))
+        assert facets.brands == (('Alfa', 2), ('Beta', 2), ('Gama', 1))
+        assert [count for _, _, count in facets.prices] == [1, 1, 1, 1, 1]
+        assert facets.in_stock == 3
+        assert facets.ratings == ((4, 2), (3, 3), (2, 4), (1, 4))
+
+    def test_facet_ignores_its_own_filter(self, app):
+        """A selected brand keeps the other brands' counts; other facets narrow"""
+        with app.app_context():
+            facets = facets_for(brand='Alfa', in_stock=True)
+        assert facets.total == 1
+        assert facets.brands == (('Beta', 2), ('Alfa', 1))
+        assert facets.in_stock == 1
+        assert facets.categories == ((1, 1),)
+        assert facets.ratings[0] == (4, 1)
+
+    def test_single_grouped_query(self, app):
+        """The search page runs one aggregation and no separate COUNT"""
+        client = app.test_client()
+        statements = []
+        with app.app_context():
+            record = lambda conn, cursor, statement, *args: statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                response = client.get('/ara?q=Kol&marka=Beta&stokta=1&puan=4')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+        html = response.get_data(as_text=True)
+        assert '1 ürün bulundu' in html
+        assert 'Kol Beta 1' in html and 'Kol Beta 2' not in html
+        grouped = [statement for statement in statements if 'GROUP BY' in statement and 'FROM products' in statement]
+        assert len(grouped) == 1
+        assert not any('count(*)' in statement.lower() and 'GROUP BY' not in statement for statement in statements)
+
+class TestFacetPages:
+    """Test the facet links on the listing pages"""
+
+    def test_category_page_filters_and_links(self, app):
+        """Facet links toggle filters and keep the others"""
+        client = app.test_client()
+        html = client.get('/urunler/kategori/1?fiyat=0-250&sirala=price_desc').get_data(as_text=True)
+        assert 'Kol Alfa 1' in html and 'Kol Alfa 2' not in html
+        assert '/urunler/kategori/1?fiyat=0-250&amp;sirala=price_desc&amp;stokta=1' in html
+        # The active filter links back to the unfiltered page
+        assert 'href="/urunler/kategori/1?sirala=price_desc"' in html
+
+        html = client.get('/urunler/kategori/1?fiyat=bilinmiyor&puan=9').get_data(as_text=True)
+        assert 'Kol Alfa 2' in html
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Image Pipeline Tests
+Test cases for product image uploads, variants and deduplication
+"""
+
+import pytest
+import io
+import os
+import shutil
+import tempfile
+from PIL import Image
+from app import create_app, db
+from models.product import Product, Category
+
+def make_image(size=(2400, 1200), orientation=None, fmt='JPEG', mode='RGB'):
+    """Encode a test image, optionally with EXIF orientation and camera metadata"""
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128)[:len(mode)]).save(buffer, fmt, exif=exif.tobytes())
+    return buffer.getvalue()
+
+@pytest.fixture
+def upload_dir():
+    """Temporary upload folder"""
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+@pytest.fixture
+def app(monkeypatch, upload_dir):
+    """Create test application with background image workers"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('UPLOAD_FOLDER', upload_dir)
+    monkeypatch.setenv('IMAGE_WORKERS', '2')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    yield test_app
+
+    test_app.extensions['image_pipeline'].shutdown()
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def admin_client(app):
+    """Client logged in as the seeded admin"""
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+def add_product(app, client, name, data, filename='oyun.jpg'):
+    """Post the add product form with an uploaded image"""
+    with app.app_context():
+        category_id = Category.query.first().id
+    return client.post('/admin/urunler/ekle', data={
+        'name': name, 'price': '99.90', 'stock_quantity': '5',
+        'category_id': str(category_id), 'is_active': 'y',
+        'product_image': (io.BytesIO(data), filename)
+    }, content_type='multipart/form-data')
+
+def stored_files(upload_dir):
+    return sorted(name for _, _, names in os.walk(upload_dir) for name in names)
+
+class TestImagePipeline:
+    """Test the upload pipeline"""
+
+    def test_upload_generates_variants_in_background(self, app, admin_client, upload_dir):
+        """Resized WebP/JPEG variants are written without metadata and linked to the product"""
+        response = add_product(app, admin_client, 'Dikey Kapak', make_image(orientation=6))
+        assert response.status_code == 302
+        assert app.extensions['image_pipeline'].wait(timeout=30)
+
+        with app.app_context():
+            product = Product.query.filter_by(name='Dikey Kapak').one()
+            # The EXIF rotation makes the source 1200px wide; nothing is upscaled
+            assert [width for width, _ in product.image_variants['webp']] == [200, 400, 800, 1200]
+            assert product.image_url.endswith('-400.jpeg')
+            product_id = product.id
+
+        files = stored_files(upload_dir)
+        assert len(files) == 8
+        for name in files:
+            path = next(os.path.join(root, name) for root, _, names in os.walk(upload_dir) if name in names)
+            with Image.open(path) as variant:
+                assert variant.format in ('WEBP', 'JPEG')
+                assert not variant.getexif()
+                assert variant.height == variant.width * 2
+
+        html = admin_client.get(f'/urunler/{product_id}').get_data(as_text=True)
+        assert 'type="image/webp"' in html
+        assert '-800.webp 800w' in html
+
+    def test_duplicate_upload_reuses_files(self, app, admin_client, upload_dir):
+        """The same content uploaded twice is stored once and linked immediately"""
+        data = make_image(size=(640, 480), fmt='PNG', mode='RGBA')
+        add_product(app, admin_client, 'İlk', data, 'ilk.png')
+        assert app.extensions['image_pipeline'].wait(timeout=30)
+        files = stored_files(upload_dir)
+
+        add_product(app, admin_client, 'İkinci', data, 'ikinci.png')
+        with app.app_context():
+            first = Product.query.filter_by(name='İlk').one()
+            second = Product.query.filter_by(name='İkinci').one()
+            assert second.image_variants == first.image_variants
+        assert stored_files(upload_dir) == files
+
+    def test_invalid_upload_is_rejected(self, app, admin_client, upload_dir):
+        """A file that is not an image does not create the product"""
+        response = add_product(app, admin_client, 'Bozuk', b'not an image', 'bozuk.jpg')
+        assert 'geçerli bir resim değil' in response.get_data(as_text=True)
+        with app.app_context():
+            assert Product.query.filter_by(name='Bozuk').first() is None
+        assert stored_files(upload_dir) == []
+
+    def test_edit_product_replaces_image(self, app, admin_client, upload_dir):
+        """Editing uploads a new image; changing the URL drops the variants"""
+        app.extensions['image_pipeline'].workers = 0
+        add_product(app, admin_client, 'Düzenlenecek', make_image(size=(300, 300)))
+        with app.app_context():
+            product = Product.query.filter_by(name='Düzenlenecek').one()
+            form = {'name': product.name, 'price': '99.90', 'stock_quantity': '5',
+                    'category_id': str(product.category_id), 'is_active': 'y'}
+            old_url = product.image_url
+
+        assert admin_client.get(f'/admin/urunler/{product.id}/duzenle').status_code == 200
+        admin_client.post(f'/admin/urunler/{product.id}/duzenle',
+                          data=dict(form, product_image=(io.BytesIO(make_image(size=(500, 250))), 'yeni.jpg')),
+                          content_type='multipart/form-data')
+        with app.app_context():
+            product = db.session.get(Product, product.id)
+            assert product.image_url != old_url
+            assert [width for width, _ in product.image_variants['jpeg']] == [200, 400, 500]
+
+        admin_client.post(f'/admin/urunler/{product.id}/duzenle',
+                          data=dict(form, image_url='https://ornek.com/kapak.jpg'))
+        with app.app_context():
+            product = db.session.get(Product, product.id)
+            assert product.image_url == 'https://ornek.com/kapak.jpg'
+            assert product.image_variants is None
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background Job Tests
+Test cases for the jobs table queue, retries and the post-checkout follow-up
+"""
+
+import pytest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import CartItem, Order
+from models.job import Job
+from utils.jobs import enqueue, job, get_job_runner, renew_lease
+
+calls = []
+
+@job('test.record')
+def record(value):
+    calls.append(value)
+
+@job('test.flaky', max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    raise RuntimeError('geçici hata')
+
+@job('test.long')
+def long_running(value):
+    # Simulate a handler that outlived its lease, then renew it
+    Job.query.filter_by(status=Job.RUNNING).one().locked_at = datetime.utcnow() - timedelta(days=1)
+    db.session.commit()
+    calls.append(renew_lease())
+    db.session.commit()
+    calls.append(get_job_runner().claim())
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application whose jobs only run when drained explicitly"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    calls.clear()
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        db.session.add(Product(name='Kulaklık', price=300.0, stock_quantity=10, category_id=category.id))
+        shopper = User(username='alici', first_name='Ayşe', last_name='Yılmaz')
+        shopper.set_password('alici123')
+        db.session.add(shopper)
+        db.session.commit()
+        db.session.remove()
+
+    yield test_app
+
+    with test_app.app_context():
+        get_job_runner().shutdown(timeout=10)
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+class TestJobQueue:
+    """Test enqueue-on-commit, retries and deduplication"""
+
+    def test_jobs_are_enqueued_with_the_transaction(self, app):
+        """A rolled back transaction leaves no job; a committed one runs once"""
+        with app.app_context():
+            enqueue('test.record', {'value': 'geri alındı'})
+            db.session.rollback()
+            assert Job.query.count() == 0
+
+            enqueue('test.record', {'value': 'kaydedildi'})
+            db.session.commit()
+            assert Job.query.one().status == Job.PENDING
+
+            runner = get_job_runner()
+            assert runner.run_pending() == 1
+            assert runner.run_pending() == 0
+            assert calls == ['kaydedildi']
+            assert Job.query.count() == 0
+
+    def test_failed_jobs_back_off_then_fail(self, app):
+        """Errors reschedule the job later until its attempts run out"""
+        with app.app_context():
+            enqueue('test.flaky', {'value': 1}, dedupe_key='flaky')
+            db.session.commit()
+            runner = get_job_runner()
+
+            assert runner.run_pending() == 1
+            pending = Job.query.one()
+            assert pending.status == Job.PENDING
+            assert pending.attempts == 1
+            assert pending.locked_by is None
+            assert 'geçici hata' in pending.last_error
+            delay = (pending.run_at - datetime.utcnow()).total_seconds()
+            assert 0 < delay <= app.config['JOB_RETRY_DELAY']
+            assert runner.run_pending() == 0
+
+            pending.run_at = datetime.utcnow()
+            db.session.commit()
+            assert runner.run_pending() == 1
+            failed = Job.query.one()
+            assert failed.status == Job.FAILED
+            assert failed.attempts == 2
+            assert failed.dedupe_key is None
+            assert calls == [1, 1]
+
+            # The key is released once the job has failed
+            assert enqueue('test.flaky', {'value': 2}, dedupe_key='flaky')
+            db.session.commit()
+
+    def test_dedupe_and_expired_leases(self, app):
+        """Duplicate keys are dropped and jobs of dead workers are claimed again"""
+        with app.app_context():
+            assert enqueue('test.record', {'value': 'a'}, dedupe_key='tek')
+            assert not enqueue('test.record', {'value': 'b'}, dedupe_key='tek')
+            db.session.commit()
+            assert Job.query.count() == 1
+
+            runner = get_job_runner()
+            claimed = runner.claim()
+            assert runner.claim() is None
+            Job.query.get(claimed.id).locked_at = datetime.utcnow() - timedelta(
+                seconds=app.config['JOB_LEASE_SECONDS'] + 1)
+            db.session.commit()
+
+            reclaimed = runner.claim()
+            assert reclaimed.id == claimed.id
+            assert reclaimed.attempts == 2
+            # The first claim lost its lease; its run is rolled back
+            assert not runner.run(claimed)
+            assert runner.run(reclaimed)
+            assert calls == ['a', 'a']
+            assert Job.query.count() == 0
+
+    def test_renewed_leases_are_not_claimed(self, app):
+        """A handler renewing its lease keeps other workers from claiming the job"""
+        with app.app_context():
+            assert not renew_lease()
+            enqueue('test.long', {'value': 1})
+            db.session.commit()
+            assert get_job_runner().run_pending() == 1
+            assert calls == [True, None]
+            assert Job.query.count() == 0
+
+    def test_in_process_workers_run_committed_jobs(self, app):
+        """Committing an enqueued job wakes the worker threads"""
+        with app.app_context():
+            runner = get_job_runner()
+            runner.workers = 2
+            for value in range(5):
+                enqueue('test.record', {'value': value})
+            db.session.commit()
+            assert runner.wait(timeout=10)
+            assert sorted(calls) == list(range(5))
+            assert Job.query.count() == 0
+
+class TestOrderFollowup:
+    """Test the post-checkout follow-up job"""
+
+    def test_checkout_enqueues_sales_recount(self, app):
+        """Sales counts are updated by the job, and again when the order is cancelled"""
+        client = app.test_client()
+        client.post('/auth/giris', data={'username': 'alici', 'password': 'alici123'})
+        with app.app_context():
+            product = Product.query.filter_by(name='Kulaklık').one()
+            user = User.query.filter_by(username='alici').one()
+            db.session.add(CartItem(user_id=user.id, product_id=product.id, quantity=3))
+            db.session.commit()
+            product_id = product.id
+
+        client.post('/sepet/siparis-ver', data={
+            'shipping_address': 'Kadıköy, İstanbul',
+            'payment_method': 'Kredi Kartı'
+        })
+
+        with app.app_context():
+            order = Order.query.one()
+            assert Job.query.one().dedupe_key == f'order:{order.id}:followup'
+            assert Product.query.get(product_id).sales_count == 0
+
+            assert get_job_runner().run_pending() == 1
+            assert Product.query.get(product_id).sales_count == 3
+            order_id = order.id
+
+        client.get('/auth/cikis')
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+        client.post(f'/admin/siparisler/{order_id}/duzenle', data={'status': 'İptal'})
+
+        with app.app_context():
+            assert get_job_runner().run_pending() == 1
+            assert Product.query.get(product_id).sales_count == 0
@@ -327,7 +327,8 @@ class TestOrderFunctionality:
         with app.app_context():
             order_number = Order.generate_order_number()
             assert order_number.startswith('TR')
-            assert len(order_number) == 14  # TR + 8 digit date + 4 random
+            assert len(order_number) == 17  # TR + 8 digit date + 7 digit daily sequence
+            assert Order.generate_order_number() != order_number
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
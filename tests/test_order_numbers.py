@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Order Number Tests
+Test cases for the block-reserving order number allocator
+"""
+
+import pytest
+import os
+import tempfile
+import threading
+from datetime import date
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import Order, OrderSequence
+from utils.order_numbers import OrderNumberAllocator, format_order_number, next_order_number
+from utils.sample_data import generate_dataset
+
+DAY = date(2024, 10, 17)
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+    test_app.config['ORDER_NUMBER_BLOCK_SIZE'] = 5
+
+    with test_app.app_context():
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+class TestOrderNumberAllocator:
+    """Test order number allocation"""
+
+    def test_numbers_are_sequential_and_readable(self, app):
+        """Numbers are TR + date + zero padded daily sequence"""
+        allocator = OrderNumberAllocator(block_size=3)
+        numbers = [allocator.allocate(db.engine, DAY) for _ in range(7)]
+        assert numbers[0] == 'TR202410170000001'
+        assert numbers == [format_order_number(DAY, value) for value in range(1, 8)]
+        assert db.session.get(OrderSequence, DAY).last_value == 9
+
+    def test_allocators_take_disjoint_blocks(self, app):
+        """Two processes (allocators) interleaving on one day never hand out the same number"""
+        first, second = OrderNumberAllocator(block_size=4), OrderNumberAllocator(block_size=4)
+        numbers = []
+        for _ in range(10):
+            numbers += [first.allocate(db.engine, DAY), second.allocate(db.engine, DAY)]
+        assert len(set(numbers)) == 20
+        assert max(numbers) <= format_order_number(DAY, 24)
+
+    def test_each_day_has_its_own_sequence(self, app):
+        """A new day starts again from 1 and the sequence can grow past seven digits"""
+        allocator = OrderNumberAllocator(block_size=2)
+        allocator.allocate(db.engine, DAY)
+        assert allocator.allocate(db.engine, date(2024, 10, 18)) == 'TR202410180000001'
+        assert format_order_number(DAY, 12_345_678) == 'TR2024101712345678'
+
+    def test_concurrent_threads_get_unique_numbers(self, app):
+        """Threads sharing the process allocator never collide"""
+        results = []
+
+        def work():
+            with app.app_context():
+                results.extend(next_order_number(DAY) for _ in range(50))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == len(set(results)) == 400
+
+    def test_checkout_and_generated_orders_share_sequence(self, app):
+        """Generated history and live checkouts on the same day draw from one counter"""
+        category = Category.query.first()
+        db.session.add(Product(name='Kulaklık', price=300.0, stock_quantity=50, category_id=category.id))
+        db.session.commit()
+        generate_dataset(users=3, orders=40, seed=1)
+
+        user = User.query.filter_by(is_admin=False, active=True).first()
+        client = app.test_client()
+        client.post('/auth/giris', data={'username': user.username, 'password': 'ornek123'})
+        product = Product.query.filter_by(name='Kulaklık').first()
+        for _ in range(3):
+            client.post(f'/sepet/ekle/{product.id}', data={'quantity': 1})
+            client.post('/sepet/siparis-ver', data={'shipping_address': 'Adres', 'payment_method': 'Kredi Kartı'})
+
+        numbers = [number for number, in db.session.query(Order.order_number)]
+        assert len(numbers) == len(set(numbers)) == 43
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Order Status Tests
+Test cases for the order state machine, bulk transitions and the status event log
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import event, insert, update
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import Order, OrderItem, OrderStatusEvent
+from models.job import Job
+from utils.dashboard import load_dashboard_stats, reconcile_dashboard_stats
+from utils.jobs import get_job_runner
+import utils.order_status
+from utils.order_status import normalize_order_statuses
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database; jobs run only when drained"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        product = Product(name='Kulaklık', price=100.0, stock_quantity=10,
+                          category_id=Category.query.first().id)
+        shopper = User(username='alici', first_name='Ayşe', last_name='Yılmaz')
+        shopper.set_password('alici123')
+        db.session.add_all([product, shopper])
+        db.session.commit()
+        db.session.remove()
+
+    yield test_app
+
+    with test_app.app_context():
+        get_job_runner().shutdown(timeout=10)
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def make_orders(count, status=Order.PENDING, payment_method='Kredi Kartı'):
+    """Insert orders of one line each for the shopper"""
+    user = User.query.filter_by(username='alici').one()
+    product = Product.query.filter_by(name='Kulaklık').one()
+    start = Order.query.count()
+    orders = [Order(order_number=f'T{start + index:07d}', user_id=user.id, total_amount=100.0,
+                    status=status, shipping_address='Adres', payment_method=payment_method)
+              for index in range(count)]
+    db.session.add_all(orders)
+    db.session.flush()
+    db.session.add_all(OrderItem(order_id=order.id, product_id=product.id, quantity=1,
+                                 unit_price=100.0, total_price=100.0) for order in orders)
+    db.session.commit()
+    return [order.id for order in orders]
+
+def login(client, username, password):
+    client.get('/auth/cikis')
+    client.post('/auth/giris', data={'username': username, 'password': password})
+
+class TestBulkTransitions:
+    """Test set-based status changes from the admin panel"""
+
+    def test_bulk_ship_is_set_based(self, app):
+        """All confirmed orders ship in one request with a constant number of statements"""
+        client = app.test_client()
+        login(client, 'admin', 'admin123')
+        with app.app_context():
+            confirmed = make_orders(300, Order.CONFIRMED, payment_method='Kapıda Ödeme')
+            delivered = make_orders(2, Order.DELIVERED)
+
+        statements = []
+        with app.app_context():
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                response = client.post('/admin/siparisler/toplu-durum',
+                                       json={'status': Order.SHIPPED, 'order_ids': confirmed + delivered})
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert response.json == {'success': True, 'status': Order.SHIPPED, 'updated': 300, 'skipped': 2}
+        assert sum(statement.lstrip().upper().startswith('UPDATE ORDERS') for statement in statements) == 1
+
+        with app.app_context():
+            assert Order.query.filter_by(status=Order.SHIPPED).count() == 300
+            assert Order.query.filter(Order.status == Order.SHIPPED, Order.shipped_at.is_(None)).count() == 0
+            events = OrderStatusEvent.query.all()
+            assert len(events) == 300
+            assert {(e.from_status, e.to_status) for e in events} == {(Order.CONFIRMED, Order.SHIPPED)}
+            admin = User.query.filter_by(username='admin').one()
+            assert {e.actor_id for e in events} == {admin.id}
+
+        # Deliver everything that is in transit by source status
+        response = client.post('/admin/siparisler/toplu-durum', data={
+            'status': Order.DELIVERED, 'from_status': Order.SHIPPED
+        }, follow_redirects=True)
+        assert '300 sipariş' in response.data.decode('utf-8')
+        with app.app_context():
+            shipped = Order.query.get(confirmed[0])
+            assert shipped.status == Order.DELIVERED
+            assert shipped.delivered_at >= shipped.shipped_at
+            assert shipped.payment_status == 'Ödendi'
+
+    def test_invalid_transitions_are_rejected(self, app):
+        """Closed orders stay put and unknown targets are errors"""
+        client = app.test_client()
+        login(client, 'admin', 'admin123')
+        with app.app_context():
+            order_id, = make_orders(1, Order.DELIVERED)
+
+        client.post(f'/admin/siparisler/{order_id}/duzenle', data={'status': Order.CANCELLED})
+        response = client.post('/admin/siparisler/toplu-durum', json={'status': 'Kayıp', 'order_ids': [order_id]})
+        assert response.status_code == 400
+        response = client.post('/admin/siparisler/toplu-durum',
+                               json={'status': Order.SHIPPED, 'from_status': Order.DELIVERED})
+        assert response.status_code == 400
+
+        with app.app_context():
+            assert Order.query.get(order_id).status == Order.DELIVERED
+            assert OrderStatusEvent.query.count() == 0
+
+    def test_cancellations_update_stats_and_sales(self, app):
+        """Bulk and customer cancellations keep daily sales and sales counts consistent"""
+        client = app.test_client()
+        login(client, 'admin', 'admin123')
+        with app.app_context():
+            admin_cancelled = make_orders(3)
+            customer_cancelled, = make_orders(1)
+            reconcile_dashboard_stats()
+            db.session.commit()
+            assert load_dashboard_stats().today_revenue == 400.0
+
+        client.post('/admin/siparisler/toplu-durum', data={
+            'status': Order.CANCELLED, 'order_ids': admin_cancelled
+        })
+        login(client, 'alici', 'alici123')
+        assert client.post(f'/auth/siparis/{customer_cancelled}/iptal').json['success']
+
+        with app.app_context():
+            stats = load_dashboard_stats()
+            assert stats.today_orders == 0
+            assert stats.today_revenue == 0.0
+            assert Order.query.filter_by(status=Order.CANCELLED).count() == 4
+            assert Order.query.get(customer_cancelled).payment_status == Order.CANCELLED
+            customer_event = OrderStatusEvent.query.filter_by(order_id=customer_cancelled).one()
+            assert customer_event.actor_id == User.query.filter_by(username='alici').one().id
+
+            assert Job.query.count() == 2
+            assert get_job_runner().run_pending() == 2
+            assert Product.query.filter_by(name='Kulaklık').one().sales_count == 0
+
+            # Recounting from scratch finds no drift
+            assert reconcile_dashboard_stats() == []
+
+    def test_customer_cancel_loses_race_with_admin(self, app, monkeypatch):
+        """An order confirmed after the route's status check is not reported as cancelled"""
+        client = app.test_client()
+        login(client, 'alici', 'alici123')
+        with app.app_context():
+            order_id, = make_orders(1)
+
+        transition_orders = utils.order_status.transition_orders
+        def confirmed_meanwhile(*args, **kwargs):
+            # An admin confirms the order on another connection
+            with db.engine.begin() as connection:
+                connection.execute(update(Order.__table__).where(Order.__table__.c.id == order_id)
+                                   .values(status=Order.CONFIRMED))
+            return transition_orders(*args, **kwargs)
+        monkeypatch.setattr(utils.order_status, 'transition_orders', confirmed_meanwhile)
+
+        response = client.post(f'/auth/siparis/{order_id}/iptal')
+        assert response.json == {'success': False, 'message': 'Bu sipariş iptal edilemez'}
+        with app.app_context():
+            assert Order.query.get(order_id).status == Order.CONFIRMED
+            assert OrderStatusEvent.query.filter_by(order_id=order_id).count() == 0
+            assert Job.query.count() == 0
+
+    def test_legacy_cancel_status_is_normalized(self, app):
+        """Orders cancelled with the old customer status become regular cancellations"""
+        with app.app_context():
+            order_id, = make_orders(1)
+            db.session.execute(insert(Order.__table__).from_select(
+                ['order_number', 'user_id', 'total_amount', 'status', 'shipping_address', 'payment_method'],
+                db.select(db.literal('ESKI0001'), Order.user_id, Order.total_amount,
+                          db.literal('İptal Edildi'), Order.shipping_address, Order.payment_method)
+                .where(Order.id == order_id)
+            ))
+            db.session.commit()
+
+            assert normalize_order_statuses() == 1
+            legacy = Order.query.filter_by(order_number='ESKI0001').one()
+            assert legacy.status == Order.CANCELLED
+            assert load_dashboard_stats().total_orders == 2
+            assert normalize_order_statuses() == 0
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pagination Tests
+Test cases for keyset (cursor) pagination of storefront and admin listings
+"""
+
+import re
+import pytest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.order import Order
+from utils.pagination import (keyset_paginate, paginate_cards, product_sort, newest_first,
+                              encode_cursor, decode_cursor)
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with 30 products sharing a few prices"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        start = datetime(2024, 1, 1)
+        db.session.add_all(
+            Product(name=f'Ürün {i:02d}', price=float(10 * (i % 4) + 10), stock_quantity=1,
+                    category_id=category.id, created_at=start + timedelta(hours=i // 3))
+            for i in range(30)
+        )
+        db.session.commit()
+
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+def walk(query, order, per_page=7):
+    """Follow next cursors to the end and return the ids of every page"""
+    pages = []
+    cursor = None
+    page = 1
+    while True:
+        pagination = keyset_paginate(query, order, page=page, per_page=per_page, cursor=cursor)
+        pages.append([item.id for item in pagination.items])
+        if not pagination.has_next:
+            return pages, pagination
+        cursor, page = pagination.next_cursor, pagination.next_num
+
+class TestKeysetPaginate:
+    """Test the keyset paginator against OFFSET ordering"""
+
+    @pytest.mark.parametrize('sort_by', ['name', 'price_asc', 'price_desc', 'newest', 'rating'])
+    def test_walk_matches_full_ordering(self, app, sort_by):
+        """Following next cursors visits every row once in ORDER BY order, even with ties"""
+        order = product_sort(sort_by)
+        expected = [p.id for p in Product.query.order_by(*order.order_by()).all()]
+
+        pages, last = walk(Product.query, order)
+        assert [i for page in pages for i in page] == expected
+        assert all(len(page) == 7 for page in pages[:-1])
+        assert last.page == len(pages) == last.pages
+
+    def test_prev_cursor_returns_previous_page(self, app):
+        """A prev cursor from page 3 yields exactly page 2"""
+        order = product_sort('price_desc')
+        first = keyset_paginate(Product.query, order, per_page=5)
+        second = keyset_paginate(Product.query, order, page=2, per_page=5, cursor=first.next_cursor)
+        third = keyset_paginate(Product.query, order, page=3, per_page=5, cursor=second.next_cursor)
+
+        back = keyset_paginate(Product.query, order, page=2, per_page=5, cursor=third.prev_cursor)
+        assert [p.id for p in back.items] == [p.id for p in second.items]
+        assert back.has_prev and back.has_next
+
+        start = keyset_paginate(Product.query, order, page=1, per_page=5, cursor=back.prev_cursor)
+        assert [p.id for p in start.items] == [p.id for p in first.items]
+        assert not start.has_prev
+
+    def test_numbered_page_without_cursor_uses_offset(self, app):
+        """Jumping to a page number gives the same rows as OFFSET pagination"""
+        order = product_sort('name')
+        jumped = keyset_paginate(Product.query, order, page=3, per_page=7)
+        legacy = Product.query.order_by(*order.order_by()).paginate(page=3, per_page=7, error_out=False)
+        assert [p.id for p in jumped.items] == [p.id for p in legacy.items]
+        assert list(jumped.iter_pages()) == list(legacy.iter_pages())
+
+    def test_invalid_or_foreign_cursor_is_ignored(self, app):
+        """Garbage cursors and cursors of another sort fall back to the page number"""
+        name_cursor = encode_cursor(product_sort('name'), 'next', ('Ürün 05', 6))
+        assert decode_cursor(product_sort('price_asc'), name_cursor) is None
+        assert decode_cursor(product_sort('name'), 'bozuk!!') is None
+
+        pagination = keyset_paginate(Product.query, product_sort('price_asc'), cursor=name_cursor)
+        assert pagination.page == 1 and not pagination.has_prev
+
+    def test_datetime_cursor_roundtrip(self, app):
+        """created_at cursors survive encoding"""
+        order = newest_first(Product)
+        product = Product.query.first()
+        direction, values = decode_cursor(order, encode_cursor(order, 'next', order.values_of(product)))
+        assert direction == 'next'
+        assert values == (product.created_at, product.id)
+
+    def test_supplied_total_skips_count(self, app):
+        """A caller-provided total is used as-is"""
+        pagination = keyset_paginate(Product.query, product_sort('name'), per_page=10, total=1000)
+        assert pagination.total == 1000
+        assert pagination.pages == 100
+
+    def test_cards_are_loaded_from_ids(self, app):
+        """paginate_cards fills keyset pages with product cards"""
+        pagination = paginate_cards(Product.query, page=1, per_page=4, order=product_sort('price_asc'))
+        assert [card.price for card in pagination.items] == [10.0] * 4
+        assert pagination.total == Product.query.count()
+
+class TestPaginatedRoutes:
+    """Test cursor links on storefront and admin pages"""
+
+    def test_storefront_next_links_carry_cursor(self, client, app):
+        """Following Sonraki links walks the whole listing without repeats"""
+        url = '/urunler/?sirala=price_asc'
+        seen = []
+        for _ in range(5):
+            html = client.get(url).data.decode('utf-8')
+            seen += re.findall(r'Ürün \d\d', html)
+            match = re.search(r'href="([^"]*imlec=[^"]*)">Sonraki', html)
+            if not match:
+                break
+            url = match.group(1).replace('&amp;', '&')
+        names = [p.name for p in Product.query.order_by(*product_sort('price_asc').order_by())]
+        assert list(dict.fromkeys(seen)) == names
+
+    def test_admin_lists_render(self, client, app):
+        """Admin orders, reviews, products and users pages paginate with counters"""
+        admin = User.query.filter_by(username='admin').first()
+        db.session.add_all(
+            Order(order_number=f'S{i:05d}', user_id=admin.id, total_amount=10.0,
+                  shipping_address='Adres', payment_method='Havale/EFT')
+            for i in range(25)
+        )
+        db.session.commit()
+
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+        html = client.get('/admin/siparisler').data.decode('utf-8')
+        assert '>25</span>' in html
+        next_url = re.search(r'href="([^"]*imlec=[^"]*)">Sonraki', html).group(1).replace('&amp;', '&')
+        assert len(set(re.findall(r'#S\d{5}', client.get(next_url).data.decode('utf-8')))) == 5
+
+        for url in ('/admin/yorumlar', '/admin/urunler?sayfa=2', '/admin/kullanicilar', '/auth/siparislerim'):
+            assert client.get(url).status_code == 200
+
+    def test_admin_delete_product(self, client, app):
+        """The delete button on the admin product list removes the product"""
+        product = Product.query.filter_by(name='Ürün 00').first()
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+        client.post(f'/admin/urunler/{product.id}/sil')
+        db.session.expire_all()
+        assert Product.query.filter_by(name='Ürün 00').first() is None
+        assert 'Ürün 00' not in client.get('/admin/urunler').data.decode('utf-8')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Password Service Tests
+Test cases for offloaded password hashing, transparent rehash and the failed login cache
+"""
+
+import os
+import tempfile
+import pytest
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from models.user import User
+from utils.passwords import FailedLoginCache, PasswordService, PasswordServiceBusy, hash_parameters, _get_pool
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application hashing with cheap bcrypt in a one-process pool"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('PASSWORD_ALGORITHM', 'bcrypt')
+    monkeypatch.setenv('PASSWORD_COST', '4')
+    monkeypatch.setenv('PASSWORD_WORKERS', '1')
+    monkeypatch.setenv('LOGIN_MAX_FAILURES', '3')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        # A user saved with the old settings (Werkzeug PBKDF2)
+        legacy = User(username='eski', first_name='Eski', last_name='Kullanıcı')
+        legacy.password_hash = generate_password_hash('eski123', method='pbkdf2:sha256:1000')
+        db.session.add(legacy)
+        db.session.commit()
+        db.session.remove()
+
+    yield test_app
+
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def login(client, username, password):
+    return client.post('/auth/giris', data={'username': username, 'password': password})
+
+class TestPasswordService:
+    """Test hashing, verification and parameter detection"""
+
+    def test_pool_round_trip(self):
+        """Hashes computed in the process pool verify in both algorithms"""
+        for algorithm, cost in (('bcrypt', 4), ('pbkdf2', 1000)):
+            service = PasswordService(algorithm, cost, workers=1)
+            password_hash = service.hash('gizli')
+            assert hash_parameters(password_hash) == (algorithm, cost)
+            assert service.verify(password_hash, 'gizli')
+            assert not service.verify(password_hash, 'yanlış')
+            assert not service.needs_rehash(password_hash)
+
+    def test_needs_rehash(self):
+        """Hashes with another algorithm, cost or an unknown format are upgraded"""
+        service = PasswordService('bcrypt', 5, workers=0)
+        assert service.needs_rehash(PasswordService('bcrypt', 4, workers=0).hash('x'))
+        assert service.needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:1000'))
+        assert service.needs_rehash(generate_password_hash('x', method='scrypt'))
+        assert hash_parameters('pbkdf2:sha256$salt$hash') == ('pbkdf2', 600000)
+        with pytest.raises(ValueError):
+            PasswordService('md5')
+
+    def test_full_queue_is_rejected(self):
+        """Callers give up when no pool slot frees up in time"""
+        service = PasswordService('bcrypt', 4, workers=1, queue_size=0, timeout=0.01)
+        service.hash('ısınma')
+        slots = _get_pool(1, 0).slots
+        slots.acquire()
+        try:
+            with pytest.raises(PasswordServiceBusy):
+                service.hash('gizli')
+        finally:
+            slots.release()
+
+class TestFailedLoginCache:
+    """Test the per-user and per-address failure limits"""
+
+    def test_limits_and_reset(self):
+        cache = FailedLoginCache(max_failures=2, max_failures_per_address=3, window=60)
+        cache.record_failure('Admin', '10.0.0.1')
+        assert cache.retry_after('admin', '10.0.0.1') == 0
+        cache.record_failure('admin', '10.0.0.1')
+        assert 0 < cache.retry_after('ADMIN', '10.0.0.2') <= 60
+
+        cache.reset('admin')
+        assert cache.retry_after('admin', '10.0.0.2') == 0
+        # The address counter survives a successful login
+        cache.record_failure('baska', '10.0.0.1')
+        assert cache.retry_after('ucuncu', '10.0.0.1') > 0
+
+    def test_window_expires(self):
+        cache = FailedLoginCache(max_failures=1, window=0)
+        cache.record_failure('admin')
+        assert cache.retry_after('admin') == 0
+
+    def test_bounded_size(self):
+        cache = FailedLoginCache(max_failures=1, max_entries=10)
+        for index in range(100):
+            cache.record_failure(f'sahte{index}')
+        assert cache.retry_after('sahte0') == 0
+        assert cache.retry_after('sahte99') > 0
+
+class TestLogin:
+    """Test the login route on top of the password service"""
+
+    def test_login_rehashes_legacy_hash(self, app, client):
+        """A successful login upgrades the stored hash to the configured parameters"""
+        response = login(client, 'eski', 'eski123')
+        assert response.status_code == 302
+        with app.app_context():
+            password_hash = User.query.filter_by(username='eski').one().password_hash
+        assert hash_parameters(password_hash) == ('bcrypt', 4)
+
+        client.get('/auth/cikis')
+        assert login(client, 'eski', 'eski123').status_code == 302
+
+    def test_repeated_failures_skip_hashing(self, app, client, monkeypatch):
+        """After the limit even the right password is refused without computing a hash"""
+        for _ in range(3):
+            assert 'Hatalı kullanıcı adı' in login(client, 'eski', 'yanlış').get_data(as_text=True)
+
+        service = app.extensions['password_service']
+        def fail(*args):
+            raise AssertionError('hash computed for a blocked login')
+        monkeypatch.setattr(service, 'verify', fail)
+
+        response = login(client, 'eski', 'eski123')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert 'Çok fazla hatalı giriş' in response.get_data(as_text=True)
+
+    def test_register_uses_configured_algorithm(self, app, client):
+        client.post('/auth/kayit', data={'username': 'yeni', 'first_name': 'Yeni', 'last_name': 'Oyuncu',
+                                         'password': 'yeni1234', 'confirm_password': 'yeni1234'})
+        with app.app_context():
+            user = User.query.filter_by(username='yeni').one()
+            assert hash_parameters(user.password_hash) == ('bcrypt', 4)
+            assert user.check_password('yeni1234')
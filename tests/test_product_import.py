@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Product Import Tests
+Test cases for the bulk CSV / JSONL product import endpoint, job and CLI
+"""
+
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from models.product import Product, Category
+from models.review import ProductRatingStats
+from models.product_import import ProductImport
+from models.job import Job
+from utils.dashboard import get_counter
+from utils.jobs import get_job_runner
+from utils.product_import import ProductImporter
+
+JSON = {'Accept': 'application/json'}
+
+CSV_ROWS = '\n'.join([
+    'name,brand,model,category,price,stock_quantity,is_active',
+    'Galaksi Savaşları,Nova,PC-1,{category},499.90,0,evet',
+    'Kuzey Işıkları,Nova,PC-2,{upper},250,12,1',
+    'Hatalı Fiyat,Nova,PC-3,{category},-5,3,1',
+    'Kayıp Kategori,Nova,PC-4,Uzay Oyunları,10,3,1',
+    'Markasız,,PC-5,{category},10,3,1',
+])
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with a private upload folder; jobs run only when drained"""
+    db_fd, db_path = tempfile.mkstemp()
+    upload_dir = tempfile.mkdtemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('IMPORT_FOLDER', upload_dir)
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    yield test_app
+
+    with test_app.app_context():
+        get_job_runner().shutdown(timeout=10)
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+    for name in os.listdir(upload_dir):
+        os.unlink(os.path.join(upload_dir, name))
+    os.rmdir(upload_dir)
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+def upload(client, content, filename='katalog.csv', **form):
+    return client.post('/admin/urunler/ice-aktar', headers=JSON, content_type='multipart/form-data',
+                       data=dict(form, file=(io.BytesIO(content.encode('utf-8')), filename)))
+
+def catalog_csv(app):
+    with app.app_context():
+        category = Category.query.filter_by(is_active=True).first().name
+    return CSV_ROWS.format(category=category, upper=category.upper())
+
+class TestProductImport:
+    """Test validation, upsert and the derived catalog data"""
+
+    def test_csv_import_reports_row_errors(self, app, admin_client):
+        """Valid rows are inserted, invalid ones are reported with their line numbers"""
+        response = upload(admin_client, catalog_csv(app))
+        assert response.status_code == 200
+        report = response.json
+        assert report['status'] == 'done'
+        assert (report['processed'], report['created'], report['updated'], report['failed']) == (5, 2, 0, 3)
+        assert [error['row'] for error in report['errors']] == [4, 5, 6]
+        assert 'Fiyat' in report['errors'][0]['message']
+        assert 'Uzay Oyunları' in report['errors'][1]['message']
+        assert 'Marka ve model' in report['errors'][2]['message']
+        assert report['rows_per_second'] > 0
+
+        with app.app_context():
+            galaxy = Product.query.filter_by(brand='Nova', model='PC-1').one()
+            assert galaxy.stock_quantity == 0
+            assert galaxy.price == 499.90
+            assert get_counter('products') == 2
+            assert get_counter('active_products') == 2
+            assert ProductRatingStats.query.count() == 2
+            indexed = db.session.execute(text('SELECT count(*) FROM products_fts')).scalar()
+            assert indexed == 2
+            assert os.listdir(app.config['IMPORT_FOLDER']) == []
+
+    def test_jsonl_upsert_by_brand_and_model(self, app, admin_client):
+        """Matching rows update the product; columns missing from the row are kept"""
+        upload(admin_client, catalog_csv(app))
+        with app.app_context():
+            category_id = Category.query.filter_by(is_active=True).first().id
+            Product.query.filter_by(model='PC-2').one().description = 'Eski açıklama'
+            db.session.commit()
+
+        lines = [
+            {'name': 'Kuzey Işıkları GOTY', 'brand': 'Nova', 'model': 'PC-2', 'category_id': category_id,
+             'price': 199.0, 'stock_quantity': 4, 'is_active': False},
+            {'name': 'Yeni Oyun', 'brand': 'Nova', 'model': 'PC-9', 'category_id': category_id,
+             'price': 99.5, 'stock_quantity': 1},
+            'bozuk satır',
+        ]
+        content = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+        report = upload(admin_client, content, filename='katalog.jsonl').json
+        assert (report['created'], report['updated'], report['failed']) == (1, 1, 1)
+        assert report['errors'] == [{'row': 3, 'message': 'Geçersiz JSON'}]
+
+        with app.app_context():
+            updated = Product.query.filter_by(model='PC-2').one()
+            assert (updated.name, updated.price, updated.is_active) == ('Kuzey Işıkları GOTY', 199.0, False)
+            assert updated.description == 'Eski açıklama'
+            assert Product.query.count() == 3
+            assert get_counter('active_products') == 2
+
+    def test_large_files_run_in_background(self, app, admin_client):
+        """Uploads above the inline limit are queued and can be polled"""
+        app.config['IMPORT_INLINE_MAX_BYTES'] = 0
+        response = upload(admin_client, catalog_csv(app))
+        assert response.status_code == 202
+        assert response.json['status'] == 'pending'
+        status_url = response.json['status_url']
+        assert admin_client.get(status_url).json['progress'] == 0
+
+        with app.app_context():
+            assert get_job_runner().run_pending() == 1
+        status = admin_client.get(status_url).json
+        assert (status['status'], status['progress'], status['created'], status['failed']) == ('done', 100, 2, 3)
+
+    def test_background_import_renews_its_lease(self, app, admin_client, monkeypatch):
+        """Each batch renews the job lease, so a long import is not claimed and run twice"""
+        flush = ProductImporter._flush
+        reclaimed = []
+        def slow_flush(self, batch):
+            Job.query.one().locked_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_LEASE_SECONDS'] + 1)
+            db.session.commit()
+            flush(self, batch)
+            reclaimed.append(get_job_runner().claim())
+        monkeypatch.setattr(ProductImporter, '_flush', slow_flush)
+        app.config['IMPORT_INLINE_MAX_BYTES'] = 0
+        app.config['IMPORT_BATCH_SIZE'] = 1
+        status_url = upload(admin_client, catalog_csv(app)).json['status_url']
+
+        with app.app_context():
+            assert get_job_runner().run_pending() == 1
+            assert len(reclaimed) > 1 and not any(reclaimed)
+            assert Job.query.count() == 0
+            assert Product.query.filter(Product.brand == 'Nova').count() == 2
+        assert admin_client.get(status_url).json['status'] == 'done'
+
+    def test_unexpected_errors_fail_the_import(self, app, admin_client, monkeypatch):
+        """A database error mid-import marks it failed, removes the upload and fails the job"""
+        def locked(self, *args):
+            raise OperationalError('UPDATE products', {}, Exception('database is locked'))
+        monkeypatch.setattr(ProductImporter, '_flush', locked)
+        app.config['IMPORT_INLINE_MAX_BYTES'] = 0
+        status_url = upload(admin_client, catalog_csv(app)).json['status_url']
+
+        with app.app_context():
+            get_job_runner().run_pending()
+            job = Job.query.one()
+            assert job.status == Job.FAILED
+            assert 'database is locked' in job.last_error
+        status = admin_client.get(status_url).json
+        assert status['status'] == 'failed'
+        assert 'database is locked' in status['last_error']
+        assert os.listdir(app.config['IMPORT_FOLDER']) == []
+
+    def test_unexpected_errors_inline(self, app, admin_client, monkeypatch):
+        """A database error in a small upload is reported as a failed import, not a server error"""
+        def locked(self, *args):
+            raise OperationalError('UPDATE products', {}, Exception('database is locked'))
+        monkeypatch.setattr(ProductImporter, '_flush', locked)
+        response = upload(admin_client, catalog_csv(app))
+        assert response.status_code == 200
+        assert response.json['status'] == 'failed'
+        assert 'database is locked' in response.json['last_error']
+        assert os.listdir(app.config['IMPORT_FOLDER']) == []
+
+    def test_rejected_uploads(self, app, admin_client):
+        """Unknown formats are rejected before anything is stored"""
+        response = upload(admin_client, 'a,b', filename='katalog.xlsx')
+        assert response.status_code == 400
+        assert admin_client.post('/admin/urunler/ice-aktar', headers=JSON).status_code == 400
+        assert admin_client.get('/admin/urunler/ice-aktar').status_code == 200
+        with app.app_context():
+            assert ProductImport.query.count() == 0
+
+    def test_cli_import(self, app):
+        """flask import-products imports a file and prints a summary"""
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            handle.write(catalog_csv(app))
+        try:
+            result = app.test_cli_runner().invoke(args=['import-products', path, '--batch-size', '1'])
+        finally:
+            os.unlink(path)
+        assert '2 ürün eklendi, 0 ürün güncellendi, 3 satır hatalı' in result.output
+        assert 'Satır 4:' in result.output
+        with app.app_context():
+            assert Product.query.count() == 2
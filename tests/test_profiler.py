@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL Profiler Tests
+Test cases for per-request query profiling and N+1 detection
+"""
+
+import copy
+import pytest
+import os
+import tempfile
+import time
+from flask import g
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from models.user import User
+from models.order import Order
+from utils.profiler import PROFILE_HEADER, ProfileLog, _RequestProfile, fingerprint, profile_log
+from utils.sample_data import generate_dataset, SAMPLE_PASSWORD
+
+def make_app(monkeypatch, db_path, profiler=True):
+    """Create a test application with the profiler switched on or off"""
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('SQL_PROFILER', '1' if profiler else '0')
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+    return test_app
+
+@pytest.fixture
+def db_path():
+    """Temporary database file"""
+    db_fd, path = tempfile.mkstemp()
+    profile_log.clear()
+    yield path
+    profile_log.clear()
+    os.close(db_fd)
+    os.unlink(path)
+
+@pytest.fixture
+def app(monkeypatch, db_path):
+    """Profiled application with a small generated dataset"""
+    test_app = make_app(monkeypatch, db_path)
+    with test_app.app_context():
+        generate_dataset(users=5, products=50, reviews=100, carts=0, orders=40, seed=1)
+        yield test_app
+        db.session.remove()
+        db.engine.dispose()
+
+def busiest_customer():
+    """Username of the customer with the most orders"""
+    user_id = db.session.query(Order.user_id).group_by(Order.user_id) \
+        .order_by(func.count().desc()).first()[0]
+    return db.session.get(User, user_id).username
+
+class TestFingerprint:
+    """Test SQL statement normalization"""
+
+    def test_literals_and_in_lists_are_folded(self):
+        """Statements differing only in literals share a fingerprint"""
+        first = fingerprint("SELECT * FROM orders WHERE id IN (1, 2, 3) AND status = 'pending'")
+        second = fingerprint("SELECT * FROM orders WHERE id IN (7)  AND status = 'shipped'")
+        assert first == second == 'SELECT * FROM orders WHERE id IN (?, ...) AND status = ?'
+        # Identifiers containing digits are kept
+        assert fingerprint('SELECT col1 FROM t2 LIMIT 10') == 'SELECT col1 FROM t2 LIMIT ?'
+
+    def test_ring_is_bounded(self):
+        """Only the most recent profiles are kept"""
+        log = ProfileLog(size=3)
+        ids = [log.add({'n_plus_one': []}) for _ in range(5)]
+        assert len(log) == 3
+        assert [entry['id'] for entry in log.entries()] == ids[:1:-1]
+        assert log.get(ids[0]) is None
+
+class TestProfiler:
+    """Test request profiling"""
+
+    def test_n_plus_one_is_reported_with_template_line(self, app):
+        """Per-order item counts on the order history page are flagged"""
+        client = app.test_client()
+        client.post('/auth/giris', data={'username': busiest_customer(), 'password': SAMPLE_PASSWORD})
+
+        response = client.get('/auth/siparislerim')
+        assert response.status_code == 200
+        header = dict(part.split('=') for part in response.headers[PROFILE_HEADER].split('; '))
+        assert int(header['n_plus_one']) >= 1
+        assert 'db;dur=' in response.headers['Server-Timing']
+
+        profile = profile_log.get(int(header['id']))
+        assert profile['query_count'] == int(header['queries'])
+        location = profile['n_plus_one'][0]['locations'][0][0]
+        assert location.startswith('templates/auth/orders.html:')
+        assert 'models/order.py:' in location
+
+    def test_admin_panel_lists_profiles(self, app):
+        """The admin panel shows recorded requests but not its own"""
+        client = app.test_client()
+        client.get('/')
+        client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+
+        response = client.get('/admin/performans')
+        assert response.status_code == 200
+        assert PROFILE_HEADER not in response.headers
+        assert 'GET /' in response.get_data(as_text=True)
+
+        profile_id = profile_log.entries()[-1]['id']
+        assert client.get(f'/admin/performans/{profile_id}').status_code == 200
+        client.post('/admin/performans/temizle')
+        assert len(profile_log) == 0
+
+    def test_failed_statements_leave_no_state(self, app):
+        """Statements that raise are neither recorded nor left pending on the connection"""
+        with app.test_request_context('/'), db.engine.connect() as connection:
+            g.sql_profile = _RequestProfile()
+            info = copy.deepcopy(dict(connection.info))
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text('SELECT * FROM missing_table'))
+            assert connection.info == info
+            assert g.sql_profile.query_count == 0
+
+            # The next statement is timed from its own start, not a failed one's
+            time.sleep(0.2)
+            assert connection.execute(text('SELECT 1')).scalar() == 1
+            assert connection.info == info
+            assert g.sql_profile.query_count == 1
+            count, seconds, _ = g.sql_profile.statements['SELECT ?']
+            assert count == 1
+            assert seconds < 0.2
+
+    def test_disabled_by_default(self, monkeypatch, db_path):
+        """Without SQL_PROFILER nothing is recorded"""
+        app = make_app(monkeypatch, db_path, profiler=False)
+        response = app.test_client().get('/')
+        assert response.status_code == 200
+        assert PROFILE_HEADER not in response.headers
+        assert len(profile_log) == 0
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
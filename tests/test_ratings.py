@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rating Aggregate Tests
+Test cases for incremental product rating sums, counts and star histograms
+"""
+
+import pytest
+import os
+import tempfile
+from app import create_app, db
+from models.user import User
+from models.product import Product, Category
+from models.review import Review, ProductRatingStats
+from utils.ratings import rebuild_rating_stats
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        db.session.add(Product(name='Puanlı Ürün', price=100.0, stock_quantity=5,
+                               category_id=Category.query.first().id))
+        for i in range(3):
+            user = User(username=f'yorumcu{i}')
+            user.set_password('yorum123')
+            db.session.add(user)
+        db.session.commit()
+
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+def add_review(username, rating, approved=True):
+    """Insert a review for the test product"""
+    product = Product.query.filter_by(name='Puanlı Ürün').first()
+    user = User.query.filter_by(username=username).first()
+    review = Review(user_id=user.id, product_id=product.id, rating=rating, is_approved=approved)
+    db.session.add(review)
+    db.session.commit()
+    return review
+
+def stats_of():
+    """Return (product, stats) with fresh state"""
+    db.session.expire_all()
+    product = Product.query.filter_by(name='Puanlı Ürün').first()
+    return product, ProductRatingStats.query.get(product.id)
+
+class TestRatingAggregates:
+    """Test O(1) maintained rating aggregates"""
+
+    def test_add_updates_sum_count_and_histogram(self, app):
+        """Approved reviews update the aggregate and the product rating"""
+        with app.app_context():
+            add_review('yorumcu0', 5)
+            add_review('yorumcu1', 2)
+            product, stats = stats_of()
+            assert (stats.rating_sum, stats.rating_count) == (7, 2)
+            assert (stats.star_5, stats.star_2, stats.star_1) == (1, 1, 0)
+            assert product.rating == 3.5
+            assert product.review_count == 2
+            assert Review.get_average_rating(product.id) == 3.5
+
+    def test_approve_reject_and_delete(self, app):
+        """Moderation transitions add and remove the review's contribution"""
+        with app.app_context():
+            add_review('yorumcu0', 4)
+            pending = add_review('yorumcu1', 1, approved=False)
+            product, stats = stats_of()
+            assert stats.rating_count == 1
+
+            pending.is_approved = True
+            db.session.commit()
+            product, stats = stats_of()
+            assert (stats.rating_count, stats.star_1) == (2, 1)
+            assert product.rating == 2.5
+
+            pending = Review.query.get(pending.id)
+            pending.is_approved = False
+            db.session.commit()
+            product, stats = stats_of()
+            assert (stats.rating_count, stats.star_1) == (1, 0)
+
+            db.session.delete(Review.query.filter_by(rating=4).first())
+            db.session.commit()
+            product, stats = stats_of()
+            assert (stats.rating_sum, stats.rating_count, stats.star_4) == (0, 0, 0)
+            assert product.rating == 0.0
+
+    def test_rebuild_repairs_drift(self, app):
+        """The repair command recomputes aggregates from reviews"""
+        with app.app_context():
+            add_review('yorumcu0', 3)
+            add_review('yorumcu1', 5)
+            product, stats = stats_of()
+            stats.rating_count = 99
+            stats.star_3 = 0
+            db.session.commit()
+
+            rebuild_rating_stats()
+            db.session.commit()
+            product, stats = stats_of()
+            assert (stats.rating_sum, stats.rating_count, stats.star_3, stats.star_5) == (8, 2, 1, 1)
+            assert product.rating == 4.0
+
+    def test_cli_command(self, app):
+        """rebuild-ratings is registered as a CLI command"""
+        result = app.test_cli_runner().invoke(args=['rebuild-ratings'])
+        assert 'puan özeti yeniden oluşturuldu' in result.output
+
+    def test_review_route_and_histogram(self, client, app):
+        """Adding a review via the route shows the histogram on the detail page"""
+        with app.app_context():
+            product, _ = stats_of()
+            client.post('/auth/giris', data={'username': 'yorumcu2', 'password': 'yorum123'})
+            client.post(f'/urunler/{product.id}/yorum-ekle', data={'rating': 4, 'title': 'İyi'})
+
+            product, stats = stats_of()
+            assert (stats.rating_count, stats.star_4) == (1, 1)
+            response = client.get(f'/urunler/{product.id}')
+            html = response.data.decode('utf-8')
+            assert 'rating-histogram' in html
+            assert 'yorumcu2' in html
+
+    def test_bulk_approve(self, client, app):
+        """Bulk approval repairs the affected products in one pass"""
+        with app.app_context():
+            add_review('yorumcu0', 5, approved=False)
+            add_review('yorumcu1', 3, approved=False)
+            client.post('/auth/giris', data={'username': 'admin', 'password': 'admin123'})
+            response = client.post('/admin/yorumlar/toplu-onayla', follow_redirects=True)
+            assert response.status_code == 200
+
+            product, stats = stats_of()
+            assert (stats.rating_count, stats.rating_sum) == (2, 8)
+            assert product.review_count == 2
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sample Data Tests
+Test cases for the high-volume synthetic dataset generator
+"""
+
+import pytest
+import os
+import tempfile
+from datetime import datetime
+from sqlalchemy import func
+from app import create_app, db
+from models.user import User
+from models.product import Product
+from models.review import Review, ProductRatingStats
+from models.order import CartItem, CartSummary, Order, OrderItem
+from utils.sample_data import generate_dataset, SAMPLE_PASSWORD
+from utils.dashboard import load_dashboard_stats
+from utils.search import apply_search
+from utils.cart import calculate_shipping
+
+SIZES = dict(users=40, products=300, reviews=1500, carts=10, orders=120)
+
+def make_app(monkeypatch, db_path):
+    """Create a test application on the given database file"""
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+    return test_app
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with a small generated dataset"""
+    db_fd, db_path = tempfile.mkstemp()
+    test_app = make_app(monkeypatch, db_path)
+
+    with test_app.app_context():
+        generate_dataset(seed=7, chunk_size=100, **SIZES)
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def snapshot():
+    """Timestamp-free content of the generated tables"""
+    return (
+        [tuple(row) for row in db.session.query(User.username, User.email, User.first_name).order_by(User.id)],
+        [tuple(row) for row in db.session.query(Product.name, Product.price, Product.stock_quantity)
+         .order_by(Product.id)],
+        [tuple(row) for row in db.session.query(Review.user_id, Review.product_id, Review.rating)
+         .order_by(Review.id)],
+        [tuple(row) for row in db.session.query(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity)
+         .order_by(OrderItem.id)]
+    )
+
+class TestGenerateDataset:
+    """Test the synthetic dataset generator"""
+
+    def test_rows_and_references(self, app):
+        """Requested volumes are inserted and every foreign key points at a real row"""
+        assert User.query.filter_by(is_admin=False).count() == SIZES['users']
+        assert Product.query.count() == SIZES['products']
+        assert Review.query.count() == SIZES['reviews']
+        assert Order.query.count() == SIZES['orders']
+        assert db.session.query(func.count(func.distinct(CartItem.user_id))).scalar() == SIZES['carts']
+
+        orphans = Review.query.filter(~Review.product_id.in_(db.session.query(Product.id))).count()
+        orphans += OrderItem.query.filter(~OrderItem.order_id.in_(db.session.query(Order.id))).count()
+        assert orphans == 0
+
+    def test_orders_are_consistent(self, app):
+        """Order totals match their items and status timestamps follow each other"""
+        for order in Order.query.all():
+            subtotal = sum(item.unit_price * item.quantity for item in OrderItem.query.filter_by(order_id=order.id))
+            assert order.total_amount == pytest.approx(subtotal + calculate_shipping(subtotal), abs=0.01)
+            assert (order.delivered_at is not None) == (order.status == 'Teslim Edildi')
+            if order.delivered_at:
+                assert order.created_at < order.shipped_at < order.delivered_at
+            if order.status == 'İptal':
+                assert order.payment_status == 'İptal'
+
+    def test_popularity_is_skewed(self, app):
+        """The most reviewed tenth of the catalog collects a large share of reviews"""
+        per_product = sorted((count for _, count in db.session.query(Review.product_id, func.count())
+                              .group_by(Review.product_id)), reverse=True)
+        top = sum(per_product[:SIZES['products'] // 10])
+        assert top > 0.4 * SIZES['reviews']
+
+    def test_derived_data_is_rebuilt(self, app):
+        """Search index, rating summaries, counters and cart summaries cover the new rows"""
+        product = Product.query.filter(Product.review_count > 0).first()
+        approved = Review.query.filter_by(product_id=product.id, is_approved=True).all()
+        assert product.review_count == len(approved)
+        assert product.rating == pytest.approx(sum(r.rating for r in approved) / len(approved))
+        assert ProductRatingStats.query.count() == SIZES['products']
+
+        query, _ = apply_search(Product.query, product.model)
+        assert product.id in [p.id for p in query]
+
+        stats = load_dashboard_stats()
+        assert stats.total_orders == SIZES['orders']
+        assert stats.total_products == SIZES['products']
+        assert CartSummary.query.count() == SIZES['carts']
+
+    def test_dates_round_trip(self, app):
+        """Bulk inserted timestamps load as datetimes and compare in SQL"""
+        product = Product.query.order_by(Product.created_at.desc()).first()
+        assert isinstance(product.created_at, datetime)
+        assert Product.query.filter(Product.created_at <= product.created_at).count() == SIZES['products']
+
+    def test_generated_user_can_log_in(self, app):
+        """Generated users share the documented sample password"""
+        user = User.query.filter_by(is_admin=False, active=True).first()
+        client = app.test_client()
+        response = client.post('/auth/giris', data={'username': user.username, 'password': SAMPLE_PASSWORD})
+        assert response.status_code == 302
+
+    def test_same_seed_same_data(self, monkeypatch):
+        """Two fresh databases generated from one seed hold the same rows"""
+        snapshots = []
+        for _ in range(2):
+            db_fd, db_path = tempfile.mkstemp()
+            test_app = make_app(monkeypatch, db_path)
+            with test_app.app_context():
+                generate_dataset(seed=3, **SIZES)
+                snapshots.append(snapshot())
+                db.session.remove()
+                db.engine.dispose()
+            os.close(db_fd)
+            os.unlink(db_path)
+
+        assert snapshots[0] == snapshots[1]
+        assert len(snapshots[0][1]) == SIZES['products']
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Index Tests
+Test cases for the FTS5 product search index and Turkish normalization
+"""
+
+import pytest
+import os
+import tempfile
+from app import create_app, db
+from models.product import Product, Category
+from utils.search import normalize_turkish, build_match_query, is_enabled
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application on a fresh database"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    test_app.config['WTF_CSRF_ENABLED'] = False
+
+    with test_app.app_context():
+        category = Category.query.first()
+        db.session.add_all([
+            Product(name='Çocuk Bisikleti', description='Hafif alüminyum kadro',
+                    price=2500.0, stock_quantity=5, category_id=category.id, brand='Bisan'),
+            Product(name='IŞIKLI Klavye', description='Mekanik klavye, RGB ışık',
+                    price=900.0, stock_quantity=8, category_id=category.id, brand='İnca'),
+            Product(name='Klavye Kılıfı', description='Silikon kılıf',
+                    price=120.0, stock_quantity=30, category_id=category.id, brand='Generic'),
+            Product(name='Oyun Faresi', description='Her klavye ile uyumlu kablosuz fare',
+                    price=450.0, stock_quantity=12, category_id=category.id, brand='Generic'),
+        ])
+        db.session.commit()
+
+        yield test_app
+
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+class TestTurkishNormalization:
+    """Test Turkish-aware case folding"""
+
+    def test_dotted_and_dotless_i(self):
+        """İ/i and I/ı fold to the same token"""
+        assert normalize_turkish('İSTANBUL') == normalize_turkish('istanbul')
+        assert normalize_turkish('IŞIK') == normalize_turkish('ışık') == 'isik'
+
+    def test_diacritics_are_folded(self):
+        """ş, ğ, ç, ö, ü match their ASCII forms"""
+        assert normalize_turkish('Şeker Güzel Çiçek Öğün Üzüm') == 'seker guzel cicek ogun uzum'
+
+    def test_match_query_is_quoted(self):
+        """User input cannot inject FTS5 operators"""
+        assert build_match_query('klavye" OR *') == '"klavye"* "or"*'
+        assert build_match_query('  ') is None
+
+class TestSearchIndex:
+    """Test FTS5-backed search route"""
+
+    def test_index_is_enabled(self, app):
+        """FTS5 index is created for SQLite databases"""
+        with app.app_context():
+            assert is_enabled()
+
+    def test_turkish_case_insensitive_search(self, client):
+        """Search matches regardless of Turkish casing and diacritics"""
+        response = client.get('/ara?q=cocuk')
+        assert 'Çocuk Bisikleti' in response.data.decode('utf-8')
+
+        response = client.get('/ara?q=ışıklı')
+        assert 'IŞIKLI Klavye' in response.data.decode('utf-8')
+
+    def test_bm25_ranks_name_matches_first(self, client):
+        """Name matches rank above description-only matches"""
+        response = client.get('/ara?q=klavye')
+        html = response.data.decode('utf-8')
+        assert html.index('Klavye Kılıfı') < html.index('Oyun Faresi')
+        assert html.index('IŞIKLI Klavye') < html.index('Oyun Faresi')
+
+        response = client.get('/ara?q=ışık')
+        html = response.data.decode('utf-8')
+        assert 'IŞIKLI Klavye' in html
+        assert 'Klavye Kılıfı' not in html
+
+    def test_search_combines_with_filters(self, client):
+        """Search results still honour price filters"""
+        response = client.get('/ara?q=klavye&max_fiyat=500')
+        html = response.data.decode('utf-8')
+        assert 'Klavye Kılıfı' in html
+        assert 'IŞIKLI Klavye' not in html
+
+    def test_index_follows_product_updates(self, client, app):
+        """Renamed products are found by their new name only"""
+        with app.app_context():
+            product = Product.query.filter_by(name='Klavye Kılıfı').first()
+            product.name = 'Fare Altlığı'
+            db.session.commit()
+
+        response = client.get('/ara?q=ALTLIĞI')
+        assert 'Fare Altlığı' in response.data.decode('utf-8')
+
+        response = client.get('/ara?q=klavye')
+        assert 'Fare Altlığı' not in response.data.decode('utf-8')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Tests
+Test cases for schema initialization, serving mode and startup timing
+"""
+
+import pytest
+import os
+import tempfile
+from sqlalchemy import inspect, text
+from app import create_app, db
+from models.product import Product, Category
+from utils.search import apply_search
+from utils.startup import init_database, schema_is_current, schema_fingerprint, add_missing_columns
+
+def make_app(monkeypatch, db_path, auto_init=True):
+    """Create a test application, optionally in serving mode"""
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+    monkeypatch.setenv('DATABASE_AUTO_INIT', '1' if auto_init else '0')
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    return test_app
+
+@pytest.fixture
+def db_path():
+    """Temporary database file"""
+    db_fd, path = tempfile.mkstemp()
+    yield path
+    os.close(db_fd)
+    os.unlink(path)
+
+def dispose():
+    db.session.remove()
+    db.engine.dispose()
+
+class TestStartup:
+    """Test application startup modes"""
+
+    def test_initialized_database_is_not_set_up_again(self, monkeypatch, db_path):
+        """The first start stamps the schema, later starts skip reflection and seeding"""
+        app = make_app(monkeypatch, db_path)
+        with app.app_context():
+            assert schema_is_current()
+            assert db.session.execute(text('PRAGMA user_version')).scalar() == schema_fingerprint()
+            assert init_database() is False
+            dispose()
+
+        app = make_app(monkeypatch, db_path)
+        timings = app.extensions['startup_timer'].as_dict()
+        assert set(timings['phases']) >= {'uzantılar', 'blueprintler', 'veritabanı'}
+        assert timings['total_ms'] > 0
+        with app.app_context():
+            assert Category.query.count() == 8
+            dispose()
+
+    def test_dropped_table_triggers_setup(self, monkeypatch, db_path):
+        """A stamped database that lost a table is set up again"""
+        app = make_app(monkeypatch, db_path)
+        with app.app_context():
+            db.session.execute(text('DROP TABLE order_sequences'))
+            db.session.commit()
+            assert not schema_is_current()
+            assert init_database() is True
+            assert 'order_sequences' in inspect(db.engine).get_table_names()
+            dispose()
+
+    def test_new_columns_are_added_to_existing_tables(self, monkeypatch, db_path):
+        """A database created before a nullable column existed gets the column"""
+        app = make_app(monkeypatch, db_path)
+        with app.app_context():
+            # Simulate a database stamped by an older release
+            db.session.execute(text('ALTER TABLE products DROP COLUMN image_variants'))
+            db.session.execute(text('PRAGMA user_version = 0'))
+            db.session.commit()
+            assert not schema_is_current()
+            assert init_database() is True
+            columns = {column['name'] for column in inspect(db.engine).get_columns('products')}
+            assert 'image_variants' in columns
+            assert add_missing_columns() == []
+            dispose()
+
+    def test_serving_mode_needs_init_db(self, monkeypatch, db_path):
+        """Serving mode never touches the database; init-db prepares it once"""
+        app = make_app(monkeypatch, db_path, auto_init=False)
+        assert 'veritabanı' not in app.extensions['startup_timer'].as_dict()['phases']
+        with app.app_context():
+            assert inspect(db.engine).get_table_names() == []
+            dispose()
+
+        result = app.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0
+        assert 'Veritabanı hazır.' in result.output
+        with app.app_context():
+            assert schema_is_current()
+            assert Category.query.count() == 8
+            dispose()
+
+    def test_serving_mode_uses_existing_search_index(self, monkeypatch, db_path):
+        """Search finds the full text index without the startup setup having run"""
+        app = make_app(monkeypatch, db_path)
+        with app.app_context():
+            category = Category.query.first()
+            db.session.add(Product(name='Çay Bardağı', price=45.0, stock_quantity=5,
+                                   category_id=category.id))
+            db.session.commit()
+            dispose()
+
+        # A fresh worker process has not looked up the FTS table yet
+        monkeypatch.setattr('utils.search._enabled_databases', {})
+        app = make_app(monkeypatch, db_path, auto_init=False)
+        with app.app_context():
+            query, relevance = apply_search(Product.query, 'cay')
+            assert relevance is not None
+            assert [product.name for product in query] == ['Çay Bardağı']
+            dispose()
+
+    def test_startup_report_command(self, monkeypatch, db_path):
+        """The CLI prints every startup phase"""
+        app = make_app(monkeypatch, db_path)
+        result = app.test_cli_runner().invoke(args=['startup-report'])
+        assert result.exit_code == 0
+        assert 'blueprintler' in result.output
+        assert 'create_app toplam' in result.output
+        with app.app_context():
+            dispose()
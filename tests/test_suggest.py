@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Suggestion Tests
+Test cases for the typeahead prefix index and /ara/oneri
+"""
+
+import pytest
+import os
+import tempfile
+from app import create_app, db
+from models.product import Product, Category
+from models.user import User
+from models.review import Review
+from utils import suggest
+from utils.suggest import SuggestionIndex
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create test application with a few products and a built index"""
+    db_fd, db_path = tempfile.mkstemp()
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_path}')
+
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+
+    with test_app.app_context():
+        user = User(username='yorumcu', email='yorumcu@example.com', first_name='Yo', last_name='Rum')
+        user.set_password('sifre123')
+        db.session.add_all([
+            user,
+            Product(name='Kablosuz Kulaklık Pro', brand='Şahin', price=900.0, category_id=1, review_count=7),
+            Product(name='Kulaklık Standı', brand='Kaya', price=150.0, category_id=1, review_count=2),
+            Product(name='Akıllı Saat', brand='Şahin', price=2500.0, category_id=1),
+        ])
+        db.session.commit()
+        db.session.remove()
+
+    assert test_app.extensions['suggestion_index'].wait(timeout=10)
+    yield test_app
+
+    with test_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def suggestions(client, query):
+    response = client.get('/ara/oneri', query_string={'q': query})
+    return [(item['type'], item['text']) for item in response.json['suggestions']]
+
+class TestSuggestionIndex:
+    """Test matching and ranking"""
+
+    def test_word_prefixes_with_turkish_folding(self, app):
+        """Any word of a name matches, without Turkish letters or case"""
+        client = app.test_client()
+        assert suggestions(client, 'kul') == [('product', 'Kablosuz Kulaklık Pro'),
+                                              ('product', 'Kulaklık Standı')]
+        assert suggestions(client, 'AKILLI s') == [('product', 'Akıllı Saat')]
+        assert suggestions(client, 'sah')[0] == ('brand', 'Şahin')
+        assert ('category', 'Elektronik') in suggestions(client, 'elek')
+        assert suggestions(client, '   ') == []
+
+        item = client.get('/ara/oneri?q=sahin').json['suggestions'][0]
+        assert item['url'] == '/ara?marka=%C5%9Eahin'
+
+    def test_writes_update_the_index(self, app):
+        """Renames, deactivation, new products and approved reviews are applied after commit"""
+        client = app.test_client()
+        with app.app_context():
+            stand = Product.query.filter_by(name='Kulaklık Standı').one()
+            stand.name = 'Mikrofon Standı'
+            Product.query.filter_by(name='Akıllı Saat').one().is_active = False
+            db.session.add(Product(name='Kulaklık Amfisi', price=1200.0, category_id=1, review_count=20))
+            db.session.commit()
+            product_id = stand.id
+
+        assert suggestions(client, 'kul') == [('product', 'Kulaklık Amfisi'),
+                                              ('product', 'Kablosuz Kulaklık Pro')]
+        assert suggestions(client, 'mik') == [('product', 'Mikrofon Standı')]
+        assert suggestions(client, 'akil') == []
+
+        with app.app_context():
+            user = User.query.filter_by(username='yorumcu').one()
+            for _ in range(30):
+                db.session.add(Review(user_id=user.id, product_id=product_id, rating=5, is_approved=True))
+            db.session.commit()
+        assert suggestions(client, 'stand') == [('product', 'Mikrofon Standı')]
+        assert suggestions(client, 'm')[0] == ('product', 'Mikrofon Standı')
+
+    def test_wide_prefix_results_are_cached_and_invalidated(self, app, monkeypatch):
+        """Prefixes matching many keys keep their top list until a matching entry changes"""
+        monkeypatch.setattr(suggest, 'SCAN_LIMIT', 1)
+        client = app.test_client()
+        index = app.extensions['suggestion_index']
+        assert suggestions(client, 'k')[0] == ('product', 'Kablosuz Kulaklık Pro')
+        assert 'k' in index._top
+
+        with app.app_context():
+            db.session.add(Product(name='Klavye', price=400.0, category_id=1, review_count=50))
+            db.session.commit()
+        assert not index._top
+        assert suggestions(client, 'k')[0] == ('product', 'Klavye')
+
+    def test_memory_budget_keeps_popular_products(self, app):
+        """A small budget indexes categories and then the most reviewed products"""
+        with app.app_context():
+            categories = Category.query.filter_by(is_active=True).count()
+            with db.engine.connect() as connection:
+                index = SuggestionIndex(memory_budget=1)
+                index.build(connection)
+                assert index.truncated
+                assert len(index) == categories
+                assert index.suggest('kul') == []
+
+                # Room for one more product than the categories alone
+                index = SuggestionIndex(memory_budget=index.memory + 1)
+                index.build(connection)
+        assert index.truncated
+        assert [item['text'] for item in index.suggest('kul')] == ['Kablosuz Kulaklık Pro']
+        assert index.stats()['memory_bytes'] >= index.memory_budget
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yük Testi Modülü
+Gerçek kullanıcı akışlarını eşzamanlı sanal kullanıcılarla çalıştırıp gecikme,
+verim ve istek başına SQL sorgu sayısını ölçer
+"""
+
+import http.cookiejar
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from sqlalchemy import event, text, update
+from app import db
+from models.user import User
+from models.product import Product, Category
+from utils.sample_data import SAMPLE_PASSWORD, generate_dataset
+
+SEARCH_TERMS = ['kulaklık', 'telefon', 'kitap', 'oyuncak', 'spor', 'kahve', 'kablo', 'çanta']
+SORTS = ['name', 'price_asc', 'price_desc', 'rating', 'newest']
+
+def seed_benchmark_data(products=1000, users=100, reviews=2000, orders=0, seed=42):
+    """
+    Ölçüm için generate_dataset ile gerçekçi kullanıcı, ürün, yorum ve sipariş ekler.
+
+    Ödeme akışı stok bitmesiyle kesilmesin diye tüm ürün stokları yükseltilir.
+    Kullanıcıların şifresi SAMPLE_PASSWORD'dür. Eklenen satır sayılarını döndürür.
+    """
+    from utils.cache import product_card_cache
+
+    counts = generate_dataset(users=users, products=products, reviews=reviews,
+                              orders=orders, seed=seed)
+    db.session.execute(update(Product).values(stock_quantity=1_000_000))
+    db.session.commit()
+    product_card_cache.clear()
+    return counts
+
+class QueryCounter:
+    """İş parçacığı başına çalıştırılan SQL ifadelerini sayar"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._local = threading.local()
+
+    def _count(self, *args):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+class InProcessClient:
+    """Flask test istemcisi üzerinden WSGI uygulamasını doğrudan çağırır"""
+
+    def __init__(self, app, counter):
+        self.client = app.test_client()
+        self.counter = counter
+
+    def request(self, method, path, data=None):
+        self.counter.reset()
+        response = self.client.open(path, method=method, data=data)
+        response.close()
+        return response.status_code, self.counter.count
+
+    def login(self, username, password):
+        return self.request('POST', '/auth/giris', {'username': username, 'password': password})
+
+class HttpClient:
+    """Çalışan yerel bir sunucuya çerez saklayan HTTP istemcisi (sorgu sayısı ölçülemez)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            _NoRedirect, urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def _open(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as error:
+            return error.code, ''
+
+    def request(self, method, path, data=None):
+        status, _ = self._open(method, path, data)
+        return status, None
+
+    def login(self, username, password):
+        _, html = self._open('GET', '/auth/giris')
+        token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', html)
+        data = {'username': username, 'password': password}
+        if token:
+            data['csrf_token'] = token.group(1)
+        return self.request('POST', '/auth/giris', data)
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Yönlendirmeleri takip etmez; 302 yanıtı tek istek olarak ölçülür"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class Recorder:
+    """Uç nokta bazında gecikme, hata ve sorgu sayısı örneklerini toplar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, endpoint, seconds, status, queries):
+        with self._lock:
+            entry = self.samples.setdefault(endpoint, {'latencies': [], 'queries': [], 'errors': 0})
+            entry['latencies'].append(seconds)
+            if queries is not None:
+                entry['queries'].append(queries)
+            if status >= 400:
+                entry['errors'] += 1
+
+def percentile(values, fraction):
+    """Sıralı listede doğrusal aradeğerlemeli yüzdelik"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+class VirtualUser:
+    """Gezinme, arama, ürün detayı, sepete ekleme ve ödeme akışlarını çalıştırır"""
+
+    def __init__(self, client, recorder, catalog, rng, admin=False):
+        self.client = client
+        self.recorder = recorder
+        self.catalog = catalog
+        self.rng = rng
+        self.admin = admin
+
+    def call(self, endpoint, method, path, data=None):
+        started = time.perf_counter()
+        status, queries = self.client.request(method, path, data)
+        self.recorder.record(endpoint, time.perf_counter() - started, status, queries)
+        return status
+
+    def run_iteration(self):
+        if self.admin:
+            self.call('admin.dashboard', 'GET', '/admin/')
+            self.call('admin.orders', 'GET', '/admin/siparisler')
+            self.call('admin.products', 'GET', '/admin/urunler')
+            return
+
+        rng = self.rng
+        product_id = rng.choice(self.catalog['products'])
+        # Gezinme
+        self.call('main.index', 'GET', '/')
+        self.call('products.index', 'GET', f'/urunler/?sirala={rng.choice(SORTS)}&sayfa={rng.randint(1, 3)}')
+        self.call('products.category', 'GET', f'/urunler/kategori/{rng.choice(self.catalog["categories"])}')
+        # Arama ve ürün detayı
+        self.call('main.search', 'GET', '/ara?' + urllib.parse.urlencode({'q': rng.choice(SEARCH_TERMS)}))
+        self.call('products.detail', 'GET', f'/urunler/{product_id}')
+        # Sepete ekleme ve ödeme
+        self.call('cart.add_item', 'POST', f'/sepet/ekle/{product_id}', {'quantity': 1})
+        self.call('cart.index', 'GET', '/sepet/')
+        self.call('cart.checkout', 'GET', '/sepet/odeme')
+        self.call('cart.place_order', 'POST', '/sepet/siparis-ver', {
+            'shipping_address': 'Yük Testi Mah. No:1 İstanbul',
+            'payment_method': 'Kredi Kartı'
+        })
+
+def load_catalog():
+    """Sanal kullanıcıların seçeceği ürün, kategori ve kullanıcı adlarını yükler"""
+    return {
+        'products': [pid for pid, in db.session.query(Product.id).filter(Product.is_active == True)],
+        'categories': [cid for cid, in db.session.query(Category.id)],
+        'users': [name for name, in db.session.query(User.username).filter(
+            User.is_admin == False, User.active == True).order_by(User.id)]
+    }
+
+def run_benchmark(app, base_url=None, vus=4, iterations=10, admin_vus=1,
+                  seed=42, admin_password='admin123'):
+    """
+    Akışları vus eşzamanlı sanal kullanıcı ile çalıştırır ve raporu döndürür.
+
+    base_url verilirse istekler o sunucuya HTTP ile, aksi halde app'in test
+    istemcisiyle süreç içinde gönderilir. Katalog her iki durumda da app'in
+    veritabanından okunur.
+    """
+    with app.app_context():
+        catalog = load_catalog()
+        counter = QueryCounter(db.engine)
+    if not catalog['products'] or len(catalog['users']) < vus:
+        raise ValueError('Yük testi için yeterli ürün veya kullanıcı yok; önce veri ekleyin.')
+
+    recorder = Recorder()
+    errors = []
+
+    def make_client():
+        return HttpClient(base_url) if base_url else InProcessClient(app, counter)
+
+    users = []
+    for index in range(vus + admin_vus):
+        client = make_client()
+        admin = index >= vus
+        if admin:
+            client.login('admin', admin_password)
+        else:
+            client.login(catalog['users'][index], SAMPLE_PASSWORD)
+        users.append(VirtualUser(client, recorder, catalog, random.Random(seed + index), admin))
+
+    barrier = threading.Barrier(len(users))
+
+    def worker(user):
+        barrier.wait()
+        try:
+            for _ in range(iterations):
+                user.run_iteration()
+        except Exception as error:  # raporda gösterilir, diğer kullanıcılar devam eder
+            errors.append(repr(error))
+
+    with counter:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    return build_report(recorder, elapsed, {
+        'mode': 'http' if base_url else 'in-process',
+        'base_url': base_url,
+        'vus': vus,
+        'admin_vus': admin_vus,
+        'iterations': iterations,
+        'seed': seed,
+        'dataset': {key: len(values) for key, values in catalog.items()},
+        'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'exceptions': errors
+    })
+
+def build_report(recorder, elapsed, meta):
+    """Örneklerden uç nokta bazında yüzdelik ve verim raporu oluşturur (ms)"""
+    endpoints = {}
+    total_requests = 0
+    total_errors = 0
+    for endpoint, entry in sorted(recorder.samples.items()):
+        latencies = sorted(entry['latencies'])
+        queries = entry['queries']
+        total_requests += len(latencies)
+        total_errors += entry['errors']
+        endpoints[endpoint] = {
+            'count': len(latencies),
+            'errors': entry['errors'],
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'queries_max': max(queries) if queries else None
+        }
+
+    return {
+        'meta': dict(meta, duration_s=round(elapsed, 3)),
+        'totals': {
+            'requests': total_requests,
+            'errors': total_errors,
+            'throughput_rps': round(total_requests / elapsed, 2) if elapsed else 0.0
+        },
+        'endpoints': endpoints
+    }
+
+def compare_reports(report, baseline, tolerance=0.20):
+    """
+    Raporu kayıtlı bir temel ölçümle karşılaştırır.
+
+    p95 gecikmesi tolerance oranından fazla artan veya ortalama sorgu sayısı
+    artan uç noktaları gerileme olarak döndürür.
+    """
+    regressions = []
+    for endpoint, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append({
+                'endpoint': endpoint, 'metric': 'p95_ms',
+                'baseline': previous['p95_ms'], 'current': current['p95_ms']
+            })
+        if (previous.get('queries_mean') is not None and current.get('queries_mean') is not None
+                and current['queries_mean'] > previous['queries_mean']):
+            regressions.append({
+                'endpoint': endpoint, 'metric': 'queries_mean',
+                'baseline': previous['queries_mean'], 'current': current['queries_mean']
+            })
+    return regressions
+
+def _allocate_many(count, day):
+    """count adet sipariş numarası ayırır; numaraları, çağrı sürelerini ve toplam süreyi döndürür"""
+    from utils.order_numbers import next_order_number
+
+    numbers = []
+    latencies = []
+    began = time.perf_counter()
+    for _ in range(count):
+        started = time.perf_counter()
+        numbers.append(next_order_number(day))
+        latencies.append(time.perf_counter() - started)
+    return numbers, latencies, time.perf_counter() - began
+
+def _allocation_process(database_url, count, block_size, day):
+    """Ayrı bir süreçte kendi ayırıcısıyla numara ayırır (spawn ile başlatılır)"""
+    import os
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app
+
+    app = create_app()
+    app.config['ORDER_NUMBER_BLOCK_SIZE'] = block_size
+    with app.app_context():
+        return _allocate_many(count, day)
+
+def run_allocator_benchmark(app, workers=4, per_worker=10000, block_size=100, processes=True):
+    """
+    Sipariş numarası ayırma maliyetini eşzamanlı işçilerle ölçer.
+
+    processes=True ise her işçi ayrı bir süreçtir ve blokları veritabanı
+    üzerinden yarışarak ayırır; aksi halde iş parçacıkları süreç içi ayırıcıyı
+    paylaşır. Rapor çağrı başına gecikme yüzdeliklerini (µs), verimi, blok
+    ayırma sayısını, tekrar eden numaraları ve aynı sayıda siparişte eski
+    4 haneli rastgele numaranın kaç çakışma üreteceğini içerir.
+    """
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+
+    from models.order import OrderSequence
+
+    def reserved():
+        with app.app_context():
+            sequence = db.session.get(OrderSequence, day)
+            return sequence.last_value if sequence else 0
+
+    day = datetime.now().date()
+    database_url = app.config['SQLALCHEMY_DATABASE_URI']
+    reserved_before = reserved()
+    started = time.perf_counter()
+    if processes:
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            results = pool.starmap(_allocation_process,
+                                   [(database_url, per_worker, block_size, day)] * workers)
+    else:
+        def work(_):
+            with app.app_context():
+                return _allocate_many(per_worker, day)
+
+        previous = app.config.get('ORDER_NUMBER_BLOCK_SIZE')
+        app.config['ORDER_NUMBER_BLOCK_SIZE'] = block_size
+        try:
+            with ThreadPoolExecutor(workers) as executor:
+                results = list(executor.map(work, range(workers)))
+        finally:
+            app.config['ORDER_NUMBER_BLOCK_SIZE'] = previous
+    elapsed = time.perf_counter() - started
+    reserved_numbers = reserved() - reserved_before
+
+    numbers = [number for result in results for number in result[0]]
+    latencies = sorted(latency for result in results for latency in result[1])
+    rng = random.Random(0)
+    legacy = [rng.randrange(10000) for _ in numbers]
+    return {
+        'meta': {
+            'workers': workers,
+            'mode': 'process' if processes else 'thread',
+            'per_worker': per_worker,
+            'block_size': block_size,
+            'duration_s': round(elapsed, 3)
+        },
+        'allocations': len(numbers),
+        'duplicates': len(numbers) - len(set(numbers)),
+        'reserved': reserved_numbers,
+        'reservations': reserved_numbers // block_size,
+        # Süreç başlatma süresi hariç: en yavaş işçinin ayırma döngüsüne göre toplam verim
+        'throughput_per_s': round(len(numbers) / max(result[2] for result in results), 1),
+        'p50_us': round(percentile(latencies, 0.50) * 1e6, 2),
+        'p99_us': round(percentile(latencies, 0.99) * 1e6, 2),
+        'max_us': round(latencies[-1] * 1e6, 2) if latencies else 0.0,
+        'legacy_collisions': len(legacy) - len(set(legacy))
+    }
+
+def _contention_loop(app, username, product_ids, iterations, seed, barrier):
+    """
+    Bir müşterinin sepete ekleme (yazma) ve sepet görüntüleme (okuma) döngüsü.
+
+    Yazma ve okuma gecikmelerini, 5xx yanıt sayısını (ör. "database is
+    locked") ve döngü süresini döndürür.
+    """
+    rng = random.Random(seed)
+    client = app.test_client()
+    client.post('/auth/giris', data={'username': username, 'password': SAMPLE_PASSWORD})
+    barrier.wait()
+    writes, reads, errors = [], [], 0
+    began = time.perf_counter()
+    for _ in range(iterations):
+        for samples, method, path, data in (
+                (writes, 'POST', f'/sepet/ekle/{rng.choice(product_ids)}', {'quantity': 1}),
+                (reads, 'GET', '/sepet/', None)):
+            started = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            response.close()
+            samples.append(time.perf_counter() - started)
+            errors += response.status_code >= 500
+    return writes, reads, errors, time.perf_counter() - began
+
+def _contention_process(database_url, profile, username, product_ids, iterations, seed, barrier):
+    """Ayrı bir süreçte verilen profille sepet döngüsünü çalıştırır (spawn ile başlatılır)"""
+    import os
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['DATABASE_PROFILE'] = profile
+    from app import create_app
+
+    app = create_app()
+    app.logger.disabled = True
+    return _contention_loop(app, username, product_ids, iterations, seed, barrier)
+
+def _profile_app(database_url, profile):
+    """Ortam değişkenlerini geçici olarak değiştirip verilen profilde uygulama oluşturur"""
+    import os
+    from app import create_app
+
+    previous = {key: os.environ.get(key) for key in ('DATABASE_URL', 'DATABASE_PROFILE')}
+    os.environ.update(DATABASE_URL=database_url, DATABASE_PROFILE=profile)
+    try:
+        app = create_app()
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.logger.disabled = True
+    return app
+
+def stop_background_workers(app, timeout=30):
+    """
+    Uygulamanın arka plan iş ve resim çalışanlarını durdurur.
+
+    Ödeme akışı sipariş sonrası işleri kuyruğa alır ve commit sonrasında süreç
+    içi çalışanlar başlar; motor kapatılıp geçici veritabanı silinmeden önce
+    çağrılmalıdır. Kuyrukta kalan işler veritabanında bekler, ölçüme katılmaz.
+    """
+    app.extensions['job_runner'].shutdown(timeout=timeout)
+    app.extensions['image_pipeline'].shutdown()
+
+def run_contention_benchmark(profiles=('default', 'production'), workers=8, iterations=100,
+                             products=200, processes=True, seed=42):
+    """
+    Veritabanı profillerini eşzamanlı sepet yazmaları altında karşılaştırır.
+
+    Her profil kendi geçici SQLite dosyasında çalışır (WAL kipi dosyada kalıcı
+    olduğundan profiller aynı dosyayı paylaşamaz). workers müşteri aynı anda
+    sepete ürün ekler ve sepetini görüntüler; processes=True ise her müşteri
+    ayrı bir süreçtir (çok işçili sunucu), aksi halde tek süreçte iş
+    parçacıklarıdır. Profil başına hata sayısı, verim ve yazma/okuma gecikme
+    yüzdelikleri (ms) raporlanır.
+    """
+    import multiprocessing
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = {}
+    for profile in profiles:
+        handle, path = tempfile.mkstemp(suffix='.db', prefix=f'cekisme-{profile}-')
+        os.close(handle)
+        database_url = f'sqlite:///{path}'
+        app = _profile_app(database_url, profile)
+        try:
+            with app.app_context():
+                seed_benchmark_data(products=products, users=workers, reviews=0, seed=seed)
+                catalog = load_catalog()
+                journal_mode = db.session.execute(text('PRAGMA journal_mode')).scalar()
+            tasks = [(catalog['users'][index], catalog['products'], iterations, seed + index)
+                     for index in range(workers)]
+            # Müşteriler giriş yaptıktan sonra döngüye aynı anda başlar
+            if processes:
+                context = multiprocessing.get_context('spawn')
+                with context.Manager() as manager, context.Pool(workers) as pool:
+                    barrier = manager.Barrier(workers)
+                    outcomes = pool.starmap(_contention_process,
+                                            [(database_url, profile) + task + (barrier,) for task in tasks])
+            else:
+                barrier = threading.Barrier(workers)
+                with ThreadPoolExecutor(workers) as executor:
+                    outcomes = list(executor.map(lambda task: _contention_loop(app, *task, barrier), tasks))
+        finally:
+            stop_background_workers(app)
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.unlink(path + suffix)
+
+        writes = sorted(latency for outcome in outcomes for latency in outcome[0])
+        reads = sorted(latency for outcome in outcomes for latency in outcome[1])
+        requests = len(writes) + len(reads)
+        results[profile] = {
+            'journal_mode': journal_mode,
+            'requests': requests,
+            'errors': sum(outcome[2] for outcome in outcomes),
+            # En yavaş müşterinin döngü süresine göre toplam verim
+            'throughput_rps': round(requests / max(outcome[3] for outcome in outcomes), 1),
+            'write_p50_ms': round(percentile(writes, 0.50) * 1000, 2),
+            'write_p99_ms': round(percentile(writes, 0.99) * 1000, 2),
+            'read_p50_ms': round(percentile(reads, 0.50) * 1000, 2),
+            'read_p99_ms': round(percentile(reads, 0.99) * 1000, 2),
+        }
+
+    return {
+        'meta': {
+            'workers': workers,
+            'mode': 'process' if processes else 'thread',
+            'iterations': iterations,
+            'products': products,
+            'started_at': datetime.utcnow().isoformat(timespec='seconds')
+        },
+        'profiles': results
+    }
+
+def load_report(path):
+    """JSON raporu dosyadan okur"""
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+def save_report(report, path):
+    """JSON raporu dosyaya yazar"""
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Katalog Önbellek Modülü
+Kategori, öne çıkan ürün ve ürün kartı okumaları için süreç içi LRU/TTL önbellek
+
+Önbellek her çalışan süreçte ayrıdır. Yazma işlemleri yalnızca kendi sürecinin
+önbelleğini geçersiz kılar; diğer süreçlerdeki eski kayıtlar en geç TTL süresi
+sonunda yenilenir.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import get_template_attribute
+from flask_login import current_user
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from app import db
+from models.product import Product, Category, ProductCard
+
+_MISSING = object()
+
+class LRUCache:
+    """Boyut ve yaş sınırlı, iş parçacığı güvenli LRU önbellek"""
+
+    def __init__(self, name, maxsize=1024, ttl=300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def configure(self, maxsize=None, ttl=None):
+        """Önbellek boyutunu ve yaşam süresini günceller"""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._shrink()
+
+    def get(self, key, default=None):
+        """Anahtarın değerini döndürür, yoksa veya süresi dolmuşsa default döner"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Değeri önbelleğe yazar"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            self._shrink()
+
+    def get_or_load(self, key, loader):
+        """Değer önbellekte yoksa loader ile yükleyip saklar"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, key):
+        """Anahtarı önbellekten siler"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Tüm kayıtları siler"""
+        with self._lock:
+            self._data.clear()
+
+    def _shrink(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """İsabet/ıskalama/tahliye istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+class CategoryRow:
+    """Önbellekte tutulan salt okunur kategori satırı"""
+
+    __slots__ = ('id', 'name', 'description', 'product_count')
+
+    def __init__(self, id, name, description, product_count):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.product_count = product_count
+
+    def __repr__(self):
+        return f'<CategoryRow {self.name}>'
+
+# Kategori ve ürün listeleri (anahtarlar katalog sürümünü içerir)
+catalog_cache = LRUCache('catalog', maxsize=256, ttl=300)
+# Ürün id'sine göre ürün kartları
+product_card_cache = LRUCache('product_cards', maxsize=5000, ttl=600)
+# Sayfalama toplamları (yaklaşık, kısa ömürlü)
+count_cache = LRUCache('counts', maxsize=1024, ttl=60)
+# (ürün id'si, giriş durumu) -> (ürün sürümü, işlenmiş kart HTML'i)
+card_fragment_cache = LRUCache('card_fragments', maxsize=5000, ttl=600)
+
+_version_lock = threading.Lock()
+_catalog_version = 0
+
+# Değişmesi ürün listelerini etkileyen alanlar
+_LISTING_FIELDS = ('is_active', 'is_featured', 'category_id')
+
+def init_cache(app):
+    """Önbellek boyutlarını uygulama yapılandırmasından ayarlar ve önbelleği boşaltır"""
+    catalog_cache.configure(app.config.get('CATALOG_CACHE_SIZE'),
+                            app.config.get('CATALOG_CACHE_TTL'))
+    product_card_cache.configure(app.config.get('PRODUCT_CARD_CACHE_SIZE'),
+                                 app.config.get('PRODUCT_CARD_CACHE_TTL'))
+    count_cache.configure(app.config.get('COUNT_CACHE_SIZE'),
+                          app.config.get('COUNT_CACHE_TTL'))
+    card_fragment_cache.configure(app.config.get('CARD_FRAGMENT_CACHE_SIZE'),
+                                  app.config.get('CARD_FRAGMENT_CACHE_TTL'))
+    catalog_cache.clear()
+    product_card_cache.clear()
+    count_cache.clear()
+    card_fragment_cache.clear()
+    app.add_template_global(render_product_card, 'product_card')
+
+def catalog_version():
+    """Geçerli katalog sürümünü döndürür"""
+    return _catalog_version
+
+def bump_catalog_version():
+    """Katalog sürümünü artırarak tüm liste önbelleğini geçersiz kılar"""
+    global _catalog_version
+    with _version_lock:
+        _catalog_version += 1
+        return _catalog_version
+
+def cache_stats():
+    """Tüm önbelleklerin istatistiklerini döndürür"""
+    return {
+        'catalog_version': _catalog_version,
+        'caches': [catalog_cache.stats(), product_card_cache.stats(), count_cache.stats(),
+                   card_fragment_cache.stats()]
+    }
+
+def _pending(session):
+    return session.info.setdefault('catalog_invalidation', {'bump': False, 'products': set()})
+
+def invalidate_products(product_ids, session=None):
+    """
+    Ürün kartlarını geçersiz kılmak üzere işaretler.
+
+    Geçersiz kılma, eski verinin işlem bitmeden tekrar önbelleğe alınmaması
+    için oturum commit edildikten sonra uygulanır.
+    """
+    session = session or db.session()
+    _pending(session)['products'].update(product_ids)
+
+def invalidate_catalog(session=None):
+    """Commit sonrasında katalog sürümünün artırılmasını işaretler"""
+    session = session or db.session()
+    _pending(session)['bump'] = True
+
+def get_active_categories():
+    """Aktif kategorileri aktif ürün sayılarıyla birlikte döndürür"""
+    def load():
+        rows = db.session.query(
+            Category.id, Category.name, Category.description,
+            func.count(Product.id).label('product_count')
+        ).outerjoin(
+            Product, (Product.category_id == Category.id) & (Product.is_active == True)
+        ).filter(
+            Category.is_active == True
+        ).group_by(Category.id).order_by(Category.id).all()
+        return tuple(CategoryRow(**row._asdict()) for row in rows)
+
+    return catalog_cache.get_or_load((_catalog_version, 'categories'), load)
+
+def get_all_categories():
+    """Pasifler dahil tüm kategorileri döndürür"""
+    def load():
+        rows = db.session.query(
+            Category.id, Category.name, Category.description
+        ).order_by(Category.id).all()
+        return tuple(CategoryRow(product_count=None, **row._asdict()) for row in rows)
+
+    return catalog_cache.get_or_load((_catalog_version, 'all_categories'), load)
+
+def get_featured_products(limit=8):
+    """Öne çıkan ürün kartlarını döndürür"""
+    def load():
+        return tuple(product_id for product_id, in db.session.query(Product.id).filter(
+            Product.is_featured == True, Product.is_active == True
+        ).limit(limit))
+
+    return get_product_cards(catalog_cache.get_or_load((_catalog_version, 'featured', limit), load))
+
+def get_bestsellers(limit=6):
+    """En çok satan ürün kartlarını döndürür"""
+    def load():
+        # Satış adetleri sipariş sonrası işle güncellenir; liste en geç TTL sonunda yenilenir
+        return tuple(product_id for product_id, in db.session.query(Product.id).filter(
+            Product.is_active == True
+        ).order_by(Product.sales_count.desc(), Product.id.desc()).limit(limit))
+
+    return get_product_cards(catalog_cache.get_or_load((_catalog_version, 'bestsellers', limit), load))
+
+def get_product_cards(product_ids):
+    """Verilen sıradaki ürün kartlarını döndürür; eksikleri tek sorguda yükler"""
+    cards = {}
+    missing = []
+    for product_id in product_ids:
+        card = product_card_cache.get(product_id)
+        if card is None:
+            missing.append(product_id)
+        else:
+            cards[product_id] = card
+
+    if missing:
+        columns = [getattr(Product, name) for name in ProductCard.columns]
+        for row in db.session.query(*columns).filter(Product.id.in_(missing)):
+            card = ProductCard.from_row(row)
+            product_card_cache.set(card.id, card)
+            cards[card.id] = card
+
+    return [cards[product_id] for product_id in product_ids if product_id in cards]
+
+def render_product_card(product):
+    """
+    Vitrin ürün kartını işler; ürünün aynı sürümü için önceki HTML'i yeniden kullanır.
+
+    Kart kullanıcıya göre yalnızca "Sepete Ekle" düğmesinde değiştiğinden anahtar
+    ürün id'si ve giriş durumudur. Kayıtla birlikte ürünün updated_at, puan ve
+    yorum sayısı saklanır; farklıysa kart yeniden işlenir.
+    """
+    authenticated = current_user.is_authenticated
+    key = (product.id, authenticated)
+    version = (product.updated_at, product.rating, product.review_count)
+    entry = card_fragment_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    html = get_template_attribute('macros/product_card.html', 'product_card')(product, authenticated)
+    card_fragment_cache.set(key, (version, html))
+    return html
+
+def cached_count(query):
+    """
+    Sorgunun satır sayısını kısa süreli önbellekten döndürür.
+
+    Anahtar SQL metni, parametreler ve katalog sürümüdür; ürün listesi
+    değişiklikleri sayımı hemen, diğer değişiklikler en geç TTL sonunda yeniler.
+    """
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    key = (_catalog_version, str(compiled), repr(sorted(compiled.params.items())))
+    return count_cache.get_or_load(key, lambda: query.order_by(None).count())
+
+def cached_rows(query):
+    """
+    Küçük bir toplama sorgusunun (ör. yüzey sayımları) satırlarını sayımlarla
+    aynı önbellekten ve aynı geçersiz kılma kurallarıyla döndürür.
+    """
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    key = (_catalog_version, 'rows', str(compiled), repr(sorted(compiled.params.items())))
+    return count_cache.get_or_load(key, lambda: [tuple(row) for row in query.all()])
+
+@event.listens_for(Product, 'after_insert')
+@event.listens_for(Category, 'after_insert')
+@event.listens_for(Category, 'after_update')
+@event.listens_for(Category, 'after_delete')
+def _catalog_changed(mapper, connection, target):
+    invalidate_catalog(inspect(target).session)
+
+@event.listens_for(Product, 'after_delete')
+def _product_deleted(mapper, connection, product):
+    session = inspect(product).session
+    invalidate_products([product.id], session)
+    invalidate_catalog(session)
+
+@event.listens_for(Product, 'after_update')
+def _product_changed(mapper, connection, product):
+    state = inspect(product)
+    invalidate_products([product.id], state.session)
+    if any(state.attrs[field].history.has_changes() for field in _LISTING_FIELDS):
+        invalidate_catalog(state.session)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidation(session):
+    pending = session.info.pop('catalog_invalidation', None)
+    if not pending:
+        return
+    if pending['bump']:
+        bump_catalog_version()
+    for product_id in pending['products']:
+        product_card_cache.delete(product_id)
+        card_fragment_cache.delete((product_id, False))
+        card_fragment_cache.delete((product_id, True))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidation(session):
+    session.info.pop('catalog_invalidation', None)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sepet Anlık Görüntü Modülü
+Sepet satırlarını ürün bilgileriyle tek sorguda yükleyen salt okunur sepet görünümü
+"""
+
+from typing import NamedTuple, Optional, Tuple
+from sqlalchemy import case, update
+from app import db
+from models.product import Product, Category
+from models.order import CartItem
+
+# Kargo ücreti ve ücretsiz kargo sınırı (TL)
+SHIPPING_FEE = 15
+FREE_SHIPPING_THRESHOLD = 100
+
+class CartLine(NamedTuple):
+    """Sepetteki tek bir satır ve ürünün sepet anındaki bilgileri"""
+
+    item_id: int
+    product_id: int
+    quantity: int
+    name: str
+    brand: Optional[str]
+    image_url: Optional[str]
+    category_name: Optional[str]
+    price: float
+    stock_quantity: int
+    is_active: bool
+
+    @property
+    def line_total(self):
+        """Satır toplamı"""
+        return self.price * self.quantity
+
+    @property
+    def stock_problem(self):
+        """Stok yetersizse kullanıcıya gösterilecek mesajı döndürür"""
+        if self.stock_quantity <= 0:
+            return f'{self.name} stokta yok!'
+        if self.quantity > self.stock_quantity:
+            return f'{self.name} için yeterli stok yok!'
+        return None
+
+class CartSnapshot(NamedTuple):
+    """Sepetin toplamları ve stok durumlarıyla birlikte değişmez görüntüsü"""
+
+    lines: Tuple[CartLine, ...]
+    subtotal: float
+    shipping_cost: float
+    grand_total: float
+    item_count: int
+    free_shipping_threshold: float = FREE_SHIPPING_THRESHOLD
+
+    @property
+    def is_empty(self):
+        return not self.lines
+
+    @property
+    def stock_problems(self):
+        """Stok sorunu olan satırların mesajları"""
+        return [line.stock_problem for line in self.lines if line.stock_problem]
+
+    @property
+    def amount_to_free_shipping(self):
+        """Ücretsiz kargo için eklenmesi gereken tutar"""
+        return max(self.free_shipping_threshold - self.subtotal, 0)
+
+class StockShortage(NamedTuple):
+    """Stok düşülemeyen sepet satırı"""
+
+    product_id: int
+    name: str
+    requested: int
+    available: int
+
+    @property
+    def message(self):
+        if self.available <= 0:
+            return f'{self.name} stokta yok!'
+        return f'{self.name} için yeterli stok yok! (Stokta {self.available} adet var)'
+
+def calculate_shipping(subtotal):
+    """Ara toplama göre kargo ücretini hesaplar"""
+    return 0 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_FEE
+
+def load_cart_snapshot(user_id):
+    """Kullanıcının sepetini ürün ve kategori bilgileriyle tek sorguda yükler"""
+    rows = db.session.query(
+        CartItem.id.label('item_id'),
+        CartItem.product_id,
+        CartItem.quantity,
+        Product.name,
+        Product.brand,
+        Product.image_url,
+        Category.name.label('category_name'),
+        Product.price,
+        Product.stock_quantity,
+        Product.is_active
+    ).join(
+        Product, Product.id == CartItem.product_id
+    ).outerjoin(
+        Category, Category.id == Product.category_id
+    ).filter(
+        CartItem.user_id == user_id
+    ).order_by(CartItem.added_at, CartItem.id).all()
+
+    lines = tuple(
+        CartLine(**dict(row._asdict(), stock_quantity=row.stock_quantity or 0,
+                        is_active=bool(row.is_active)))
+        for row in rows
+    )
+    subtotal = sum(line.line_total for line in lines)
+    shipping_cost = calculate_shipping(subtotal) if lines else 0
+
+    return CartSnapshot(
+        lines=lines,
+        subtotal=subtotal,
+        shipping_cost=shipping_cost,
+        grand_total=subtotal + shipping_cost,
+        item_count=sum(line.quantity for line in lines)
+    )
+
+def reserve_stock(lines):
+    """
+    Sepet satırlarının stoklarını tek bir koşullu UPDATE ile düşer.
+
+    Stok yalnızca yeterli olduğu satırlarda düşülür. Tüm satırlar
+    güncellenemezse işlem geri alınır ve yetersiz kalan satırlar
+    StockShortage listesi olarak döndürülür; başarıda liste boştur.
+    Bu fonksiyon siparişin diğer yazma işlemlerinden önce çağrılmalıdır.
+    """
+    quantities = {}
+    names = {}
+    for line in lines:
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+        names[line.product_id] = line.name
+    if not quantities:
+        return []
+
+    requested = case(quantities, value=Product.id)
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock_quantity >= requested)
+        .values(stock_quantity=Product.stock_quantity - requested)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(quantities):
+        return []
+
+    # En az bir satır başarısız: tüm düşüşleri geri al ve güncel stokları raporla
+    db.session.rollback()
+    available = dict(db.session.query(Product.id, Product.stock_quantity).filter(
+        Product.id.in_(quantities)
+    ))
+    return [
+        StockShortage(product_id, names[product_id], quantity, available.get(product_id) or 0)
+        for product_id, quantity in quantities.items()
+        if (available.get(product_id) or 0) < quantity
+    ]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Koşullu GET Modülü
+Ürün sayfaları ve JSON uç noktaları için ETag / Last-Modified doğrulayıcıları
+
+Görünüm, sayfanın içeriğini belirleyen değerleri (ürünün updated_at'i, puan
+özeti, sayfadaki kartlar...) verir; bunlardan zayıf bir ETag üretilir ve
+istemcinin kopyası güncelse şablon işlenmeden 304 döndürülür. Giriş yapmış
+kullanıcıların sayfaları gezinme çubuğundaki ad ve sepet sayacını da içerdiği
+için ETag'e kullanıcı ve sepet özeti eklenir ve yanıt yalnızca tarayıcıda
+(private) saklanır. Anonim yanıtlar paylaşılan önbelleklerde tutulabilir.
+"""
+
+import hashlib
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+def make_etag(*parts):
+    """Sayfa içeriğini belirleyen değerlerden kısa bir özet üretir"""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+def card_signature(cards):
+    """Ürün kartı listesinin (ör. sayfalama öğeleri) özet girdisi"""
+    return tuple((card.id, card.updated_at, card.rating, card.review_count, card.stock_quantity)
+                 for card in cards)
+
+def page_signature(page):
+    """Anahtar kümesi sayfasının özet girdisi (kartlar ve gezinme durumu)"""
+    return (card_signature(page.items), page.page, page.total,
+            page.has_prev, page.has_next, page.prev_cursor, page.next_cursor)
+
+def conditional_response(render, *parts, last_modified=None):
+    """
+    İstemcinin kopyası güncelse 304, değilse render() çıktısını döndürür.
+
+    İki durumda da ETag ve Cache-Control başlıkları eklenir. Oturumda
+    gösterilmeyi bekleyen flash mesajı varsa doğrulama yapılmaz: mesajlar
+    yalnızca işlenen sayfada tüketilir.
+    """
+    if '_flashes' in session:
+        response = make_response(render())
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    private = current_user.is_authenticated
+    if private:
+        summary = current_user.cart_summary
+        parts += (current_user.id, current_user.updated_at,
+                  summary.updated_at if summary else None)
+        # Zaman damgaları kullanıcıya özgü içeriği kapsamaz
+        last_modified = None
+
+    etag = make_etag(*parts)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response(render())
+    else:
+        response = current_app.response_class(status=304)
+
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.vary.add('Cookie')
+    if private or session.modified:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['HTTP_CACHE_MAX_AGE']
+        response.cache_control.must_revalidate = True
+    return response
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Panel İstatistikleri Modülü
+Admin paneli sayaçlarının yazma anında artımlı bakımı ve periyodik mutabakatı
+
+Sipariş sayaçları ve günlük satışlar siparişle aynı işlemde artırılır (tek
+satırlık güncellemeler). Ürün satış adetleri ise siparişin dokunduğu ürünler
+için yeniden sayılır; bu iş sipariş işlemine eklenen orders.followup arka
+plan işiyle istek dışında yapılır.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, case, select, update, insert, delete, inspect
+from sqlalchemy.orm import Session
+from app import db
+from models.user import User
+from models.product import Product
+from models.order import Order, OrderItem
+from models.review import Review
+from models.stats import StoreCounter, DailySales
+from utils.events import old_value, track_old_values
+from utils.jobs import enqueue, job
+from utils.suggest import refresh_suggestions
+
+CANCELLED_STATUS = Order.CANCELLED
+
+# Sayaç adı -> veritabanından gerçek değeri hesaplayan sorgu
+COUNTER_QUERIES = {
+    'users': lambda: select(func.count(User.id)),
+    'products': lambda: select(func.count(Product.id)),
+    'active_products': lambda: select(func.count(Product.id)).where(Product.is_active == True),
+    'orders': lambda: select(func.count(Order.id)),
+    'reviews': lambda: select(func.count(Review.id)),
+    'pending_reviews': lambda: select(func.count(Review.id)).where(Review.is_approved == False),
+}
+
+class DashboardStats(NamedTuple):
+    """Admin panelinde gösterilen özet istatistikler"""
+
+    total_users: int
+    total_products: int
+    active_products: int
+    total_orders: int
+    total_reviews: int
+    pending_reviews: int
+    today_orders: int
+    today_revenue: float
+    monthly_orders: int
+    monthly_revenue: float
+
+    @property
+    def average_order_value(self):
+        """Bu ayki iptal edilmemiş siparişlerin ortalama tutarı"""
+        if not self.monthly_orders:
+            return 0.0
+        return self.monthly_revenue / self.monthly_orders
+
+def bump_counter(name, delta, connection=None):
+    """Sayacı delta kadar artırır; sayaç yoksa oluşturur"""
+    if not delta:
+        return
+    connection = connection or db.session.connection()
+    table = StoreCounter.__table__
+    now = datetime.utcnow()
+    result = connection.execute(
+        update(table).where(table.c.name == name)
+        .values(value=table.c.value + delta, updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(name=name, value=delta, updated_at=now))
+
+def get_counter(name):
+    """Tek bir sayacın değerini döndürür (ör. sayfalama toplamı için)"""
+    return db.session.query(StoreCounter.value).filter_by(name=name).scalar() or 0
+
+def _bump_day(connection, day, orders, cancelled, revenue):
+    """Günlük satış satırına sipariş, iptal ve ciro farkını uygular"""
+    table = DailySales.__table__
+    now = datetime.utcnow()
+    result = connection.execute(
+        update(table).where(table.c.day == day).values(
+            order_count=table.c.order_count + orders,
+            cancelled_count=table.c.cancelled_count + cancelled,
+            revenue=table.c.revenue + revenue,
+            updated_at=now
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(
+            day=day, order_count=orders, cancelled_count=cancelled,
+            revenue=revenue, updated_at=now
+        ))
+
+def _apply_order(connection, created_at, status, total_amount, sign):
+    """Tek bir siparişin günlük satışlara katkısını ekler (+1) veya çıkarır (-1)"""
+    cancelled = status == CANCELLED_STATUS
+    _bump_day(
+        connection,
+        (created_at or datetime.utcnow()).date(),
+        sign,
+        sign if cancelled else 0,
+        0.0 if cancelled else sign * (total_amount or 0.0)
+    )
+
+def record_cancellations(connection, condition):
+    """
+    Koşula uyan (henüz iptal edilmemiş) siparişlerin iptalini günlük satışlara uygular.
+
+    Toplu durum geçişleri ORM olaylarını atladığı için siparişler gün bazında
+    gruplanır; her gün için tek güncelleme yapılır.
+    """
+    day = func.date(Order.created_at)
+    rows = connection.execute(
+        select(day, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0.0))
+        .where(condition).group_by(day)
+    ).all()
+    for value, count, revenue in rows:
+        _bump_day(connection, date.fromisoformat(value) if value else datetime.utcnow().date(),
+                  0, count, -revenue)
+
+def load_dashboard_stats(today=None):
+    """Panel istatistiklerini sayaç ve bu ayın günlük satış satırlarından okur"""
+    today = today or datetime.utcnow().date()
+    month_start = today.replace(day=1)
+
+    counters = dict(db.session.query(StoreCounter.name, StoreCounter.value))
+    days = DailySales.query.filter(DailySales.day >= month_start, DailySales.day <= today).all()
+    today_row = next((row for row in days if row.day == today), None)
+
+    return DashboardStats(
+        total_users=counters.get('users', 0),
+        total_products=counters.get('products', 0),
+        active_products=counters.get('active_products', 0),
+        total_orders=counters.get('orders', 0),
+        total_reviews=counters.get('reviews', 0),
+        pending_reviews=counters.get('pending_reviews', 0),
+        today_orders=today_row.get_completed_count() if today_row else 0,
+        today_revenue=today_row.revenue if today_row else 0.0,
+        monthly_orders=sum(row.get_completed_count() for row in days),
+        monthly_revenue=sum(row.revenue for row in days)
+    )
+
+def reconcile_dashboard_stats(since=None):
+    """
+    Sayaçları ve günlük satışları kaynak tablolardan yeniden hesaplar.
+
+    since verilirse yalnızca o tarihten itibaren olan günlük satırlar
+    yeniden oluşturulur. Düzeltilen (kaymış) sayaçların adlarını döndürür.
+    """
+    connection = db.session.connection()
+    counters = StoreCounter.__table__
+    current = dict(connection.execute(select(counters.c.name, counters.c.value)).all())
+    actual = connection.execute(
+        select(*[query().scalar_subquery().label(name) for name, query in COUNTER_QUERIES.items()])
+    ).one()._asdict()
+
+    drifted = [name for name, value in actual.items() if current.get(name) != value]
+    now = datetime.utcnow()
+    connection.execute(delete(counters))
+    connection.execute(insert(counters), [
+        {'name': name, 'value': value, 'updated_at': now} for name, value in actual.items()
+    ])
+
+    sales = DailySales.__table__
+    cancelled = Order.status == CANCELLED_STATUS
+    day = func.date(Order.created_at)
+    grouped = select(
+        day,
+        func.count(Order.id),
+        func.sum(case((cancelled, 1), else_=0)),
+        func.coalesce(func.sum(case((cancelled, 0.0), else_=Order.total_amount)), 0.0),
+        func.current_timestamp()
+    ).group_by(day)
+    if since is not None:
+        connection.execute(delete(sales).where(sales.c.day >= since))
+        grouped = grouped.where(Order.created_at >= datetime.combine(since, datetime.min.time()))
+    else:
+        connection.execute(delete(sales))
+    connection.execute(insert(sales).from_select(
+        ['day', 'order_count', 'cancelled_count', 'revenue', 'updated_at'], grouped
+    ))
+
+    if since is None and recount_sales(connection=connection):
+        drifted.append('sales_count')
+    return drifted
+
+def recount_sales(product_ids=None, connection=None):
+    """
+    Ürünlerin satış adetlerini iptal edilmemiş sipariş kalemlerinden yeniden hesaplar.
+
+    Yalnızca değeri değişen ürünler güncellenir ve sayıları döndürülür;
+    updated_at korunur (satış adedi kartlarda ve ürün sayfasında görünmez).
+    """
+    connection = connection or db.session.connection()
+    products = Product.__table__
+    items = OrderItem.__table__
+    orders = Order.__table__
+    sold = select(func.coalesce(func.sum(items.c.quantity), 0)).select_from(
+        items.join(orders, orders.c.id == items.c.order_id)
+    ).where(items.c.product_id == products.c.id, orders.c.status != CANCELLED_STATUS).scalar_subquery()
+    statement = update(products).where(func.coalesce(products.c.sales_count, -1) != sold) \
+        .values(sales_count=sold, updated_at=products.c.updated_at)
+    if product_ids is not None:
+        statement = statement.where(products.c.id.in_(list(product_ids)))
+    return connection.execute(statement).rowcount
+
+def enqueue_order_followup(order_id, session=None):
+    """Siparişin satış adedi ve öneri güncellemesini commit ile birlikte kuyruğa ekler"""
+    return enqueue('orders.followup', {'order_id': order_id}, session,
+                   dedupe_key=f'order:{order_id}:followup')
+
+@job('orders.followup')
+def order_followup(order_id):
+    """Siparişteki ürünlerin satış adetlerini yeniden sayar ve öneri popülerliklerini yeniler"""
+    product_ids = [product_id for product_id, in db.session.query(OrderItem.product_id)
+                   .filter(OrderItem.order_id == order_id).distinct()]
+    if product_ids and recount_sales(product_ids):
+        refresh_suggestions(product_ids)
+
+@job('products.recount_sales')
+def recount_product_sales(product_ids):
+    """Verilen ürünlerin satış adetlerini yeniden sayar (ör. toplu iptal sonrası)"""
+    if recount_sales(product_ids):
+        refresh_suggestions(product_ids)
+
+def ensure_dashboard_stats():
+    """Sayaç tablosu boşsa istatistikleri, satış adedi eksik ürün varsa satış adetlerini oluşturur"""
+    if not db.session.query(StoreCounter.query.exists()).scalar():
+        reconcile_dashboard_stats()
+        db.session.commit()
+    elif db.session.query(Product.id).filter(Product.sales_count.is_(None)).first():
+        recount_sales()
+        db.session.commit()
+
+@click.command('reconcile-stats')
+@click.option('--days', type=int, default=None,
+              help='Yalnızca son N günün satışlarını yeniden hesapla')
+@with_appcontext
+def reconcile_stats_command(days):
+    """Panel sayaçlarını kaynak tablolarla mutabık hale getirir (cron ile periyodik çalıştırın)"""
+    since = datetime.utcnow().date() - timedelta(days=days - 1) if days else None
+    drifted = reconcile_dashboard_stats(since)
+    db.session.commit()
+    if drifted:
+        click.echo(f'Düzeltilen sayaçlar: {", ".join(drifted)}')
+    else:
+        click.echo('Tüm sayaçlar güncel.')
+
+track_old_values(Product.is_active, Review.is_approved, Order.status,
+                 Order.total_amount, Order.created_at)
+
+def _count(connection, target, name, delta):
+    """
+    Sayaç farkını oturumda biriktirir; flush sonunda sayaç başına tek UPDATE
+    ile uygulanır (toplu eklemelerde satır başına UPDATE yerine).
+    """
+    if not delta:
+        return
+    session = inspect(target).session
+    if session is None:
+        bump_counter(name, delta, connection)
+        return
+    deltas = session.info.setdefault('counter_deltas', {})
+    deltas[name] = deltas.get(name, 0) + delta
+
+@event.listens_for(Session, 'after_flush')
+def _apply_counter_deltas(session, flush_context):
+    deltas = session.info.pop('counter_deltas', None)
+    if deltas:
+        connection = session.connection()
+        for name, delta in deltas.items():
+            bump_counter(name, delta, connection)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_counter_deltas(session):
+    session.info.pop('counter_deltas', None)
+
+@event.listens_for(User, 'after_insert')
+def _user_added(mapper, connection, user):
+    _count(connection, user, 'users', 1)
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    _count(connection, user, 'users', -1)
+
+@event.listens_for(Product, 'after_insert')
+def _product_added(mapper, connection, product):
+    _count(connection, product, 'products', 1)
+    _count(connection, product, 'active_products', 1 if product.is_active else 0)
+
+@event.listens_for(Product, 'after_update')
+def _product_changed(mapper, connection, product):
+    was_active = bool(old_value(inspect(product), 'is_active'))
+    if was_active != bool(product.is_active):
+        _count(connection, product, 'active_products', -1 if was_active else 1)
+
+@event.listens_for(Product, 'after_delete')
+def _product_deleted(mapper, connection, product):
+    _count(connection, product, 'products', -1)
+    _count(connection, product, 'active_products', -1 if old_value(inspect(product), 'is_active') else 0)
+
+@event.listens_for(Review, 'after_insert')
+def _review_added(mapper, connection, review):
+    _count(connection, review, 'reviews', 1)
+    _count(connection, review, 'pending_reviews', 0 if review.is_approved else 1)
+
+@event.listens_for(Review, 'after_update')
+def _review_changed(mapper, connection, review):
+    was_approved = bool(old_value(inspect(review), 'is_approved'))
+    if was_approved != bool(review.is_approved):
+        _count(connection, review, 'pending_reviews', 1 if was_approved else -1)
+
+@event.listens_for(Review, 'after_delete')
+def _review_deleted(mapper, connection, review):
+    _count(connection, review, 'reviews', -1)
+    _count(connection, review, 'pending_reviews', 0 if old_value(inspect(review), 'is_approved') else -1)
+
+@event.listens_for(Order, 'after_insert')
+def _order_added(mapper, connection, order):
+    _count(connection, order, 'orders', 1)
+    _apply_order(connection, order.created_at, order.status, order.total_amount, +1)
+
+@event.listens_for(Order, 'after_update')
+def _order_changed(mapper, connection, order):
+    state = inspect(order)
+    old = (old_value(state, 'created_at'), old_value(state, 'status'), old_value(state, 'total_amount'))
+    new = (order.created_at, order.status, order.total_amount)
+    if old != new:
+        _apply_order(connection, *old, -1)
+        _apply_order(connection, *new, +1)
+
+@event.listens_for(Order, 'after_delete')
+def _order_deleted(mapper, connection, order):
+    state = inspect(order)
+    _count(connection, order, 'orders', -1)
+    _apply_order(connection, old_value(state, 'created_at'), old_value(state, 'status'),
+                 old_value(state, 'total_amount'), -1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Veritabanı Motoru Profilleri
+SQLite bağlantı ayarları (PRAGMA) ve bağlantı havuzu boyutları
+
+'default' profili SQLite'ın varsayılanlarını korur (geri alma günlüğü,
+synchronous=FULL). 'production' profili her yeni bağlantıda WAL kipini,
+synchronous=NORMAL, bellek eşlemeli okuma, büyük sayfa önbelleği, bellek içi
+geçici tablolar, meşgul bekleme süresi ve yabancı anahtar denetimini açar;
+WAL'da okuyucular yazanı, yazan okuyucuları engellemez ve eşzamanlı yazanlar
+"database is locked" hatası yerine kilidi bekler.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DATABASE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,   # 256 MB
+        'cache_size': -65536,     # 64 MB (negatif değer KB cinsindendir)
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,    # ms
+        'foreign_keys': 'ON',
+    },
+}
+
+# Motor URL'si -> bağlantılarına uygulanan profil adı
+_engine_profiles = {}
+
+def get_profile(name):
+    """Profil adına karşılık gelen PRAGMA sözlüğünü döndürür"""
+    try:
+        return DATABASE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f'Bilinmeyen veritabanı profili: {name} '
+                         f'(geçerli: {", ".join(DATABASE_PROFILES)})') from None
+
+def _is_memory_database(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS için havuz ayarlarını döndürür.
+
+    'production' profilinde havuz, iş parçacıklı sunucunun eşzamanlı istek
+    sayısına göre DATABASE_POOL_SIZE (+ DATABASE_MAX_OVERFLOW) bağlantı tutar.
+    Bellek içi SQLite tek bağlantılı havuz kullandığından dokunulmaz.
+    """
+    get_profile(config['DATABASE_PROFILE'])
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if config['DATABASE_PROFILE'] == 'default' or _is_memory_database(url):
+        return {}
+    return {
+        'pool_size': config['DATABASE_POOL_SIZE'],
+        'max_overflow': config['DATABASE_MAX_OVERFLOW'],
+        'pool_timeout': config['DATABASE_POOL_TIMEOUT'],
+    }
+
+def apply_profile(engine, name):
+    """Profilin PRAGMA'larını motorun her yeni SQLite bağlantısında uygular"""
+    pragmas = get_profile(name)
+    _engine_profiles[str(engine.url)] = name
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas.items():
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+        finally:
+            cursor.close()
+
+def profile_of(engine):
+    """Motora uygulanmış profil adını döndürür (uygulanmadıysa 'default')"""
+    return _engine_profiles.get(str(engine.url), 'default')
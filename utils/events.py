@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model Olayı Yardımcıları
+Mapper olaylarında değişiklik öncesi değerlere erişim için ortak fonksiyonlar
+"""
+
+from sqlalchemy import event
+
+def old_value(state, name):
+    """Flush öncesi (veritabanındaki) öznitelik değerini döndürür"""
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[name].value
+
+def _keep_value(target, value, oldvalue, initiator):
+    return value
+
+def track_old_values(*attributes):
+    """
+    Verilen alanlar değiştirilmeden önce eski değerlerini yükletir.
+
+    Süresi dolmuş (expired) örneklerde atama yapıldığında da eski değer
+    geçmişe yazılır; böylece old_value her zaman doğru sonuç verir.
+    """
+    for attribute in attributes:
+        event.listen(attribute, 'set', _keep_value, active_history=True, retval=True)
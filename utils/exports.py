@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dışa Aktarım Modülü
+Sipariş ve ürünlerin sabit bellekle CSV / NDJSON olarak akıtılması
+
+Satırlar (created_at, id) anahtarından devam eden parçalar halinde okunur;
+her parça kendi kısa bağlantısında okunup bağlantı havuza geri verildikten
+sonra yanıta yazılır. Böylece bellek kullanımı parça boyutuyla sınırlı kalır,
+yavaş indiren bir istemci havuzdan bağlantı tutmaz ve SQLite'ta uzun süre
+açık kalan bir okuma işlemi yazanları (geri alma günlüğü kipinde) bekletmez.
+Siparişler CSV'de kalem başına bir satır, NDJSON'da kalemleriyle birlikte
+sipariş başına bir nesne olarak yazılır.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from sqlalchemy import select
+from models.user import User
+from models.product import Product, Category
+from models.order import Order, OrderItem
+from utils.pagination import KeysetOrder
+
+# Biçim -> yanıt içerik türü
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+ORDER_FIELDS = ['order_number', 'created_at', 'status', 'payment_status', 'payment_method',
+                'total_amount', 'username', 'email', 'shipping_address', 'shipped_at', 'delivered_at']
+ORDER_ITEM_FIELDS = ['product_id', 'product_name', 'quantity', 'unit_price', 'total_price']
+PRODUCT_FIELDS = ['id', 'name', 'brand', 'model', 'category', 'price', 'original_price',
+                  'stock_quantity', 'is_active', 'is_featured', 'rating', 'review_count',
+                  'sales_count', 'created_at', 'updated_at']
+
+ORDER_EXPORT_ORDER = KeysetOrder(Order.created_at, Order.id)
+PRODUCT_EXPORT_ORDER = KeysetOrder(Product.created_at, Product.id)
+
+class ExportError(ValueError):
+    """Geçersiz dışa aktarım biçimi veya filtresi"""
+
+def date_range(column, start=None, end=None):
+    """'YYYY-AA-GG' başlangıç/bitiş tarihlerini sütun koşullarına çevirir (bitiş günü dahil)"""
+    conditions = []
+    try:
+        if start:
+            conditions.append(column >= datetime.combine(date.fromisoformat(start), datetime.min.time()))
+        if end:
+            end_day = date.fromisoformat(end) + timedelta(days=1)
+            conditions.append(column < datetime.combine(end_day, datetime.min.time()))
+    except ValueError:
+        raise ExportError('Tarihler YYYY-AA-GG biçiminde olmalı') from None
+    return conditions
+
+def check_format(export_format):
+    """Biçimi doğrular ve içerik türünü döndürür"""
+    try:
+        return EXPORT_FORMATS[export_format]
+    except KeyError:
+        raise ExportError(f'Bilinmeyen biçim: {export_format} '
+                          f'(geçerli: {", ".join(EXPORT_FORMATS)})') from None
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _pages(engine, keyset, conditions, chunk_size, fetch):
+    """
+    Anahtar sırasıyla parça parça okur; her parça için fetch(connection, ids)
+    sonucunu döndürür. Parçalar arasında bağlantı açık tutulmaz.
+    """
+    last = None
+    while True:
+        with engine.connect() as connection:
+            query = select(*keyset.columns).where(*conditions)
+            if last is not None:
+                query = query.where(keyset.after(last))
+            keys = connection.execute(query.order_by(*keyset.order_by()).limit(chunk_size)).all()
+            if not keys:
+                return
+            rows = fetch(connection, [key[1] for key in keys])
+        yield rows
+        if len(keys) < chunk_size:
+            return
+        last = tuple(keys[-1])
+
+def order_filters(status=None, start=None, end=None):
+    """Sipariş dışa aktarımının koşulları"""
+    conditions = date_range(Order.created_at, start, end)
+    if status:
+        if status not in Order.STATUSES:
+            raise ExportError(f'Geçersiz durum: {status}')
+        conditions.append(Order.status == status)
+    return conditions
+
+def product_filters(category_id=None, active=None, start=None, end=None):
+    """Ürün dışa aktarımının koşulları"""
+    conditions = date_range(Product.created_at, start, end)
+    if category_id:
+        conditions.append(Product.category_id == category_id)
+    if active is not None:
+        conditions.append(Product.is_active == active)
+    return conditions
+
+def _fetch_orders(connection, ids):
+    """Parçadaki siparişleri müşteri ve kalemleriyle birlikte tek sorguda okur"""
+    rows = connection.execute(
+        select(Order.id, Order.order_number, Order.created_at, Order.status, Order.payment_status,
+               Order.payment_method, Order.total_amount, User.username, User.email,
+               Order.shipping_address, Order.shipped_at, Order.delivered_at,
+               OrderItem.product_id, Product.name, OrderItem.quantity,
+               OrderItem.unit_price, OrderItem.total_price)
+        .select_from(Order)
+        .join(User, User.id == Order.user_id)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .where(Order.id.in_(ids))
+        .order_by(*ORDER_EXPORT_ORDER.order_by(), OrderItem.id)
+    )
+    orders = []
+    for _, lines in groupby(rows, key=lambda row: row[0]):
+        lines = list(lines)
+        order = dict(zip(ORDER_FIELDS, map(_value, lines[0][1:12])))
+        order['items'] = [dict(zip(ORDER_ITEM_FIELDS, line[12:])) for line in lines
+                          if line[12] is not None]
+        orders.append(order)
+    return orders
+
+def _fetch_products(connection, ids):
+    """Parçadaki ürünleri kategori adlarıyla okur"""
+    rows = connection.execute(
+        select(Product.id, Product.name, Product.brand, Product.model, Category.name,
+               Product.price, Product.original_price, Product.stock_quantity, Product.is_active,
+               Product.is_featured, Product.rating, Product.review_count, Product.sales_count,
+               Product.created_at, Product.updated_at)
+        .select_from(Product)
+        .join(Category, Category.id == Product.category_id)
+        .where(Product.id.in_(ids))
+        .order_by(*PRODUCT_EXPORT_ORDER.order_by())
+    )
+    return [dict(zip(PRODUCT_FIELDS, map(_value, row))) for row in rows]
+
+def _order_rows(order):
+    """Siparişin CSV satırları: kalem başına bir satır (kalemsiz sipariş tek satır)"""
+    head = [order[field] for field in ORDER_FIELDS]
+    if not order['items']:
+        return [head + [None] * len(ORDER_ITEM_FIELDS)]
+    return [head + [item[field] for field in ORDER_ITEM_FIELDS] for item in order['items']]
+
+def _encode(pages, export_format, header, csv_rows):
+    """Parçaları biçime göre metin bloklarına çevirir (parça başına bir blok)"""
+    if export_format == 'ndjson':
+        for records in pages:
+            yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for records in pages:
+        for record in records:
+            writer.writerows(csv_rows(record))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Boş dışa aktarım da başlık satırını içerir
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_orders(engine, export_format, conditions, chunk_size=1000):
+    """Siparişleri (created_at, id) sırasıyla akıtan metin bloğu üreteci"""
+    check_format(export_format)
+    pages = _pages(engine, ORDER_EXPORT_ORDER, conditions, chunk_size, _fetch_orders)
+    return _encode(pages, export_format, ORDER_FIELDS + ORDER_ITEM_FIELDS, _order_rows)
+
+def export_products(engine, export_format, conditions, chunk_size=1000):
+    """Ürünleri (created_at, id) sırasıyla akıtan metin bloğu üreteci"""
+    check_format(export_format)
+    pages = _pages(engine, PRODUCT_EXPORT_ORDER, conditions, chunk_size, _fetch_products)
+    return _encode(pages, export_format, PRODUCT_FIELDS,
+                   lambda product: [[product[field] for field in PRODUCT_FIELDS]])
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yüzeyli (Faceted) Arama Modülü
+Arama ve kategori sayfalarındaki filtrelerin ürün sayıları
+
+Sayımlar tek bir gruplanmış sorguyla hesaplanır: temel sorgunun (arama metni,
+kategori sayfası, serbest fiyat aralığı) ürünleri kategori, marka, fiyat
+dilimi, stok durumu ve tam sayı puana göre gruplanır. Seçili yüzey filtreleri
+SQL'e değil bu gruplar üzerinde Python'da uygulanır; böylece her yüzey kendi
+filtresi hariç diğer filtrelere göre sayılır (seçili markadayken diğer
+markaların kaç ürünü olduğu da görünür) ve yeni bir yüzey eklemek yeni bir
+sorgu gerektirmez. Gruplar sayım önbelleğinde tutulur; toplam sayfalamada da
+kullanıldığı için ayrıca COUNT sorgusu çalışmaz.
+"""
+
+from typing import NamedTuple, Optional
+from flask import request, url_for
+from sqlalchemy import Integer, case, cast, func
+from models.product import Product
+from utils.cache import cached_rows
+
+# Fiyat dilimleri: (anahtar, alt sınır, üst sınır (hariç), etiket)
+PRICE_BUCKETS = (
+    ('0-250', 0, 250, '250 ₺ altı'),
+    ('250-500', 250, 500, '250 - 500 ₺'),
+    ('500-1000', 500, 1000, '500 - 1.000 ₺'),
+    ('1000-2500', 1000, 2500, '1.000 - 2.500 ₺'),
+    ('2500+', 2500, None, '2.500 ₺ ve üzeri'),
+)
+
+# "N yıldız ve üzeri" puan filtreleri
+RATING_THRESHOLDS = (4, 3, 2, 1)
+
+# Listelenen en fazla marka sayısı (seçili marka her zaman gösterilir)
+MAX_BRANDS = 12
+
+# Gruplanmış satır sütunları
+_CATEGORY, _BRAND, _PRICE, _STOCK, _RATING, _COUNT = range(6)
+
+def _price_bucket():
+    """Fiyatın dilim sırasını veren SQL ifadesi"""
+    return case(*[(Product.price < upper, index)
+                  for index, (_, _, upper, _) in enumerate(PRICE_BUCKETS[:-1])],
+                else_=len(PRICE_BUCKETS) - 1)
+
+class FacetSelection(NamedTuple):
+    """İstekte seçili yüzey filtreleri"""
+
+    category_id: Optional[int] = None
+    brand: Optional[str] = None
+    price: Optional[str] = None
+    in_stock: bool = False
+    min_rating: Optional[int] = None
+
+    @classmethod
+    def from_args(cls, args, with_category=True):
+        """Sorgu parametrelerinden seçimi okur; geçersiz değerler yok sayılır"""
+        price = args.get('fiyat')
+        min_rating = args.get('puan', type=int)
+        return cls(
+            category_id=args.get('kategori', type=int) if with_category else None,
+            brand=args.get('marka') or None,
+            price=price if any(key == price for key, _, _, _ in PRICE_BUCKETS) else None,
+            in_stock=args.get('stokta') == '1',
+            min_rating=min_rating if min_rating in RATING_THRESHOLDS else None
+        )
+
+    @property
+    def price_index(self):
+        return next((index for index, bucket in enumerate(PRICE_BUCKETS) if bucket[0] == self.price), None)
+
+    def apply(self, query):
+        """Seçili filtreleri ürün sorgusuna uygular"""
+        if self.category_id:
+            query = query.filter(Product.category_id == self.category_id)
+        if self.brand:
+            query = query.filter(Product.brand == self.brand)
+        if self.price is not None:
+            _, lower, upper, _ = PRICE_BUCKETS[self.price_index]
+            query = query.filter(Product.price >= lower)
+            if upper is not None:
+                query = query.filter(Product.price < upper)
+        if self.in_stock:
+            query = query.filter(Product.stock_quantity > 0)
+        if self.min_rating:
+            query = query.filter(Product.rating >= self.min_rating)
+        return query
+
+    def checks(self):
+        """Gruplanmış satırlar için (yüzey, koşul) çiftleri; yalnızca seçili filtreler"""
+        checks = []
+        if self.category_id:
+            checks.append(('category', lambda row: row[_CATEGORY] == self.category_id))
+        if self.brand:
+            checks.append(('brand', lambda row: row[_BRAND] == self.brand))
+        if self.price is not None:
+            index = self.price_index
+            checks.append(('price', lambda row: row[_PRICE] == index))
+        if self.in_stock:
+            checks.append(('stock', lambda row: row[_STOCK]))
+        if self.min_rating:
+            checks.append(('rating', lambda row: row[_RATING] >= self.min_rating))
+        return checks
+
+class Facets(NamedTuple):
+    """Yüzey sayımları; her yüzey kendi filtresi hariç seçime göre sayılır"""
+
+    total: int
+    categories: tuple
+    brands: tuple
+    prices: tuple
+    in_stock: int
+    ratings: tuple
+
+    def category_count(self, category_id):
+        return next((count for candidate, count in self.categories if candidate == category_id), 0)
+
+def compute_facets(query, selection):
+    """
+    Temel sorgu ve seçim için yüzey sayımlarını döndürür.
+
+    query yüzey filtreleri uygulanmamış ürün sorgusudur; total seçimin
+    tamamına uyan ürün sayısıdır.
+    """
+    grouped = query.order_by(None).with_entities(
+        Product.category_id.label('category_id'),
+        Product.brand.label('brand'),
+        _price_bucket().label('price_bucket'),
+        case((Product.stock_quantity > 0, 1), else_=0).label('in_stock'),
+        cast(func.coalesce(Product.rating, 0), Integer).label('rating_floor'),
+        func.count().label('product_count')
+    ).group_by('category_id', 'brand', 'price_bucket', 'in_stock', 'rating_floor')
+
+    checks = selection.checks()
+    total = in_stock = 0
+    categories, brands = {}, {}
+    prices = [0] * len(PRICE_BUCKETS)
+    ratings = [0] * (max(RATING_THRESHOLDS) + 2)
+
+    # Tek geçiş: tüm filtrelere uyan satır her yüzeye, yalnızca bir filtreye
+    # uymayan satır yalnızca o filtrenin yüzeyine sayılır
+    for row in cached_rows(grouped):
+        failed = [facet for facet, check in checks if not check(row)]
+        if len(failed) > 1:
+            continue
+        skip = failed[0] if failed else None
+        count = row[_COUNT]
+        if skip is None:
+            total += count
+        if skip in (None, 'category'):
+            categories[row[_CATEGORY]] = categories.get(row[_CATEGORY], 0) + count
+        if skip in (None, 'brand') and row[_BRAND]:
+            brands[row[_BRAND]] = brands.get(row[_BRAND], 0) + count
+        if skip in (None, 'price'):
+            prices[row[_PRICE]] += count
+        if skip in (None, 'stock') and row[_STOCK]:
+            in_stock += count
+        if skip in (None, 'rating'):
+            ratings[min(max(row[_RATING], 0), len(ratings) - 1)] += count
+
+    top_brands = sorted(brands.items(), key=lambda item: (-item[1], item[0]))[:MAX_BRANDS]
+    if selection.brand and all(brand != selection.brand for brand, _ in top_brands):
+        top_brands.append((selection.brand, brands.get(selection.brand, 0)))
+
+    return Facets(
+        total=total,
+        categories=tuple(sorted(categories.items(), key=lambda item: (item[0] is None, item[0] or 0))),
+        brands=tuple(top_brands),
+        prices=tuple((key, label, prices[index])
+                     for index, (key, _, _, label) in enumerate(PRICE_BUCKETS)),
+        in_stock=in_stock,
+        ratings=tuple((threshold, sum(ratings[threshold:])) for threshold in RATING_THRESHOLDS)
+    )
+
+def filter_url(**changes):
+    """
+    Geçerli liste sayfasının filtreleri korunarak değiştirilmiş URL'i.
+
+    None veya boş değer parametreyi kaldırır; değiştirilmedikçe sayfa ve
+    imleç sıfırlanır.
+    """
+    args = request.args.to_dict()
+    args.pop('sayfa', None)
+    args.pop('imlec', None)
+    for key, value in changes.items():
+        if value is None or value == '':
+            args.pop(key, None)
+        else:
+            args[key] = value
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+def init_facets(app):
+    """Filtre bağlantısı yardımcısını şablonlara ekler"""
+    app.add_template_global(filter_url)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ürün Resmi İşleme Modülü
+Yüklenen resimlerden boyutlandırılmış WebP/JPEG varyantları üretir
+
+İstek yalnızca dosyayı doğrular ve içerik özetini (SHA-256) hesaplar;
+küçültme ve kodlama arka plandaki iş parçacığı havuzunda yapılır, bitince
+ürünün image_variants alanı ve image_url'i (JPEG kart varyantı) güncellenir.
+Dosyalar içerik özetiyle adlandırılır: aynı resim ikinci kez yüklenirse
+işlenmez, mevcut varyantlar hemen kullanılır. EXIF, ICC ve diğer üst veriler
+varyantlara yazılmaz; EXIF yönlendirmesi önce piksellere uygulanır.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+# Üretilen genişlikler (px); orijinalden büyük varyant üretilmez
+IMAGE_WIDTHS = (200, 400, 800, 1600)
+
+# Vitrin kartlarında ve image_url'de kullanılan genişlik
+CARD_WIDTH = 400
+
+# Biçim -> (Pillow biçimi, kayıt seçenekleri)
+IMAGE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+# Kabul edilen kaynak biçimleri
+ALLOWED_SOURCE_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+
+class ImageError(ValueError):
+    """Yüklenen dosya işlenebilir bir resim değil"""
+
+class PendingImage:
+    """Doğrulanmış, varyantları henüz üretilmemiş (veya zaten var olan) yükleme"""
+
+    __slots__ = ('digest', 'data', 'widths', 'variants', 'ready')
+
+    def __init__(self, digest, data, widths, variants, ready):
+        self.digest = digest
+        self.data = data
+        self.widths = widths
+        self.variants = variants
+        self.ready = ready
+
+def content_hash(data):
+    """Dosya içeriğinin SHA-256 özeti"""
+    return hashlib.sha256(data).hexdigest()
+
+def variant_widths(width):
+    """Kaynak genişliği için üretilecek varyant genişlikleri"""
+    widths = [candidate for candidate in IMAGE_WIDTHS if candidate < width]
+    widths.append(min(width, IMAGE_WIDTHS[-1]))
+    return sorted(set(widths))
+
+def variant_path(digest, width, fmt):
+    """Yükleme klasörüne göre varyant dosyasının göreli yolu"""
+    return f'{digest[:2]}/{digest}-{width}.{fmt}'
+
+def variant_urls(digest, widths, url_prefix):
+    """Biçim -> [[genişlik, URL], ...] eşlemesi"""
+    return {
+        fmt: [[width, f'{url_prefix}/{variant_path(digest, width, fmt)}'] for width in widths]
+        for fmt in IMAGE_FORMATS
+    }
+
+def card_url(variants, width=CARD_WIDTH):
+    """Hedef genişliğe en yakın (en az o kadar geniş) JPEG varyantının URL'i"""
+    candidates = variants['jpeg']
+    return next((url for candidate, url in candidates if candidate >= width), candidates[-1][1])
+
+def inspect_image(data):
+    """
+    Dosyanın desteklenen bir resim olduğunu doğrular; EXIF yönlendirmesi
+    uygulanmış (genişlik, yükseklik) döndürür. Pikseller çözülmez.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in ALLOWED_SOURCE_FORMATS:
+                raise ImageError(f'Desteklenmeyen resim biçimi: {image.format}')
+            width, height = image.size
+            if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+                width, height = height, width
+            image.verify()
+            return width, height
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as error:
+        raise ImageError('Dosya geçerli bir resim değil.') from error
+
+def render_variants(data, directory, digest, widths):
+    """
+    Tüm varyantları üretip yükleme klasörüne yazar, yazılan dosya sayısını döndürür.
+
+    Dosyalar geçici adla yazılıp os.replace ile yerine taşınır; aynı resmi
+    eşzamanlı işleyen iki iş yarım dosya bırakmaz. Var olan dosyalar atlanır.
+    """
+    written = 0
+    with Image.open(io.BytesIO(data)) as source:
+        source.seek(0)
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.info = {}
+
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt, (pillow_format, options) in IMAGE_FORMATS.items():
+                target = os.path.join(directory, variant_path(digest, width, fmt))
+                if os.path.exists(target):
+                    continue
+                output = resized
+                if pillow_format == 'JPEG' and has_alpha:
+                    output = Image.new('RGB', resized.size, (255, 255, 255))
+                    output.paste(resized, mask=resized.getchannel('A'))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                temporary = f'{target}.{threading.get_ident()}.tmp'
+                output.save(temporary, pillow_format, **options)
+                os.replace(temporary, target)
+                written += 1
+    return written
+
+class ImagePipeline:
+    """Yükleme klasörü ve arka plan iş parçacığı havuzu"""
+
+    def __init__(self, directory, url_prefix, workers=2):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip('/')
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def prepare(self, data):
+        """
+        Yüklemeyi doğrular ve varyant URL'lerini hesaplar (istek iş parçacığında, hafif).
+
+        Varyantların hepsi diskte varsa (aynı içerik daha önce yüklenmişse)
+        ready=True döner ve işlem kuyruğa alınmaz.
+        """
+        width, _ = inspect_image(data)
+        digest = content_hash(data)
+        widths = variant_widths(width)
+        ready = all(os.path.exists(os.path.join(self.directory, variant_path(digest, candidate, fmt)))
+                    for candidate in widths for fmt in IMAGE_FORMATS)
+        return PendingImage(digest, data, widths,
+                            variant_urls(digest, widths, self.url_prefix), ready)
+
+    def submit(self, pending, on_done):
+        """
+        Varyantları üretir ve on_done(pending, error) çağırır.
+
+        workers=0 ise iş istek iş parçacığında hemen yapılır; aksi halde
+        havuza gönderilir ve on_done havuz iş parçacığında çalışır.
+        """
+        if pending.ready:
+            on_done(pending, None)
+            return None
+
+        if not self.workers:
+            self._run(pending, on_done)
+            return None
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='images')
+            future = self._executor.submit(self._run, pending, on_done)
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _run(self, pending, on_done):
+        try:
+            render_variants(pending.data, self.directory, pending.digest, pending.widths)
+        except Exception as error:
+            on_done(pending, error)
+        else:
+            pending.ready = True
+            on_done(pending, None)
+        finally:
+            pending.data = None
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def wait(self, timeout=None):
+        """Kuyruktaki işlerin bitmesini bekler; bekleyen iş kalmadıysa True"""
+        with self._lock:
+            pending = set(self._pending)
+        return not wait(pending, timeout=timeout).not_done
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+def init_images(app):
+    """Uygulamanın resim hattını oluşturur"""
+    pipeline = ImagePipeline(app.config['UPLOAD_FOLDER'], app.config['UPLOAD_URL_PREFIX'],
+                             workers=app.config['IMAGE_WORKERS'])
+    app.extensions['image_pipeline'] = pipeline
+    return pipeline
+
+def _apply_variants(product_id, variants):
+    """Varyantları ürüne yazar ve commit eder"""
+    from app import db
+    from models.product import Product
+    product = db.session.get(Product, product_id)
+    if product is not None:
+        product.image_variants = variants
+        product.image_url = card_url(variants)
+        db.session.commit()
+
+def store_product_image(product_id, pending):
+    """
+    Yüklemenin varyantlarını üretip ürüne bağlar.
+
+    Varyantlar zaten varsa veya havuz kapalıysa (IMAGE_WORKERS=0) istek
+    oturumunda hemen uygulanır; aksi halde üretim havuzda sürer ve ürün
+    o zamana kadar önceki resmini gösterir.
+    """
+    from flask import current_app
+    app = current_app._get_current_object()
+    pipeline = app.extensions['image_pipeline']
+
+    if pending.ready or not pipeline.workers:
+        def on_done(pending, error):
+            if error is not None:
+                raise error
+            _apply_variants(product_id, pending.variants)
+    else:
+        def on_done(pending, error):
+            if error is not None:
+                app.logger.error('Ürün %s resmi işlenemedi: %s', product_id, error)
+                return
+            with app.app_context():
+                _apply_variants(product_id, pending.variants)
+
+    return pipeline.submit(pending, on_done)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İndeks Yönetimi Modülü
+Model indekslerinin mevcut veritabanlarına uygulanması ve sorgu planı denetimi
+
+Modellerdeki db.Index tanımları create_all ile yalnızca yeni tablolarda
+oluşur; daha önce oluşturulmuş bir instance/eticaret.db için eksik indeksler
+başlangıçta ensure_indexes ile eklenir (CREATE INDEX IF NOT EXISTS).
+"""
+
+import re
+from sqlalchemy import inspect, text
+from app import db
+
+# Tam taranması beklenen, satır sayısı sınırlı küçük tablolar
+SMALL_TABLES = frozenset({'categories', 'store_counters', 'order_sequences'})
+
+ANALYSIS_LIMIT = 1000
+
+_SCAN_PATTERN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+def missing_indexes(connection=None):
+    """Modellerde tanımlı olup veritabanında bulunmayan indeksleri döndürür"""
+    connection = connection or db.session.connection()
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in sorted(table.indexes, key=lambda index: index.name)
+                       if index.name not in existing)
+    return missing
+
+def ensure_indexes(analyze=True):
+    """
+    Eksik indeksleri oluşturur, oluşturulan indekslerin adlarını döndürür.
+
+    Yeni indeks eklendiyse ANALYZE çalıştırılır; böylece SQLite sorgu
+    planlayıcısı yeni indeksler arasında istatistiklere göre seçim yapar.
+    """
+    connection = db.session.connection()
+    created = []
+    for index in missing_indexes(connection):
+        index.create(connection, checkfirst=True)
+        created.append(index.name)
+    if created and analyze and connection.dialect.name == 'sqlite':
+        # Yaklaşık istatistik yeterli; büyük tablolarda ANALYZE'ı kısa tutar
+        connection.execute(text(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}'))
+        connection.execute(text('ANALYZE'))
+    db.session.commit()
+    return created
+
+def drop_indexes(tables):
+    """
+    Verilen tabloların modelde tanımlı ikincil indekslerini kaldırır.
+
+    Toplu yüklemeler satır satır indeks bakımı yerine yükleme sonrasında
+    ensure_indexes ile indeksleri tek seferde, sıralayarak oluşturur.
+    """
+    connection = db.session.connection()
+    dropped = []
+    for table in tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            index.drop(connection, checkfirst=True)
+            dropped.append(index.name)
+    return dropped
+
+def query_plan(statement, parameters=()):
+    """SQLite EXPLAIN QUERY PLAN çıktısının açıklama satırlarını döndürür"""
+    connection = db.session.connection()
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+    return [row[-1] for row in rows]
+
+def full_scans(plan, allowed=SMALL_TABLES):
+    """Plan satırlarından indeks kullanmadan taranan tabloları döndürür"""
+    tables = set(db.metadata.tables)
+    scans = []
+    for detail in plan:
+        match = _SCAN_PATTERN.match(detail)
+        if match and match.group(1) in tables and match.group(1) not in allowed:
+            scans.append(match.group(1))
+    return scans
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arka Plan İşleri Modülü
+Veritabanındaki jobs tablosuna dayalı kalıcı iş kuyruğu ve çalıştırıcı
+
+İşler enqueue ile isteğin kendi işlemine eklenir: işlem commit edilirse iş
+de kalıcı olarak kuyruktadır, geri alınırsa hiç oluşmamıştır (outbox).
+Commit sonrasında süreç içi çalışan havuzu uyandırılır; çalışanlar iş
+kalmayınca kapanır. Ayrı bir süreçte `flask run-jobs` aynı tablodan iş
+alabilir; JOB_WORKERS=0 ile işler yalnızca bu komutla çalıştırılır.
+
+Bir iş tek bir UPDATE ... RETURNING ile alınır (iki çalışan aynı işi
+alamaz). İşleyicinin yazmaları ile işin silinmesi aynı işlemde commit
+edilir; hata alan iş üstel bekleme ile yeniden denenir, deneme hakkı
+bitince failed olarak kalır. Çalışırken süreci ölen işler kilit süresi
+(JOB_LEASE_SECONDS) dolunca yeniden alınır; bu yüzden işleyiciler aynı
+yükle birden fazla çalışmaya dayanıklı (idempotent) yazılmalıdır. Kilit
+süresinden uzun sürebilen işleyiciler ilerledikçe renew_lease çağırır.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+import click
+from flask import current_app, has_app_context
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import db
+from models.job import Job
+
+# Kuyruğa iş eklenen oturumların işareti
+_SESSION_KEY = 'jobs_enqueued'
+
+# Hatalar kaydedilirken saklanan en fazla karakter
+MAX_ERROR_LENGTH = 2000
+
+class JobHandler(NamedTuple):
+    """Kayıtlı işleyici ve iş türüne özel deneme hakkı"""
+
+    function: object
+    max_attempts: Optional[int]
+
+class ClaimedJob(NamedTuple):
+    """Çalışanın aldığı iş"""
+
+    id: int
+    name: str
+    payload: Optional[dict]
+    attempts: int
+    max_attempts: int
+
+# İş adı -> işleyici
+_handlers = {}
+
+def job(name, max_attempts=None):
+    """
+    İşleyici kaydeden dekoratör.
+
+    İşleyici yükün anahtarlarını isimli argüman olarak alır ve uygulama
+    bağlamında db.session ile çalışır; commit çalıştırıcı tarafından yapılır.
+    """
+    def decorator(function):
+        _handlers[name] = JobHandler(function, max_attempts)
+        return function
+    return decorator
+
+def enqueue(name, payload=None, session=None, delay=0, dedupe_key=None):
+    """
+    İşi oturumun işlemine ekler; iş commit ile birlikte kuyruğa girer.
+
+    dedupe_key verilirse aynı anahtarlı bekleyen (veya çalışan) bir iş varken
+    yeni iş eklenmez. İş eklendiyse True döndürür.
+    """
+    session = session or db.session()
+    handler = _handlers.get(name)
+    max_attempts = handler.max_attempts if handler else None
+    if max_attempts is None:
+        max_attempts = current_app.config['JOB_MAX_ATTEMPTS']
+    now = datetime.utcnow()
+
+    statement = sqlite_insert(Job.__table__).values(
+        name=name, payload=payload, status=Job.PENDING, attempts=0,
+        max_attempts=max_attempts, dedupe_key=dedupe_key,
+        run_at=now + timedelta(seconds=delay), created_at=now
+    )
+    if dedupe_key is not None:
+        statement = statement.on_conflict_do_nothing(index_elements=['dedupe_key'])
+    added = session.connection().execute(statement).rowcount == 1
+    if added:
+        session.info[_SESSION_KEY] = True
+    return added
+
+def retry_delay(attempts, base, maximum):
+    """attempts. başarısız denemeden sonraki bekleme (sn): üstel, üst sınırlı ve rastgele kaydırılmış"""
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    # Aynı anda düşen işlerin aynı anda yeniden denenmemesi için yarısına kadar kısaltılır
+    return delay * (0.5 + random.random() / 2)
+
+class JobRunner:
+    """
+    Süreç içi çalışan havuzu.
+
+    Çalışan iş parçacıkları wake ile gerektikçe (en fazla workers kadar)
+    başlatılır ve kuyrukta bekleyen iş kalmayınca kapanır; boştayken
+    veritabanına sorgu gitmez. Çatallanan süreçlerde iş parçacıkları
+    devralınmadığı için havuz ilk wake çağrısında sıfırlanır.
+    """
+
+    def __init__(self, workers=2, poll_interval=1.0, lease_seconds=300,
+                 retry_delay=5.0, retry_max_delay=600.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.worker_id = f'{socket.gethostname()}:{self._pid}'
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._threads = set()
+        self._wakeups = 0
+        self._stopping = False
+        # İş parçacığında o an çalışan iş (renew için)
+        self._local = threading.local()
+
+    # --- Kuyruk işlemleri (uygulama bağlamında) ---
+
+    def claim(self):
+        """Zamanı gelmiş ilk işi (veya kilidi süresi dolmuş çalışan işi) alır; yoksa None"""
+        table = Job.__table__
+        now = datetime.utcnow()
+        candidate = select(table.c.id).where(or_(
+            (table.c.status == Job.PENDING) & (table.c.run_at <= now),
+            (table.c.status == Job.RUNNING)
+            & (table.c.locked_at < now - timedelta(seconds=self.lease_seconds))
+        )).order_by(table.c.run_at, table.c.id).limit(1).scalar_subquery()
+        row = db.session.execute(
+            update(table).where(table.c.id == candidate).values(
+                status=Job.RUNNING, locked_by=self.worker_id, locked_at=now,
+                attempts=table.c.attempts + 1
+            ).returning(table.c.id, table.c.name, table.c.payload,
+                        table.c.attempts, table.c.max_attempts)
+        ).first()
+        db.session.commit()
+        return ClaimedJob(*row) if row else None
+
+    def _owned(self, claimed):
+        """İşin kilidi hâlâ bu çalışanın bu denemesinde mi (WHERE koşulu)"""
+        table = Job.__table__
+        return (table.c.id == claimed.id) & (table.c.locked_by == self.worker_id) \
+            & (table.c.attempts == claimed.attempts)
+
+    def renew(self):
+        """
+        Bu iş parçacığında çalışan işin kilit süresini yeniden başlatır.
+
+        Güncelleme çağıranın işlemiyle commit edilir. Çalışan iş yoksa veya
+        kilit başka bir çalışana geçtiyse False döndürür.
+        """
+        claimed = getattr(self._local, 'claimed', None)
+        if claimed is None:
+            return False
+        return db.session.execute(
+            update(Job.__table__).where(self._owned(claimed)).values(locked_at=datetime.utcnow())
+        ).rowcount == 1
+
+    def run(self, claimed):
+        """İşi çalıştırır; başarılıysa True"""
+        table = Job.__table__
+        owned = self._owned(claimed)
+        self._local.claimed = claimed
+        try:
+            handler = _handlers.get(claimed.name)
+            if handler is None:
+                raise LookupError(f'Kayıtlı işleyici yok: {claimed.name}')
+            handler.function(**(claimed.payload or {}))
+            # İşleyicinin yazmaları ile işin silinmesi aynı işlemde commit edilir;
+            # kilit bu arada başka bir çalışana geçtiyse yazmalar geri alınır
+            if db.session.execute(delete(table).where(owned)).rowcount != 1:
+                db.session.rollback()
+                current_app.logger.warning('İş %s başka bir çalışana geçti', claimed.id)
+                return False
+            db.session.commit()
+            return True
+        except Exception as error:
+            db.session.rollback()
+            current_app.logger.warning('İş %s (%s) başarısız, deneme %s/%s: %s', claimed.id,
+                                       claimed.name, claimed.attempts, claimed.max_attempts, error)
+            now = datetime.utcnow()
+            values = {'last_error': f'{type(error).__name__}: {error}'[:MAX_ERROR_LENGTH],
+                      'locked_by': None, 'locked_at': None}
+            if claimed.attempts >= claimed.max_attempts:
+                # Anahtar bırakılır; aynı iş yeniden kuyruğa eklenebilir
+                values.update(status=Job.FAILED, dedupe_key=None, finished_at=now)
+            else:
+                delay = retry_delay(claimed.attempts, self.retry_delay, self.retry_max_delay)
+                values.update(status=Job.PENDING, run_at=now + timedelta(seconds=delay))
+            db.session.execute(update(table).where(owned).values(**values))
+            db.session.commit()
+            return False
+        finally:
+            self._local.claimed = None
+
+    def run_pending(self, limit=None):
+        """Zamanı gelmiş işleri bu iş parçacığında sırayla çalıştırır; çalışan iş sayısını döndürür"""
+        count = 0
+        while limit is None or count < limit:
+            claimed = self.claim()
+            if claimed is None:
+                break
+            self.run(claimed)
+            count += 1
+        return count
+
+    def next_due(self):
+        """Bekleyen ilk işe kalan süre (sn); bekleyen iş yoksa None"""
+        run_at = db.session.query(func.min(Job.run_at)).filter(Job.status == Job.PENDING).scalar()
+        db.session.commit()
+        if run_at is None:
+            return None
+        return max((run_at - datetime.utcnow()).total_seconds(), 0.0)
+
+    # --- İş parçacıkları ---
+
+    def wake(self, app):
+        """Yeni iş eklendiğini bildirir; gerekirse çalışan başlatır"""
+        if not self.workers:
+            return
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            self._wakeups += 1
+            self._condition.notify_all()
+            if len(self._threads) < self.workers:
+                self._start(app, persistent=False)
+
+    def _start(self, app, persistent):
+        thread = threading.Thread(target=self._work, args=(app, persistent),
+                                  name=f'jobs-{len(self._threads) + 1}', daemon=True)
+        self._threads.add(thread)
+        thread.start()
+        return thread
+
+    def _work(self, app, persistent):
+        thread = threading.current_thread()
+        try:
+            with app.app_context():
+                while not self._stopping:
+                    with self._lock:
+                        seen = self._wakeups
+                    claimed = self.claim()
+                    if claimed is not None:
+                        self.run(claimed)
+                        continue
+                    wait = self.next_due()
+                    with self._lock:
+                        if wait is None and not persistent:
+                            # Son sorgudan sonra uyandırma geldiyse kuyruğa tekrar bak
+                            if self._wakeups != seen:
+                                continue
+                            break
+                        if self._wakeups == seen and not self._stopping:
+                            self._condition.wait(min(wait if wait is not None else self.poll_interval,
+                                                     self.poll_interval))
+        except Exception:
+            app.logger.exception('İş çalışanı durdu')
+        finally:
+            with self._lock:
+                self._threads.discard(thread)
+
+    def serve(self, app, workers=None):
+        """Kuyruğu durdurulana kadar işler (`flask run-jobs`); workers kadar kalıcı çalışan"""
+        with self._lock:
+            threads = [self._start(app, persistent=True) for _ in range(workers or self.workers or 1)]
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        finally:
+            self.shutdown()
+
+    def wait(self, timeout=None):
+        """Süreç içi çalışanların kapanmasını bekler; hepsi kapandıysa True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                threads = list(self._threads)
+            if not threads:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            threads[0].join(timeout=remaining)
+
+    def shutdown(self, timeout=None):
+        """Çalışanlara durmalarını bildirir ve kapanmalarını bekler"""
+        with self._lock:
+            self._stopping = True
+            self._condition.notify_all()
+        try:
+            return self.wait(timeout)
+        finally:
+            self._stopping = False
+
+def init_jobs(app):
+    """Uygulamanın iş çalıştırıcısını oluşturur"""
+    runner = JobRunner(
+        workers=app.config['JOB_WORKERS'],
+        poll_interval=app.config['JOB_POLL_INTERVAL'],
+        lease_seconds=app.config['JOB_LEASE_SECONDS'],
+        retry_delay=app.config['JOB_RETRY_DELAY'],
+        retry_max_delay=app.config['JOB_RETRY_MAX_DELAY']
+    )
+    app.extensions['job_runner'] = runner
+    return runner
+
+def get_job_runner():
+    return current_app.extensions['job_runner']
+
+def renew_lease():
+    """İşleyiciden çağrılır: çalışan işin kilidini tazeler; iş dışında etkisizdir"""
+    return get_job_runner().renew()
+
+@event.listens_for(Session, 'after_commit')
+def _wake_runner(session):
+    if session.info.pop(_SESSION_KEY, None) and has_app_context():
+        runner = current_app.extensions.get('job_runner')
+        if runner is not None:
+            runner.wake(current_app._get_current_object())
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_enqueued(session):
+    session.info.pop(_SESSION_KEY, None)
+
+@click.command('run-jobs')
+@click.option('--workers', type=int, default=None, help='Eşzamanlı çalışan sayısı (varsayılan: JOB_WORKERS)')
+@click.option('--burst', is_flag=True, help='Zamanı gelmiş işleri çalıştırıp çık')
+@with_appcontext
+def run_jobs_command(workers, burst):
+    """Arka plan işlerini bu süreçte çalıştırır (JOB_WORKERS=0 ile web süreçlerinin yerine)"""
+    runner = get_job_runner()
+    if burst:
+        click.echo(f'{runner.run_pending()} iş çalıştırıldı.')
+        return
+    click.echo(f'İş kuyruğu dinleniyor ({runner.worker_id})...')
+    try:
+        runner.serve(current_app._get_current_object(), workers)
+    except KeyboardInterrupt:
+        click.echo('Durduruldu.')
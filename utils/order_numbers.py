@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sipariş Numarası Ayırma Modülü
+Gün bazlı sıra numaralarını süreç başına bloklar halinde ayırır
+
+Numara biçimi TR + YYYYAAGG + en az 7 haneli günlük sıra numarasıdır
+(ör. TR202410170000042). Her süreç order_sequences tablosundan tek bir
+upsert ile block_size'lık bir aralık ayırır ve numaraları bu aralıktan
+bellekten dağıtır. Ayrılmış aralıklar hiçbir zaman geri verilmediği için
+süreçler arasında çakışma ve yeniden deneme olmaz; geri alınan siparişler
+ve süreç yeniden başlatmaları yalnızca numara boşluğu bırakır.
+"""
+
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import NullPool
+from app import db
+from utils.database import apply_profile, profile_of
+from models.order import OrderSequence
+
+ORDER_NUMBER_PREFIX = 'TR'
+SEQUENCE_DIGITS = 7
+DEFAULT_BLOCK_SIZE = 100
+
+def format_order_number(day, value):
+    """Gün ve sıra numarasından sipariş numarasını oluşturur"""
+    return f'{ORDER_NUMBER_PREFIX}{day:%Y%m%d}{value:0{SEQUENCE_DIGITS}d}'
+
+def reserve_block(connection, day, size):
+    """
+    Gün için size adet sıra numarası ayırır, (ilk, son) aralığını döndürür.
+
+    Ekleme veya artırma tek bir INSERT ... ON CONFLICT ... RETURNING
+    ifadesidir; satır kilidi altında atomiktir ve yarışta tekrar gerekmez.
+    """
+    table = OrderSequence.__table__
+    statement = sqlite_insert(table).values(day=day, last_value=size)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.day],
+        set_={'last_value': table.c.last_value + size}
+    ).returning(table.c.last_value)
+    last = connection.execute(statement).scalar_one()
+    return last - size + 1, last
+
+class OrderNumberAllocator:
+    """
+    Süreç içi blok ayırıcı.
+
+    Her veritabanı ve gün için ayrılmış aralığın sıradaki değerini tutar;
+    aralık bitince ayrı, hemen commit edilen bir işlemde yeni blok ayırır.
+    Blok ayırma havuzsuz ayrı bir motor kullanır: istek oturumları havuzdaki
+    tüm bağlantıları tutarken ikinci bir bağlantı beklemek kilitlenmeye yol
+    açardı. İş parçacığı güvenlidir.
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._engines = {}
+
+    def allocate(self, engine, day, block_size=None):
+        """Günün sıradaki sipariş numarasını döndürür"""
+        key = str(engine.url)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] != day or block[1] > block[2]:
+                if key not in self._engines:
+                    self._engines[key] = create_engine(engine.url, poolclass=NullPool)
+                    apply_profile(self._engines[key], profile_of(engine))
+                with self._engines[key].begin() as connection:
+                    first, last = reserve_block(connection, day, block_size or self.block_size)
+                block = self._blocks[key] = [day, first, last]
+            value = block[1]
+            block[1] += 1
+        return format_order_number(day, value)
+
+    def reset(self):
+        """Bellekteki blokları bırakır (kalan numaralar boşluk olarak kalır)"""
+        with self._lock:
+            self._blocks.clear()
+
+# Süreç genelinde paylaşılan ayırıcı
+allocator = OrderNumberAllocator()
+
+def next_order_number(day=None):
+    """Geçerli veritabanı için bugünün (yerel tarih) sıradaki sipariş numarasını döndürür"""
+    day = day or datetime.now().date()
+    block_size = current_app.config.get('ORDER_NUMBER_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+    return allocator.allocate(db.engine, day, block_size)
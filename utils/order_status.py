@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sipariş Durumu Modülü
+Sipariş durum makinesi ve küme tabanlı (toplu) durum geçişleri
+
+Geçişler Order.TRANSITIONS ile sınırlıdır. transition_orders seçilen
+siparişlerden hedefe geçebilecek durumda olanları tek bir UPDATE ile taşır;
+her geçiş aynı koşulla INSERT ... SELECT kullanılarak order_status_events
+tablosuna yazılır. Kargo ve teslim zamanları ilk girişte atanır (önceki değer
+korunur), iptalde ödeme durumu da iptal edilir. Toplu güncellemeler ORM
+olaylarını atladığı için iptallerin günlük satış etkisi gün bazında toplu
+uygulanır ve ürünlerin satış adetleri arka plan işiyle yeniden sayılır.
+"""
+
+from datetime import datetime
+from typing import NamedTuple
+from sqlalchemy import DateTime, Integer, String, case, distinct, func, insert, literal, select, update
+from app import db
+from models.order import Order, OrderItem, OrderStatusEvent
+from utils.dashboard import record_cancellations, reconcile_dashboard_stats
+from utils.jobs import enqueue
+
+# Tek ifadede kullanılan en fazla sipariş id'si (SQLite parametre sınırının altında)
+ID_CHUNK_SIZE = 5000
+
+# Eski müşteri iptallerinin yazdığı durum
+LEGACY_CANCELLED = 'İptal Edildi'
+
+# Kapıda ödemeli siparişlerin ödemesi teslimde alınır
+CASH_ON_DELIVERY = 'Kapıda Ödeme'
+
+class InvalidTransition(ValueError):
+    """Bilinmeyen durum veya izin verilmeyen geçiş"""
+
+class TransitionResult(NamedTuple):
+    """Toplu geçiş sonucu: taşınan ve durumu uygun olmadığı için atlanan siparişler"""
+
+    updated: int
+    skipped: int
+
+def source_statuses(status):
+    """Verilen duruma geçilebilecek durumlar"""
+    return [source for source, targets in Order.TRANSITIONS.items() if status in targets]
+
+def _status_values(status, now):
+    """Hedef durum için sipariş sütunlarının yeni değerleri"""
+    orders = Order.__table__
+    values = {'status': status, 'updated_at': now}
+    if status in (Order.SHIPPED, Order.DELIVERED):
+        values['shipped_at'] = func.coalesce(orders.c.shipped_at, now)
+    if status == Order.DELIVERED:
+        values['delivered_at'] = func.coalesce(orders.c.delivered_at, now)
+        values['payment_status'] = case((orders.c.payment_method == CASH_ON_DELIVERY, 'Ödendi'),
+                                        else_=orders.c.payment_status)
+    if status == Order.CANCELLED:
+        values['payment_status'] = Order.CANCELLED
+    return values
+
+def _transition(connection, session, condition, status, actor_id, note, now):
+    """Koşula uyan siparişleri hedef duruma taşır; taşınan sipariş sayısını döndürür"""
+    orders = Order.__table__
+    # Geçmiş kaydı önce yazılır: kaynak durum güncellemeden sonra okunamaz
+    connection.execute(insert(OrderStatusEvent.__table__).from_select(
+        ['order_id', 'from_status', 'to_status', 'actor_id', 'note', 'created_at'],
+        select(orders.c.id, orders.c.status, literal(status, String), literal(actor_id, Integer),
+               literal(note, String), literal(now, DateTime)).where(condition)
+    ))
+
+    if status == Order.CANCELLED:
+        record_cancellations(connection, condition)
+        product_ids = [product_id for product_id, in connection.execute(
+            select(distinct(OrderItem.product_id))
+            .where(OrderItem.order_id.in_(select(orders.c.id).where(condition)))
+        )]
+        if product_ids:
+            enqueue('products.recount_sales', {'product_ids': product_ids}, session)
+
+    return connection.execute(update(orders).where(condition).values(_status_values(status, now))).rowcount
+
+def transition_orders(status, order_ids=None, from_status=None, actor_id=None, note=None, session=None):
+    """
+    Siparişleri küme tabanlı olarak status durumuna taşır (commit etmez).
+
+    order_ids verilirse yalnızca bu siparişler, from_status verilirse
+    yalnızca o durumdakiler (ikisi birlikte verilebilir) değerlendirilir;
+    hedefe geçemeyecek durumdaki siparişler atlanır. Oturumda yüklü Order
+    nesneleri commit'e kadar eski durumu gösterir.
+    """
+    if status not in Order.STATUSES:
+        raise InvalidTransition(f'Geçersiz durum: {status}')
+    sources = source_statuses(status)
+    if from_status is not None:
+        if from_status not in sources:
+            raise InvalidTransition(f'"{from_status}" durumundaki siparişler "{status}" durumuna geçirilemez')
+        sources = [from_status]
+    if order_ids is None and from_status is None:
+        raise ValueError('Sipariş listesi veya kaynak durum verilmeli')
+
+    session = session or db.session()
+    connection = session.connection()
+    now = datetime.utcnow()
+    in_source = Order.__table__.c.status.in_(sources)
+
+    if order_ids is None:
+        return TransitionResult(_transition(connection, session, in_source, status, actor_id, note, now), 0)
+
+    order_ids = sorted(set(order_ids))
+    updated = 0
+    for start in range(0, len(order_ids), ID_CHUNK_SIZE):
+        chunk = order_ids[start:start + ID_CHUNK_SIZE]
+        condition = Order.__table__.c.id.in_(chunk) & in_source
+        updated += _transition(connection, session, condition, status, actor_id, note, now)
+    return TransitionResult(updated, len(order_ids) - updated)
+
+def normalize_order_statuses():
+    """
+    Eski müşteri iptallerini ('İptal Edildi') İptal durumuna çevirir.
+
+    Bu siparişler panel istatistiklerinde iptal sayılmadığı için düzeltme
+    varsa sayaçlar ve satış adetleri yeniden hesaplanır.
+    """
+    orders = Order.__table__
+    fixed = db.session.connection().execute(
+        update(orders).where(orders.c.status == LEGACY_CANCELLED)
+        .values(status=Order.CANCELLED, payment_status=Order.CANCELLED, updated_at=orders.c.updated_at)
+    ).rowcount
+    if fixed:
+        reconcile_dashboard_stats()
+    db.session.commit()
+    return fixed
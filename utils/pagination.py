@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Anahtar Kümesi (Keyset) Sayfalama Modülü
+OFFSET yerine son görülen (sıralama değeri, id) çiftinden devam eden sayfalama
+
+Önceki/sonraki bağlantıları opak bir imleç (cursor) taşır ve indeks üzerinde
+doğrudan konumlanır. İmleçsiz gelen numaralı sayfa bağlantıları OFFSET ile
+çalışmaya devam eder; böylece mevcut şablonların sayfa numaraları bozulmaz.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+from typing import Any, NamedTuple
+from sqlalchemy import tuple_, literal
+from models.product import Product
+from utils.cache import cached_count, get_product_cards
+
+class KeysetOrder(NamedTuple):
+    """Sayfalama sıralaması: sıralama sütunu ve eşitlik bozucu id sütunu"""
+
+    column: Any
+    id_column: Any
+    descending: bool = False
+
+    @property
+    def columns(self):
+        return (self.column, self.id_column)
+
+    def order_by(self, reverse=False):
+        """Sıralama ifadelerini döndürür (reverse=True ters yön)"""
+        descending = self.descending != reverse
+        return [column.desc() if descending else column.asc() for column in self.columns]
+
+    def after(self, values, reverse=False):
+        """Verilen anahtardan sonra gelen satırlar için satır değeri karşılaştırması"""
+        key = tuple_(*self.columns)
+        bound = tuple_(*[literal(value, column.type) for column, value in zip(self.columns, values)])
+        if self.descending != reverse:
+            return key < bound
+        return key > bound
+
+    def values_of(self, item):
+        """Bir ORM nesnesinin sıralama anahtarını döndürür"""
+        return tuple(getattr(item, column.key) for column in self.columns)
+
+# Vitrin listelerinin sıralama seçenekleri
+PRODUCT_SORTS = {
+    'name': KeysetOrder(Product.name, Product.id),
+    'price_asc': KeysetOrder(Product.price, Product.id),
+    'price_desc': KeysetOrder(Product.price, Product.id, descending=True),
+    'rating': KeysetOrder(Product.rating, Product.id, descending=True),
+    'newest': KeysetOrder(Product.created_at, Product.id, descending=True),
+}
+
+def newest_first(model):
+    """Modeli (created_at, id) üzerinden yeniden eskiye sıralayan KeysetOrder"""
+    return KeysetOrder(model.created_at, model.id, descending=True)
+
+def product_sort(sort_by):
+    """Sıralama adına karşılık gelen KeysetOrder'ı döndürür (varsayılan: ada göre)"""
+    return PRODUCT_SORTS.get(sort_by, PRODUCT_SORTS['name'])
+
+def _dump(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _load(value, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(order, direction, values):
+    """Sıralama anahtarını URL'de taşınabilir opak bir imlece dönüştürür"""
+    payload = json.dumps([direction, order.column.key, [_dump(value) for value in values]],
+                         separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(order, cursor):
+    """İmleci (yön, anahtar) olarak çözer; geçersiz veya başka sıralamaya aitse None döner"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, column_key, values = json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+        if direction not in ('next', 'prev') or column_key != order.column.key:
+            return None
+        if len(values) != len(order.columns):
+            return None
+        return direction, tuple(_load(value, column) for value, column in zip(values, order.columns))
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        return None
+
+class KeysetPagination:
+    """
+    Flask-SQLAlchemy Pagination arayüzüyle uyumlu anahtar kümesi sayfası.
+
+    page, pages, has_prev/has_next, prev_num/next_num ve iter_pages mevcut
+    şablonlarda olduğu gibi kullanılabilir; prev_cursor/next_cursor önceki ve
+    sonraki sayfaya OFFSET'siz geçiş için bağlantılara eklenir. total önbellekten
+    geldiği için yaklaşık olabilir.
+    """
+
+    def __init__(self, items, page, per_page, total, has_prev, has_next,
+                 prev_cursor=None, next_cursor=None):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        """Toplam sayfa sayısı (yaklaşık toplam mevcut konumla tutarlı tutulur)"""
+        pages = ceil((self.total or 0) / self.per_page) if self.per_page else 0
+        return max(pages, self.page + 1 if self.has_next else self.page)
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    def iter_pages(self, *, left_edge=2, left_current=2, right_current=4, right_edge=2):
+        """Sayfa numaralarını Flask-SQLAlchemy ile aynı şekilde üretir (atlananlar None)"""
+        pages_end = self.pages + 1
+        if pages_end == 1:
+            return
+
+        left_end = min(1 + left_edge, pages_end)
+        yield from range(1, left_end)
+        if left_end == pages_end:
+            return
+
+        mid_start = max(left_end, self.page - left_current)
+        mid_end = min(self.page + right_current + 1, pages_end)
+        if mid_start - left_end > 0:
+            yield None
+        yield from range(mid_start, mid_end)
+        if mid_end == pages_end:
+            return
+
+        right_start = max(mid_end, pages_end - right_edge)
+        if right_start - mid_end > 0:
+            yield None
+        yield from range(right_start, pages_end)
+
+    def __repr__(self):
+        return f'<KeysetPagination page={self.page} items={len(self.items)}>'
+
+def keyset_paginate(query, order, page=1, per_page=20, cursor=None, total=None, loader=None):
+    """
+    Sorguyu anahtar kümesi yöntemiyle sayfalar.
+
+    Sorgunun kendi ORDER BY'ı yok sayılır, order uygulanır. loader verilirse
+    sorgu yalnızca order.columns sütunlarını döndürmeli ve loader id listesinden
+    öğeleri üretmelidir. total verilmezse sayım önbellekli yapılır; çağıran
+    taraf sayaç gibi hazır bir değer de geçebilir.
+    """
+    page = max(page or 1, 1)
+    decoded = decode_cursor(order, cursor)
+    direction, values = decoded if decoded else (None, None)
+    reverse = direction == 'prev'
+
+    seek = query.order_by(None)
+    if values is not None:
+        seek = seek.filter(order.after(values, reverse))
+    seek = seek.order_by(*order.order_by(reverse))
+    if values is None and page > 1:
+        # İmleçsiz numaralı sayfa bağlantısı: OFFSET ile konumlan
+        seek = seek.offset((page - 1) * per_page)
+    rows = seek.limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+        has_prev, has_next = more, True
+        if not more:
+            page = 1
+    else:
+        has_prev, has_next = page > 1, more
+
+    keys = [tuple(row) if loader else order.values_of(row) for row in rows]
+    items = loader([key[-1] for key in keys]) if loader else rows
+    if total is None:
+        total = cached_count(query)
+
+    return KeysetPagination(
+        items=items,
+        page=page,
+        per_page=per_page,
+        total=total,
+        has_prev=has_prev,
+        has_next=has_next,
+        prev_cursor=encode_cursor(order, 'prev', keys[0]) if has_prev and keys else None,
+        next_cursor=encode_cursor(order, 'next', keys[-1]) if has_next and keys else None
+    )
+
+def paginate_cards(query, page, per_page, order=None, cursor=None, total=None):
+    """
+    Ürün sorgusunu sayfalar, öğeleri önbellekteki ürün kartlarıyla doldurur.
+
+    order verilirse anahtar kümesi sayfalaması kullanılır; verilmezse (ör.
+    alaka sırası) yalnızca id'ler üzerinden OFFSET ile sayfalanır. total
+    verilirse (ör. yüzey sayımlarından) ayrıca sayım sorgusu çalışmaz.
+    """
+    if order is not None:
+        return keyset_paginate(query.with_entities(*order.columns), order, page=page,
+                               per_page=per_page, cursor=cursor, total=total,
+                               loader=get_product_cards)
+
+    pagination = query.with_entities(Product.id).paginate(
+        page=page, per_page=per_page, error_out=False, count=total is None
+    )
+    if total is not None:
+        pagination.total = total
+    pagination.items = get_product_cards([row.id for row in pagination.items])
+    pagination.prev_cursor = pagination.next_cursor = None
+    return pagination
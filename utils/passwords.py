@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Şifre Servisi Modülü
+Şifre özetlerinin süreç havuzunda hesaplanması, yeniden özetleme ve hatalı giriş önbelleği
+
+PBKDF2 ve bcrypt bilerek yavaştır; istek iş parçacığında hesaplanınca bir
+giriş dalgası işlemcileri doldurur ve aynı süreçteki katalog sayfalarını
+bekletir. Servis özetleri sınırlı bir süreç havuzunda (PASSWORD_WORKERS)
+hesaplar: aynı anda en fazla havuz boyutu kadar çekirdek kullanılır,
+sırada bekleyen istek sayısı da PASSWORD_QUEUE_SIZE ile sınırlıdır.
+Algoritma ve maliyet yapılandırılabilir; parametreleri eskimiş bir özet
+başarılı girişte yeni parametrelerle yeniden hesaplanır. Son hatalı
+girişler kullanıcı adı ve istemci adresi başına bellekte tutulur; sınırı
+aşan denemeler hiç özet hesaplanmadan reddedilir.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Algoritma -> varsayılan maliyet (PBKDF2: yineleme sayısı, bcrypt: log2 tur sayısı)
+PASSWORD_ALGORITHMS = {
+    'pbkdf2': DEFAULT_PBKDF2_ITERATIONS,
+    'bcrypt': 12,
+}
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+class PasswordServiceBusy(RuntimeError):
+    """Özet havuzunun kuyruğu dolu; istek beklemeden reddedilmeli"""
+
+def _hash_password(password, algorithm, cost):
+    """Şifrenin özeti (havuz sürecinde çalışır)"""
+    if algorithm == 'bcrypt':
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(cost)).decode('ascii')
+    return generate_password_hash(password, method=f'pbkdf2:sha256:{cost}')
+
+def _verify_password(password_hash, password):
+    """Şifre özetle eşleşiyor mu (havuz sürecinde çalışır)"""
+    if password_hash.startswith(BCRYPT_PREFIXES):
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('ascii'))
+        except ValueError:
+            return False
+    return check_password_hash(password_hash, password)
+
+def hash_parameters(password_hash):
+    """Özetin (algoritma, maliyet) ikilisi; tanınmayan biçimlerde None"""
+    if password_hash.startswith(BCRYPT_PREFIXES):
+        try:
+            return 'bcrypt', int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+    method = password_hash.split('$', 1)[0].split(':')
+    if method[0] != 'pbkdf2' or method[1:2] != ['sha256']:
+        return None
+    try:
+        return 'pbkdf2', int(method[2]) if len(method) > 2 else DEFAULT_PBKDF2_ITERATIONS
+    except ValueError:
+        return None
+
+class _HashPool:
+    """Süreç havuzu ve bekleyen iş sınırı"""
+
+    def __init__(self, workers, queue_size):
+        self.pid = os.getpid()
+        # Çatallanan süreç ana sürecin iş parçacıklarını ve kilitlerini devralmasın
+        self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+# (çalışan sayısı, kuyruk boyutu) -> havuz; havuz uygulamalar arasında paylaşılır
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(workers, queue_size):
+    key = (workers, queue_size)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # Çatallanan süreçte devralınan havuz kullanılamaz
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = _HashPool(workers, queue_size)
+        return pool
+
+def _drop_pool(pool):
+    with _pools_lock:
+        for key, candidate in list(_pools.items()):
+            if candidate is pool:
+                del _pools[key]
+    pool.executor.shutdown(wait=False, cancel_futures=True)
+
+class FailedLoginCache:
+    """
+    Son hatalı girişlerin sayacı.
+
+    Kullanıcı adı ve istemci adresi için ayrı sınırlar uygulanır; ilk hatalı
+    denemeden itibaren window saniye içinde sınıra ulaşan anahtar pencere
+    bitene kadar engellenir. En fazla max_entries anahtar tutulur (en eskisi
+    atılır), böylece sahte kullanıcı adlarıyla bellek doldurulamaz.
+    """
+
+    def __init__(self, max_failures=5, max_failures_per_address=50, window=300, max_entries=10000):
+        self.max_failures = max_failures
+        self.max_failures_per_address = max_failures_per_address
+        self.window = window
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keys(self, username, address):
+        keys = [(('user', (username or '').lower()), self.max_failures)]
+        if address:
+            keys.append((('address', address), self.max_failures_per_address))
+        return keys
+
+    def retry_after(self, username, address=None):
+        """Engelli ise kalan saniye, değilse 0"""
+        now = time.monotonic()
+        wait = 0
+        with self._lock:
+            for key, limit in self._keys(username, address):
+                entry = self._entries.get(key)
+                if entry is None or not limit:
+                    continue
+                count, started = entry
+                if now - started >= self.window:
+                    del self._entries[key]
+                elif count >= limit:
+                    wait = max(wait, self.window - (now - started))
+        return wait
+
+    def record_failure(self, username, address=None):
+        now = time.monotonic()
+        with self._lock:
+            for key, _ in self._keys(username, address):
+                count, started = self._entries.pop(key, (0, now))
+                if now - started >= self.window:
+                    count, started = 0, now
+                self._entries[key] = (count + 1, started)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def reset(self, username):
+        """Başarılı girişte kullanıcı adının sayacını sıfırlar (adres sayacı kalır)"""
+        with self._lock:
+            self._entries.pop(('user', (username or '').lower()), None)
+
+class PasswordService:
+    """
+    Şifre özeti servisi.
+
+    workers=0 ise özetler çağıran iş parçacığında hesaplanır; aksi halde
+    paylaşılan süreç havuzuna gönderilir. Kuyrukta yer yoksa timeout
+    saniye beklenir, yine yer açılmazsa PasswordServiceBusy yükseltilir.
+    """
+
+    def __init__(self, algorithm='pbkdf2', cost=None, workers=2, queue_size=32, timeout=5.0,
+                 failures=None):
+        if algorithm not in PASSWORD_ALGORITHMS:
+            raise ValueError(f'Bilinmeyen şifre algoritması: {algorithm} '
+                             f'(geçerli: {", ".join(PASSWORD_ALGORITHMS)})')
+        self.algorithm = algorithm
+        self.cost = cost or PASSWORD_ALGORITHMS[algorithm]
+        if algorithm == 'bcrypt' and not 4 <= self.cost <= 31:
+            raise ValueError('bcrypt maliyeti 4 ile 31 arasında olmalı')
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.failures = failures or FailedLoginCache()
+
+    def _call(self, function, *args):
+        if not self.workers:
+            return function(*args)
+        pool = _get_pool(self.workers, self.queue_size)
+        if not pool.slots.acquire(timeout=self.timeout):
+            raise PasswordServiceBusy('Şifre havuzu dolu')
+        try:
+            return pool.executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            # Havuz süreci öldü: havuz sonraki çağrıda yeniden kurulur, bu çağrı burada hesaplanır
+            _drop_pool(pool)
+            return function(*args)
+        finally:
+            pool.slots.release()
+
+    def hash(self, password):
+        """Yapılandırılmış algoritma ve maliyetle şifre özeti"""
+        return self._call(_hash_password, password, self.algorithm, self.cost)
+
+    def verify(self, password_hash, password):
+        """Şifre özetle eşleşiyor mu"""
+        if not password_hash:
+            return False
+        return self._call(_verify_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Özet yapılandırılmış algoritma ve maliyetle mi hesaplanmamış"""
+        return hash_parameters(password_hash) != (self.algorithm, self.cost)
+
+def init_passwords(app):
+    """Uygulamanın şifre servisini oluşturur"""
+    service = PasswordService(
+        algorithm=app.config['PASSWORD_ALGORITHM'],
+        cost=app.config['PASSWORD_COST'],
+        workers=app.config['PASSWORD_WORKERS'],
+        queue_size=app.config['PASSWORD_QUEUE_SIZE'],
+        timeout=app.config['PASSWORD_QUEUE_TIMEOUT'],
+        failures=FailedLoginCache(
+            max_failures=app.config['LOGIN_MAX_FAILURES'],
+            max_failures_per_address=app.config['LOGIN_MAX_FAILURES_PER_ADDRESS'],
+            window=app.config['LOGIN_FAILURE_WINDOW']
+        )
+    )
+    app.extensions['password_service'] = service
+    return service
+
+def get_password_service():
+    return current_app.extensions['password_service']
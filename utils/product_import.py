@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Toplu Ürün İçe Aktarım Modülü
+CSV / JSONL ürün dosyalarının akışlı okunması, doğrulanması ve partiler halinde eklenmesi
+
+Dosya satır satır okunur; her satır ürün formunun (ProductImportForm)
+kurallarıyla doğrulanır ve geçerli satırlar (marka, model) anahtarıyla
+eşleşen ürünü günceller, eşleşme yoksa yeni ürün olarak eklenir. Her parti
+tek sorguda eşleştirilip tek işlemde commit edilir; arama indeksi, sayaçlar,
+önbellekler ve öneriler ürün olaylarıyla güncel kalır. Satırda bulunmayan
+isteğe bağlı alanlar mevcut üründe değiştirilmez. Kategoriler adlarıyla
+(Türkçe büyük/küçük harf duyarsız) katalog önbelleğindeki aktif
+kategorilerden çözülür.
+
+Yüklenen büyük dosyalar `products.import` arka plan işiyle içe aktarılır;
+ilerleme ve satır hataları product_imports tablosundan izlenir.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import tuple_
+from werkzeug.datastructures import MultiDict
+from app import db
+from forms.admin import ProductImportForm
+from models.product import Product
+from models.product_import import ProductImport
+from utils.cache import get_active_categories
+from utils.jobs import enqueue, job, renew_lease
+from utils.search import normalize_turkish
+
+# Dosya uzantısı -> biçim
+IMPORT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# Formdan doğrulanan metin ve sayı alanları
+FORM_FIELDS = ('name', 'description', 'price', 'original_price', 'stock_quantity',
+               'brand', 'model', 'color', 'size', 'image_url')
+BOOLEAN_FIELDS = ('is_active', 'is_featured')
+TRUE_VALUES = {'1', 'true', 'evet', 'e', 'yes', 'aktif'}
+FALSE_VALUES = {'0', 'false', 'hayır', 'hayir', 'h', 'no', 'pasif'}
+
+# İçe aktarım kaydında saklanan en fazla satır hatası
+MAX_REPORTED_ERRORS = 100
+
+class ProductImportError(ValueError):
+    """Okunamayan içe aktarım dosyası veya bilinmeyen biçim"""
+
+def detect_format(filename, requested=None):
+    """İstenen biçimi veya dosya uzantısından biçimi döndürür"""
+    if requested:
+        if requested not in IMPORT_FORMATS.values():
+            raise ProductImportError(f'Bilinmeyen biçim: {requested} (geçerli: csv, jsonl)')
+        return requested
+    extension = os.path.splitext(filename or '')[1].lower()
+    try:
+        return IMPORT_FORMATS[extension]
+    except KeyError:
+        raise ProductImportError('Dosya .csv, .jsonl veya .ndjson uzantılı olmalı') from None
+
+def read_rows(binary, import_format):
+    """
+    İkili dosyadan (satır no, satır sözlüğü, hata) üçlüleri üretir.
+
+    CSV'nin ilk satırı başlıktır; JSONL'de her boş olmayan satır bir JSON
+    nesnesidir. Bozuk satırlar hata mesajıyla birlikte verilir.
+    """
+    text = io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+    try:
+        if import_format == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row, None
+            return
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'Geçersiz JSON'
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, 'Satır bir JSON nesnesi olmalı'
+                continue
+            yield line_number, row, None
+    except UnicodeDecodeError:
+        raise ProductImportError('Dosya UTF-8 kodlamalı olmalı') from None
+    finally:
+        text.detach()
+
+class CategoryLookup:
+    """Kategori adı / id -> aktif kategori id'si (katalog önbelleğinden, içe aktarım başına bir kez)"""
+
+    def __init__(self):
+        categories = get_active_categories()
+        self.choices = [(category.id, category.name) for category in categories]
+        self._by_name = {normalize_turkish(category.name.strip()): category.id for category in categories}
+        self._ids = {category.id for category in categories}
+
+    def resolve(self, row):
+        name = _text(row.get('category'))
+        if name:
+            return self._by_name.get(normalize_turkish(name))
+        category_id = _text(row.get('category_id'))
+        if category_id.isdigit() and int(category_id) in self._ids:
+            return int(category_id)
+        return None
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return str(value).strip()
+
+def validate_row(row, categories, form=None):
+    """
+    Satırı ürün formunun kurallarıyla doğrular.
+
+    (ürün alanları, None) veya (None, hata mesajı) döndürür. Alanlar yalnızca
+    satırda bulunanları içerir; boş isteğe bağlı alanlar None olur. Verilen
+    form örneği her satırda yeniden işlenir (satır başına form kurulmaz).
+    """
+    category_id = categories.resolve(row)
+    if category_id is None:
+        return None, f'Bilinmeyen kategori: {_text(row.get("category") or row.get("category_id")) or "(boş)"}'
+
+    present = [field for field in FORM_FIELDS if field in row]
+    formdata = MultiDict((field, _text(row[field])) for field in present if _text(row[field]))
+    formdata['category_id'] = str(category_id)
+    if form is None:
+        form = ProductImportForm(formdata=None, category_choices=categories.choices)
+    form.process(formdata)
+    if not form.validate():
+        return None, '; '.join(f'{form[name].label.text}: {errors[0]}' for name, errors in form.errors.items())
+    if not form.brand.data or not form.model.data:
+        return None, 'Marka ve model zorunludur (ürün eşleştirme anahtarı)'
+
+    values = {field: form[field].data for field in present}
+    for field in ('name', 'description', 'brand', 'model', 'color', 'size', 'image_url'):
+        if field in values:
+            values[field] = values[field].strip() or None
+    values['category_id'] = category_id
+    for field in BOOLEAN_FIELDS:
+        if field in row:
+            flag = _text(row[field]).lower()
+            if flag not in TRUE_VALUES | FALSE_VALUES:
+                return None, f'{field}: evet/hayır veya 1/0 olmalı'
+            values[field] = flag in TRUE_VALUES
+    return values, None
+
+class ProductImporter:
+    """
+    Satırları doğrulayıp partiler halinde ekleyen / güncelleyen içe aktarıcı.
+
+    on_batch(importer) her partinin commit'inden hemen önce aynı işlemde
+    çağrılır (ör. ilerleme kaydı için).
+    """
+
+    def __init__(self, batch_size=500, on_batch=None):
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return round(self.processed / self.elapsed, 1) if self.elapsed else 0.0
+
+    def run(self, rows):
+        started = time.perf_counter()
+        categories = CategoryLookup()
+        form = ProductImportForm(formdata=None, category_choices=categories.choices)
+        batch = []
+        for row_number, row, error in rows:
+            self.processed += 1
+            values = None
+            if error is None:
+                values, error = validate_row(row, categories, form)
+            if error:
+                self._fail(row_number, error)
+            else:
+                batch.append((row_number, values))
+            if len(batch) >= self.batch_size:
+                self.elapsed = time.perf_counter() - started
+                self._flush(batch)
+                batch = []
+        self.elapsed = time.perf_counter() - started
+        self._flush(batch)
+        self.elapsed = time.perf_counter() - started
+        return self
+
+    def _fail(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'message': message})
+
+    def _flush(self, batch):
+        """Partiyi tek sorguda eşleştirir, ekler / günceller ve commit eder"""
+        keys = {(values['brand'], values['model']) for _, values in batch}
+        matches = {}
+        if keys:
+            for product in Product.query.filter(tuple_(Product.brand, Product.model).in_(keys)):
+                matches.setdefault((product.brand, product.model), []).append(product)
+
+        for row_number, values in batch:
+            key = (values['brand'], values['model'])
+            products = matches.get(key)
+            if products and len(products) > 1:
+                self._fail(row_number, f'Bu marka ve modelde birden fazla ürün var: {key[0]} / {key[1]}')
+                continue
+            if products:
+                for field, value in values.items():
+                    setattr(products[0], field, value)
+                self.updated += 1
+            else:
+                product = Product(**values)
+                db.session.add(product)
+                matches[key] = [product]
+                self.created += 1
+
+        if self.on_batch:
+            self.on_batch(self)
+        db.session.commit()
+
+def _save_progress(record, importer, bytes_read):
+    record.processed = importer.processed
+    record.created = importer.created
+    record.updated = importer.updated
+    record.failed = importer.failed
+    record.errors = list(importer.errors)
+    record.rows_per_second = importer.rows_per_second
+    record.bytes_read = bytes_read
+    # Arka plan işinde kilit her partide tazelenir; uzun dosya başka bir
+    # çalışanca yeniden alınıp ikinci kez içe aktarılmaz
+    renew_lease()
+
+def run_import(import_id):
+    """Kayıtlı içe aktarımı çalıştırır; bitince yüklenen dosyayı siler"""
+    record = db.session.get(ProductImport, import_id)
+    if record is None or record.status == ProductImport.DONE:
+        return record
+    record.status = ProductImport.RUNNING
+    record.started_at = datetime.utcnow()
+    record.last_error = None
+    db.session.commit()
+
+    try:
+        with open(record.path, 'rb') as binary:
+            importer = ProductImporter(
+                batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+                on_batch=lambda importer: _save_progress(record, importer, binary.tell())
+            )
+            importer.run(read_rows(binary, record.format))
+    except (OSError, ProductImportError) as error:
+        _finish_import(record, ProductImport.FAILED, str(error))
+    except Exception as error:
+        # Beklenmeyen hata (ör. kilitli veritabanı): kayıt 'running' kalmaz,
+        # satır içi yükleme de 500 yerine başarısız raporu döndürür
+        current_app.logger.exception('Ürün içe aktarımı %s başarısız', record.id)
+        _finish_import(record, ProductImport.FAILED, f'{type(error).__name__}: {error}')
+    else:
+        record.bytes_read = record.file_size
+        _finish_import(record, ProductImport.DONE)
+    return record
+
+def _finish_import(record, status, error=None):
+    """Sonucu yazar ve yüklenen dosyayı siler; hata varsa yarım kalan parça geri alınır"""
+    if error is not None:
+        db.session.rollback()
+    record.status = status
+    record.last_error = error
+    record.finished_at = datetime.utcnow()
+    _remove_upload(record)
+    db.session.commit()
+
+def _remove_upload(record):
+    if record.path and os.path.exists(record.path):
+        os.remove(record.path)
+    record.path = None
+
+def start_import(upload, import_format=None, user_id=None):
+    """
+    Yüklenen dosyayı kaydeder ve içe aktarımı başlatır.
+
+    IMPORT_INLINE_MAX_BYTES'tan küçük dosyalar istek içinde içe aktarılır,
+    büyükleri arka plan işine verilir. ProductImport kaydını döndürür.
+    """
+    import_format = detect_format(upload.filename, import_format)
+    folder = current_app.config['IMPORT_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f'{uuid.uuid4().hex}.{import_format}')
+    upload.save(path)
+
+    record = ProductImport(filename=os.path.basename(upload.filename or path)[:255], format=import_format,
+                           path=path, file_size=os.path.getsize(path), created_by=user_id)
+    db.session.add(record)
+    db.session.flush()
+    if record.file_size <= current_app.config['IMPORT_INLINE_MAX_BYTES']:
+        db.session.commit()
+        return run_import(record.id)
+
+    enqueue('products.import', {'import_id': record.id}, dedupe_key=f'product_import:{record.id}')
+    db.session.commit()
+    return record
+
+@job('products.import', max_attempts=1)
+def import_products_job(import_id):
+    """Büyük ürün dosyalarını istek dışında içe aktarır"""
+    record = run_import(import_id)
+    # Başarısız içe aktarım iş çalıştırıcıya da başarısız iş olarak bildirilir
+    if record is not None and record.status == ProductImport.FAILED:
+        raise ProductImportError(record.last_error)
+
+@click.command('import-products')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Dosya biçimi (varsayılan: uzantıdan)')
+@click.option('--batch-size', type=int, default=None, help='Her işlemdeki satır sayısı (varsayılan: IMPORT_BATCH_SIZE)')
+@with_appcontext
+def import_products_command(path, import_format, batch_size):
+    """CSV / JSONL ürün dosyasını (marka + model anahtarıyla) içe aktarır"""
+    try:
+        import_format = detect_format(path, import_format)
+    except ProductImportError as error:
+        raise click.UsageError(str(error))
+
+    def report(importer):
+        click.echo(f'{importer.processed} satır ({importer.rows_per_second} satır/sn)')
+
+    importer = ProductImporter(batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE'],
+                               on_batch=report)
+    with open(path, 'rb') as binary:
+        try:
+            importer.run(read_rows(binary, import_format))
+        except ProductImportError as error:
+            raise click.ClickException(str(error))
+
+    for error in importer.errors:
+        click.echo(f'Satır {error["row"]}: {error["message"]}', err=True)
+    click.echo(f'{importer.created} ürün eklendi, {importer.updated} ürün güncellendi, '
+               f'{importer.failed} satır hatalı ({importer.elapsed:.1f} sn, {importer.rows_per_second} satır/sn)')
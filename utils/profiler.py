@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL Profil Modülü
+İstek başına sorgu sayısı, veritabanı süresi ve N+1 sorgu kalıbı tespiti
+
+SQL_PROFILER=1 ile açılır. Motor olaylarıyla her SQL ifadesinin süresi ve
+normalleştirilmiş parmak izi (değişmez değerler ve IN listeleri katlanmış)
+isteğe bağlanır; ifadeyi tetikleyen şablon satırı veya Python kaynağı çağrı
+yığınından bulunur. Aynı parmak izinin bir istekte eşik kadar tekrarı N+1
+olarak işaretlenir. Sonuçlar sınırlı bir halka arabellekte tutulur ve
+/admin/performans altında incelenir; her yanıta özet başlık eklenir.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+PROFILE_HEADER = 'X-SQL-Profile'
+
+# Profili tutulmayan uç noktalar (statik dosyalar ve profil sayfalarının kendisi)
+IGNORED_ENDPOINTS = ('static', 'admin.performance', 'admin.performance_detail',
+                     'admin.clear_performance')
+
+# İstek başına saklanan en fazla parmak izi
+MAX_STATEMENTS = 50
+
+_NORMALIZERS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE), 'IN (?, ...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement):
+    """SQL ifadesindeki değişmez değerleri ve IN listelerini katlayarak normalleştirir"""
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+class ProfileLog:
+    """Son istek profillerini tutan, iş parçacığı güvenli halka arabellek"""
+
+    def __init__(self, size=200):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=size)
+        self._next_id = 1
+
+    def configure(self, size):
+        with self._lock:
+            self._entries = deque(self._entries, maxlen=size)
+
+    def add(self, entry):
+        with self._lock:
+            entry['id'] = self._next_id
+            self._next_id += 1
+            self._entries.append(entry)
+        return entry['id']
+
+    def entries(self, n_plus_one_only=False):
+        """Profilleri yeniden eskiye döndürür"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        if n_plus_one_only:
+            entries = [entry for entry in entries if entry['n_plus_one']]
+        return entries
+
+    def get(self, entry_id):
+        with self._lock:
+            return next((entry for entry in self._entries if entry['id'] == entry_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+profile_log = ProfileLog()
+
+class _RequestProfile:
+    """Tek bir isteğin topladığı sorgu örnekleri"""
+
+    __slots__ = ('started', 'query_count', 'db_seconds', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        # parmak izi -> [adet, toplam süre, Counter(konum)]
+        self.statements = {}
+
+    def record(self, statement, seconds, location):
+        self.query_count += 1
+        self.db_seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0, Counter()]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2][location] += 1
+
+def _source_location(root, skip):
+    """
+    Sorguyu tetikleyen proje kaynağı: en içteki proje çerçevesi (dosya:satır)
+    ve sorgu bir şablon işlenirken çalıştıysa onu çağıran şablon satırı.
+    """
+    source = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename != skip and 'site-packages' not in filename:
+            template = frame.f_globals.get('__jinja_template__')
+            lineno = template.get_corresponding_lineno(frame.f_lineno) if template else frame.f_lineno
+            location = f'{os.path.relpath(filename, root)}:{lineno}'
+            if template is not None:
+                return f'{location} › {source}' if source else location
+            source = source or location
+        frame = frame.f_back
+    return source or '?'
+
+def init_profiler(app, engine):
+    """SQL_PROFILER açıksa motor olaylarını ve istek kancalarını bağlar"""
+    if not app.config.get('SQL_PROFILER'):
+        return False
+
+    profile_log.configure(app.config['SQL_PROFILER_HISTORY'])
+    threshold = app.config['SQL_PROFILER_N_PLUS_ONE']
+    root = app.root_path + os.sep
+    this_file = os.path.abspath(__file__)
+
+    # Başlangıç zamanı ifadenin yürütme bağlamında tutulur; hata veren ifadenin
+    # bağlamı kendisiyle birlikte atılır, bağlantıda birikmez
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        context._profiler_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._profiler_started
+        if has_request_context() and 'sql_profile' in g:
+            g.sql_profile.record(fingerprint(statement), seconds, _source_location(root, this_file))
+
+    @app.before_request
+    def _start_profile():
+        if request.endpoint not in IGNORED_ENDPOINTS:
+            g.sql_profile = _RequestProfile()
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        statements = sorted((
+            {
+                'fingerprint': statement,
+                'count': count,
+                'total_ms': round(seconds * 1000, 3),
+                'locations': locations.most_common(3)
+            }
+            for statement, (count, seconds, locations) in profile.statements.items()
+        ), key=lambda item: (-item['count'], -item['total_ms']))
+        n_plus_one = [item for item in statements if item['count'] >= threshold]
+        entry_id = profile_log.add({
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'at': datetime.now(),
+            'duration_ms': round((time.perf_counter() - profile.started) * 1000, 2),
+            'query_count': profile.query_count,
+            'db_ms': round(profile.db_seconds * 1000, 2),
+            'statements': statements[:MAX_STATEMENTS],
+            'n_plus_one': n_plus_one
+        })
+
+        db_ms = profile.db_seconds * 1000
+        response.headers[PROFILE_HEADER] = (
+            f'queries={profile.query_count}; db_ms={db_ms:.2f}; '
+            f'n_plus_one={len(n_plus_one)}; id={entry_id}'
+        )
+        response.headers.add('Server-Timing', f'db;dur={db_ms:.2f};desc="{profile.query_count} SQL"')
+        return response
+
+    return True
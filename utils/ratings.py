@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Puan Özeti Modülü
+Ürün puan toplamı, yorum sayısı ve yıldız dağılımının artımlı bakımı
+"""
+
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, case, select, update, insert, delete, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import db
+from models.product import Product
+from models.review import Review, ProductRatingStats
+from utils.cache import invalidate_products
+from utils.suggest import refresh_suggestions
+from utils.events import old_value, track_old_values
+
+STARS = range(1, 6)
+
+def _sync_product(connection, product_id):
+    """Ürünün rating ve review_count alanlarını puan özetinden günceller"""
+    stats = ProductRatingStats.__table__
+    products = Product.__table__
+    count = select(stats.c.rating_count).where(stats.c.product_id == product_id).scalar_subquery()
+    average = select(
+        case((stats.c.rating_count > 0, stats.c.rating_sum * 1.0 / stats.c.rating_count), else_=0.0)
+    ).where(stats.c.product_id == product_id).scalar_subquery()
+    connection.execute(
+        update(products).where(products.c.id == product_id)
+        .values(rating=func.coalesce(average, 0.0), review_count=func.coalesce(count, 0))
+    )
+
+def _apply(connection, session, product_id, rating, sign):
+    """Tek bir onaylı yorumun katkısını (sign=+1 ekle, -1 çıkar) özete uygular"""
+    stats = ProductRatingStats.__table__
+    star = stats.c[f'star_{rating}']
+    result = connection.execute(
+        update(stats).where(stats.c.product_id == product_id).values({
+            stats.c.rating_sum: stats.c.rating_sum + sign * rating,
+            stats.c.rating_count: stats.c.rating_count + sign,
+            star: star + sign,
+            stats.c.updated_at: datetime.utcnow()
+        })
+    )
+    if result.rowcount == 0:
+        # Özet satırı yoksa bu ürün için yorumlardan baştan oluştur
+        rebuild_rating_stats([product_id], connection)
+    _sync_product(connection, product_id)
+    if session is not None:
+        invalidate_products([product_id], session)
+        refresh_suggestions([product_id], session)
+
+def _aggregate_query(product_ids=None):
+    """Onaylı yorumları ürün bazında tek geçişte toplayan sorgu"""
+    columns = [
+        Review.product_id,
+        func.sum(Review.rating).label('rating_sum'),
+        func.count(Review.id).label('rating_count')
+    ]
+    columns += [
+        func.sum(case((Review.rating == star, 1), else_=0)).label(f'star_{star}')
+        for star in STARS
+    ]
+    query = select(*columns).where(Review.is_approved == True).group_by(Review.product_id)
+    if product_ids is not None:
+        query = query.where(Review.product_id.in_(product_ids))
+    return query
+
+def rebuild_rating_stats(product_ids=None, connection=None):
+    """
+    Puan özetlerini yorumlardan tek bir gruplu sorguyla yeniden oluşturur.
+
+    product_ids verilmezse tüm ürünler onarılır. Ürünlerin rating ve
+    review_count alanları da özetle eşitlenir.
+    """
+    connection = connection or db.session.connection()
+    stats = ProductRatingStats.__table__
+    products = Product.__table__
+
+    if product_ids is None:
+        connection.execute(delete(stats))
+        target_products = select(products.c.id)
+    else:
+        product_ids = list(product_ids)
+        connection.execute(delete(stats).where(stats.c.product_id.in_(product_ids)))
+        target_products = select(products.c.id).where(products.c.id.in_(product_ids))
+
+    aggregates = _aggregate_query(product_ids).subquery()
+    names = ['rating_sum', 'rating_count'] + [f'star_{star}' for star in STARS]
+    target = target_products.subquery()
+    connection.execute(insert(stats).from_select(
+        ['product_id'] + names + ['updated_at'],
+        select(
+            target.c.id,
+            *[func.coalesce(aggregates.c[name], 0) for name in names],
+            func.current_timestamp()
+        ).select_from(target.outerjoin(aggregates, aggregates.c.product_id == target.c.id))
+    ))
+
+    # Ürün tablosundaki özet alanları tek UPDATE ile eşitle
+    count = select(stats.c.rating_count).where(stats.c.product_id == products.c.id).scalar_subquery()
+    average = select(
+        case((stats.c.rating_count > 0, stats.c.rating_sum * 1.0 / stats.c.rating_count), else_=0.0)
+    ).where(stats.c.product_id == products.c.id).scalar_subquery()
+    statement = update(products).values(rating=func.coalesce(average, 0.0),
+                                        review_count=func.coalesce(count, 0))
+    if product_ids is not None:
+        statement = statement.where(products.c.id.in_(product_ids))
+    return connection.execute(statement).rowcount
+
+def ensure_rating_stats():
+    """Özeti olmayan ürünler varsa tüm özetleri onarır"""
+    missing = db.session.query(Product.id).filter(
+        ~db.session.query(ProductRatingStats.product_id)
+        .filter(ProductRatingStats.product_id == Product.id).exists()
+    ).first()
+    if missing:
+        rebuild_rating_stats()
+        db.session.commit()
+
+@click.command('rebuild-ratings')
+@with_appcontext
+def rebuild_ratings_command():
+    """Ürün puan özetlerini yorumlardan yeniden oluşturur"""
+    updated = rebuild_rating_stats()
+    db.session.commit()
+    click.echo(f'{updated} ürünün puan özeti yeniden oluşturuldu.')
+
+track_old_values(Review.is_approved, Review.product_id, Review.rating)
+
+@event.listens_for(Product, 'after_insert')
+def _create_empty_stats(mapper, connection, product):
+    session = inspect(product).session
+    if session is None:
+        connection.execute(insert(ProductRatingStats.__table__).values(
+            product_id=product.id, updated_at=datetime.utcnow()
+        ))
+    else:
+        session.info.setdefault('new_rating_stats', []).append(product.id)
+
+@event.listens_for(Session, 'after_flush')
+def _insert_empty_stats(session, flush_context):
+    """
+    Flush'ta eklenen ürünlerin boş özetlerini tek executemany ile ekler.
+    
+    Aynı flush'taki bir yorum özeti zaten oluşturmuş olabilir; o satır korunur.
+    """
+    product_ids = session.info.pop('new_rating_stats', None)
+    if product_ids:
+        now = datetime.utcnow()
+        session.connection().execute(
+            sqlite_insert(ProductRatingStats.__table__).on_conflict_do_nothing(),
+            [{'product_id': product_id, 'updated_at': now} for product_id in product_ids]
+        )
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_empty_stats(session):
+    session.info.pop('new_rating_stats', None)
+
+@event.listens_for(Review, 'after_insert')
+def _review_added(mapper, connection, review):
+    if review.is_approved:
+        _apply(connection, inspect(review).session, review.product_id, review.rating, +1)
+
+@event.listens_for(Review, 'after_update')
+def _review_changed(mapper, connection, review):
+    state = inspect(review)
+    old = (old_value(state, 'is_approved'), old_value(state, 'product_id'), old_value(state, 'rating'))
+    new = (review.is_approved, review.product_id, review.rating)
+    if old == new:
+        return
+    if old[0]:
+        _apply(connection, state.session, old[1], old[2], -1)
+    if new[0]:
+        _apply(connection, state.session, new[1], new[2], +1)
+
+@event.listens_for(Review, 'after_delete')
+def _review_deleted(mapper, connection, review):
+    state = inspect(review)
+    if old_value(state, 'is_approved'):
+        _apply(connection, state.session, old_value(state, 'product_id'), old_value(state, 'rating'), -1)
@@ -2,13 +2,26 @@
 # -*- coding: utf-8 -*-
 """
 Örnek Veri Oluşturma Modülü
-Veritabanını örnek verilerle doldurur
+Veritabanını örnek verilerle doldurur; büyük hacimli yapay veri üreticisini içerir
 """
 
+import math
+import random
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate, islice, permutations
+from operator import itemgetter
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import DateTime, insert, func
 from app import db
 from models.user import User
 from models.product import Product, Category
 from models.review import Review
+from models.order import CartItem, CartSummary, Order, OrderItem
+from utils.indexes import drop_indexes, ensure_indexes
+from utils.passwords import get_password_service
 
 def create_sample_data():
     """Örnek verileri oluşturur"""
@@ -58,4 +71,486 @@ def create_sample_data():
     print(f"- {len(categories)} e-ticaret kategorisi")
     print(f"- 0 ürün (kullanıcılar ekleyecek)")
     print(f"- 1 admin kullanıcı")
-    print(f"- Ürünler yönetici panelinden eklenebilir")
\ No newline at end of file
+    print(f"- Ürünler yönetici panelinden eklenebilir")
+# ---------------------------------------------------------------------------
+# Büyük hacimli yapay veri üreticisi
+# ---------------------------------------------------------------------------
+
+# Üretilen tüm kullanıcıların ortak şifresi
+SAMPLE_PASSWORD = 'ornek123'
+
+# Kategori adına göre ürün isimleri ve medyan fiyat (TL)
+CATEGORY_PRODUCTS = {
+    'Elektronik': (['Akıllı Telefon', 'Dizüstü Bilgisayar', 'Kablosuz Kulaklık', 'Televizyon',
+                    'Tablet', 'Akıllı Saat', 'Bluetooth Hoparlör', 'Oyun Konsolu', 'Monitör',
+                    'Şarj Cihazı', 'Powerbank', 'Klavye', 'Mouse'], 2500.0),
+    'Giyim & Moda': (['Tişört', 'Kot Pantolon', 'Gömlek', 'Elbise', 'Mont', 'Kazak', 'Etek',
+                      'Spor Ayakkabı', 'Bot', 'Sweatshirt', 'Çanta', 'Eşofman Takımı'], 350.0),
+    'Ev & Yaşam': (['Nevresim Takımı', 'Tencere Seti', 'Kahve Makinesi', 'Halı', 'Yastık',
+                    'Çay Makinesi', 'Abajur', 'Havlu Seti', 'Yemek Takımı', 'Elektrikli Süpürge',
+                    'Blender', 'Tost Makinesi'], 600.0),
+    'Kitap & Kırtasiye': (['Roman', 'Defter', 'Kalem Seti', 'Ajanda', 'Boya Kalemi', 'Hikaye Kitabı',
+                           'Sözlük', 'Çizim Defteri', 'Dolma Kalem', 'Test Kitabı'], 80.0),
+    'Spor & Outdoor': (['Koşu Ayakkabısı', 'Yoga Matı', 'Dambıl Seti', 'Kamp Çadırı', 'Uyku Tulumu',
+                        'Bisiklet', 'Termos', 'Sırt Çantası', 'Futbol Topu', 'Kondisyon Bisikleti'], 450.0),
+    'Sağlık & Güzellik': (['Parfüm', 'Nemlendirici Krem', 'Şampuan', 'Ruj', 'Güneş Kremi',
+                           'Saç Kurutma Makinesi', 'Tıraş Makinesi', 'Diş Fırçası', 'Maskara',
+                           'Vitamin Takviyesi'], 180.0),
+    'Oyuncak & Bebek': (['Lego Seti', 'Peluş Oyuncak', 'Bebek Arabası', 'Puzzle', 'Oyuncak Araba',
+                         'Mama Sandalyesi', 'Bebek Bezi', 'Eğitici Oyuncak', 'Kutu Oyunu'], 250.0),
+    'Otomotiv': (['Oto Paspas', 'Araç Kamerası', 'Lastik', 'Motor Yağı', 'Oto Koltuk Kılıfı',
+                  'Telefon Tutucu', 'Akü', 'Silecek Süpürgesi', 'Araç Şarj Cihazı'], 400.0),
+}
+DEFAULT_PRODUCTS = (['Ürün'], 300.0)
+
+ADJECTIVES = ['Pro', 'Plus', 'Mini', 'Max', 'Lite', 'Ultra', 'Klasik', 'Premium', 'Eko', 'Yeni Seri']
+COLORS = ['Siyah', 'Beyaz', 'Kırmızı', 'Mavi', 'Lacivert', 'Yeşil', 'Gri', 'Bej', 'Pembe', 'Sarı']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL', 'Standart']
+DESCRIPTION_PHRASES = [
+    'Günlük kullanım için ideal', 'Yüksek kaliteli malzemeden üretilmiştir',
+    '2 yıl resmi distribütör garantilidir', 'Hızlı kargo ile kapınızda',
+    'Dayanıklı ve uzun ömürlü', 'Şık ve modern tasarım', 'Çevre dostu üretim',
+    'Kolay temizlenir', 'Hafif ve taşınabilir', 'Türkiye\'de üretilmiştir'
+]
+
+CITIES = {
+    'İstanbul': ['Kadıköy', 'Beşiktaş', 'Üsküdar', 'Şişli', 'Bakırköy', 'Ataşehir', 'Beylikdüzü', 'Fatih'],
+    'Ankara': ['Çankaya', 'Keçiören', 'Yenimahalle', 'Mamak', 'Etimesgut'],
+    'İzmir': ['Karşıyaka', 'Bornova', 'Konak', 'Buca', 'Çiğli'],
+    'Bursa': ['Nilüfer', 'Osmangazi', 'Yıldırım'],
+    'Antalya': ['Muratpaşa', 'Konyaaltı', 'Kepez'],
+    'Adana': ['Seyhan', 'Çukurova'],
+    'Konya': ['Selçuklu', 'Meram'],
+    'Gaziantep': ['Şahinbey', 'Şehitkamil'],
+    'Kayseri': ['Melikgazi', 'Kocasinan'],
+    'Trabzon': ['Ortahisar', 'Akçaabat'],
+    'Eskişehir': ['Odunpazarı', 'Tepebaşı'],
+    'Samsun': ['Atakum', 'İlkadım'],
+}
+# Şehirlerin yaklaşık nüfus ağırlıkları
+CITY_WEIGHTS = [18, 6, 5, 3, 3, 2, 2, 2, 1.5, 1, 1, 1.5]
+STREETS = ['Atatürk', 'Cumhuriyet', 'İstiklal', 'Gazi', 'Fatih', 'Mimar Sinan', 'Yunus Emre',
+           'Barış', 'Zafer', 'Menekşe', 'Lale', 'Papatya', 'Çınar', 'Bahçelievler']
+EMAIL_DOMAINS = ['gmail.com', 'hotmail.com', 'yahoo.com', 'outlook.com', 'yandex.com.tr']
+
+REVIEW_TITLES = {
+    1: ['Hiç beğenmedim', 'Hayal kırıklığı', 'Paranıza yazık'],
+    2: ['Beklentimi karşılamadı', 'Kalitesi düşük', 'İdare eder ama pahalı'],
+    3: ['Fiyatına göre idare eder', 'Ortalama bir ürün', 'Fena değil'],
+    4: ['Gayet memnunum', 'Tavsiye ederim', 'Güzel ürün'],
+    5: ['Harika ürün!', 'Kesinlikle tavsiye ederim', 'Mükemmel, çok memnunum'],
+}
+REVIEW_COMMENTS = {
+    1: ['Ürün açıklamadaki gibi değil.', 'İki gün sonra bozuldu.', 'İade etmek zorunda kaldım.'],
+    2: ['Kargo geç geldi, ürün de vasat.', 'Malzeme kalitesi beklediğimden kötü.'],
+    3: ['Kullanılabilir ama daha iyisi var.', 'Fiyat performans olarak orta.'],
+    4: ['Kargo hızlıydı, ürün sağlam geldi.', 'Birkaç eksiği var ama memnunum.'],
+    5: ['Paketleme çok özenliydi, ürün kusursuz.', 'Ailece çok beğendik, herkese öneririm.'],
+}
+RATING_WEIGHTS = [5, 5, 10, 25, 55]
+
+PAYMENT_METHODS = ['Kredi Kartı', 'Havale/EFT', 'Dijital Cüzdan', 'Kapıda Ödeme']
+PAYMENT_WEIGHTS = [70, 10, 12, 8]
+
+# Türkçe karakterleri kullanıcı adı ve e-posta için ASCII'ye çevirme tablosu
+_ASCII_FOLD = str.maketrans('çğıöşüÇĞİÖŞÜâîû ', 'cgiosuCGIOSUaiu.')
+
+
+def _slug(value):
+    return value.translate(_ASCII_FOLD).lower().replace("'", '')
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+class _Random:
+    """
+    Tohumlu random.Random üzerinde hızlı seçim yardımcıları.
+
+    rng.choice/choices/randint her çağrıda ek iş yapar; milyonlarca satırda
+    tek bir random() çağrısından indeks üretmek üretimi birkaç kat hızlandırır.
+    """
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.random = self.rng.random
+
+    def pick(self, options):
+        return options[int(self.random() * len(options))]
+
+    def between(self, low, high):
+        return low + int(self.random() * (high - low + 1))
+
+    def chance(self, probability):
+        return self.random() < probability
+
+    def weighted(self, options, cum_weights):
+        return options[bisect(cum_weights, self.random() * cum_weights[-1])]
+
+    def seconds_before(self, moment, max_seconds):
+        return moment - timedelta(seconds=int(self.random() * max_seconds))
+
+def _zipf_cum_weights(count, exponent, rng):
+    """Rastgele sıralanmış öğelere Zipf dağılımlı popülerlik verir (kümülatif ağırlıklar)"""
+    ranks = list(range(1, count + 1))
+    rng.rng.shuffle(ranks)
+    return list(accumulate(1.0 / rank ** exponent for rank in ranks))
+
+_RATINGS = (1, 2, 3, 4, 5)
+_RATING_CUM = list(accumulate(RATING_WEIGHTS))
+_PAYMENT_CUM = list(accumulate(PAYMENT_WEIGHTS))
+_QUANTITIES = (1, 2, 3)
+_CART_QUANTITY_CUM = list(accumulate((80, 15, 5)))
+_ORDER_QUANTITY_CUM = list(accumulate((85, 12, 3)))
+_ORDER_LINES = (1, 2, 3, 4)
+_ORDER_LINES_CUM = list(accumulate((50, 30, 15, 5)))
+_DAY = 86400
+
+def _insert_chunks(connection, table, rows, chunk_size):
+    """
+    Satır üretecini chunk_size'lık parçalar halinde executemany ile ekler.
+
+    INSERT ifadesi Core ile bir kez derlenir; SQLite'ta parçalar doğrudan
+    sürücünün executemany'sine verilir ve satır başına SQLAlchemy parametre
+    işleme maliyeti atlanır (1M satırda ~20 sn). Tarih alanları bu yüzden
+    SQLAlchemy'nin SQLite saklama biçimine burada çevrilir. Eklenen satır
+    sayısını döndürür.
+    """
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return total
+        total += len(chunk)
+        if connection.dialect.name != 'sqlite':
+            connection.execute(insert(table), chunk)
+            continue
+
+        compiled = insert(table).compile(dialect=connection.dialect, column_keys=list(chunk[0]))
+        dates = [key for key in compiled.positiontup if isinstance(table.c[key].type, DateTime)]
+        for row in chunk:
+            for key in dates:
+                if row[key] is not None:
+                    row[key] = row[key].isoformat(' ', 'microseconds')
+        values = itemgetter(*compiled.positiontup)
+        connection.exec_driver_sql(compiled.string, [values(row) for row in chunk])
+
+class _Pools:
+    """Faker ile tohumdan bir kez üretilen ad, soyad, marka ve metin havuzları"""
+
+    def __init__(self, seed):
+        from faker import Faker
+
+        faker = Faker('tr_TR')
+        faker.seed_instance(seed)
+        self.first_names = sorted({faker.first_name() for _ in range(400)})
+        self.last_names = sorted({faker.last_name() for _ in range(400)})
+        self.brands = sorted({faker.last_name() for _ in range(120)})
+        self.descriptions = ['. '.join(phrases) + '.' for phrases in permutations(DESCRIPTION_PHRASES, 3)]
+        self.cities = list(CITIES)
+        self.city_weights = list(accumulate(CITY_WEIGHTS))
+
+    def address(self, rng):
+        city = rng.weighted(self.cities, self.city_weights)
+        return (f'{rng.pick(STREETS)} Mah. {rng.pick(STREETS)} Sok. No:{rng.between(1, 150)} '
+                f'D:{rng.between(1, 30)}, {rng.pick(CITIES[city])}/{city}')
+
+def _user_rows(rng, pools, start_id, count, password_hash, now):
+    for user_id in range(start_id, start_id + count):
+        first_name = rng.pick(pools.first_names)
+        last_name = rng.pick(pools.last_names)
+        username = f'{_slug(first_name)}.{_slug(last_name)}{user_id}'
+        created_at = rng.seconds_before(now, 3 * 365 * _DAY)
+        yield {
+            'id': user_id,
+            'username': username,
+            'email': f'{username}@{rng.pick(EMAIL_DOMAINS)}' if rng.chance(0.8) else None,
+            'password_hash': password_hash,
+            'first_name': first_name,
+            'last_name': last_name,
+            'is_admin': False,
+            'active': rng.chance(0.98),
+            'last_login': created_at + timedelta(days=rng.between(0, 60)) if rng.chance(0.7) else None,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+def _product_rows(rng, pools, categories, start_id, count, now):
+    catalog = [(category.id,) + CATEGORY_PRODUCTS.get(category.name, DEFAULT_PRODUCTS)
+               for category in categories]
+    for product_id in range(start_id, start_id + count):
+        category_id, nouns, median_price = rng.pick(catalog)
+        noun = rng.pick(nouns)
+        brand = rng.pick(pools.brands)
+        model = f'{brand[:2].upper()}-{rng.between(100, 9999)}'
+        # Log-normal fiyat: çoğu ürün medyan civarında, az sayıda pahalı ürün
+        price = round(max(median_price * math.exp(rng.rng.gauss(0, 0.6)), 5.0), 2)
+        created_at = rng.seconds_before(now, 2 * 365 * _DAY)
+        yield {
+            'id': product_id,
+            'name': f'{brand} {noun} {rng.pick(ADJECTIVES)} {model}',
+            'description': f'{noun}. {rng.pick(pools.descriptions)}',
+            'price': price,
+            'original_price': round(price * (1.1 + rng.random() * 0.4), 2) if rng.chance(0.25) else None,
+            'stock_quantity': 0 if rng.chance(0.05) else int(5 / (1.0 - rng.random()) ** 0.8),
+            'category_id': category_id,
+            'brand': brand,
+            'model': model,
+            'color': rng.pick(COLORS),
+            'size': rng.pick(SIZES) if rng.chance(0.4) else None,
+            'weight': round(0.1 + rng.random() * 15, 2),
+            'is_active': rng.chance(0.97),
+            'is_featured': rng.chance(0.01),
+            'rating': 0.0,
+            'review_count': 0,
+            'sales_count': 0,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+def _review_rows(rng, start_id, count, pick_user, pick_product, now):
+    for review_id in range(start_id, start_id + count):
+        rating = rng.weighted(_RATINGS, _RATING_CUM)
+        created_at = rng.seconds_before(now, 365 * _DAY)
+        yield {
+            'id': review_id,
+            'user_id': pick_user(),
+            'product_id': pick_product(),
+            'rating': rating,
+            'title': rng.pick(REVIEW_TITLES[rating]),
+            'comment': rng.pick(REVIEW_COMMENTS[rating]) if rng.chance(0.7) else None,
+            'is_verified_purchase': rng.chance(0.6),
+            'is_approved': rng.chance(0.9),
+            'helpful_count': int(rng.rng.expovariate(0.5)),
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+def _cart_rows(rng, start_id, user_ids, pick_product, now):
+    item_id = start_id
+    for user_id in user_ids:
+        added_at = rng.seconds_before(now, 14 * _DAY)
+        # Küme sırası PYTHONHASHSEED'e bağlı olmasın diye sıralanır
+        for product_id in sorted({pick_product() for _ in range(rng.between(1, 5))}):
+            yield {
+                'id': item_id,
+                'user_id': user_id,
+                'product_id': product_id,
+                'quantity': rng.weighted(_QUANTITIES, _CART_QUANTITY_CUM),
+                'added_at': added_at
+            }
+            item_id += 1
+
+def _order_status(rng, age):
+    """Sipariş yaşına göre tutarlı bir durum seçer"""
+    if rng.chance(0.05):
+        return 'İptal'
+    if age < timedelta(days=1):
+        return rng.pick(('Beklemede', 'Onaylandı'))
+    if age < timedelta(days=4):
+        return rng.weighted(('Onaylandı', 'Kargoda', 'Teslim Edildi'), (2, 7, 10))
+    return 'Teslim Edildi'
+
+def _payment_status(status, payment_method):
+    if status == 'İptal':
+        return 'İptal'
+    if status == 'Beklemede' and payment_method == 'Havale/EFT':
+        return 'Beklemede'
+    if status != 'Teslim Edildi' and payment_method == 'Kapıda Ödeme':
+        return 'Beklemede'
+    return 'Ödendi'
+
+def _order_number_source(connection, block_size=1000):
+    """Siparişin gününe göre order_sequences'tan blok ayırarak numara üreten fonksiyon döndürür"""
+    from utils.order_numbers import reserve_block, format_order_number
+
+    blocks = {}
+
+    def number_for(day):
+        block = blocks.get(day)
+        if block is None or block[0] > block[1]:
+            block = blocks[day] = list(reserve_block(connection, day, block_size))
+        block[0] += 1
+        return format_order_number(day, block[0] - 1)
+    return number_for
+
+def _order_rows(rng, pools, start_id, count, item_start_id, pick_user, pick_product, prices, now,
+                number_for, items):
+    """Sipariş satırlarını üretir, sipariş kalemlerini items listesine ekler"""
+    from utils.cart import calculate_shipping
+
+    item_id = item_start_id
+    for order_id in range(start_id, start_id + count):
+        created_at = rng.seconds_before(now, 365 * _DAY)
+        status = _order_status(rng, now - created_at)
+        payment_method = rng.weighted(PAYMENT_METHODS, _PAYMENT_CUM)
+
+        subtotal = 0.0
+        lines = rng.weighted(_ORDER_LINES, _ORDER_LINES_CUM)
+        for product_id in sorted({pick_product() for _ in range(lines)}):
+            quantity = rng.weighted(_QUANTITIES, _ORDER_QUANTITY_CUM)
+            unit_price = prices[product_id]
+            items.append({
+                'id': item_id,
+                'order_id': order_id,
+                'product_id': product_id,
+                'quantity': quantity,
+                'unit_price': unit_price,
+                'total_price': round(unit_price * quantity, 2)
+            })
+            subtotal += unit_price * quantity
+            item_id += 1
+
+        shipped_at = (created_at + timedelta(hours=rng.between(6, 72))
+                      if status in ('Kargoda', 'Teslim Edildi') else None)
+        delivered_at = shipped_at + timedelta(hours=rng.between(12, 96)) if status == 'Teslim Edildi' else None
+        address = pools.address(rng)
+        yield {
+            'id': order_id,
+            'order_number': number_for(created_at.date()),
+            'user_id': pick_user(),
+            'status': status,
+            'total_amount': round(subtotal + calculate_shipping(subtotal), 2),
+            'shipping_address': address,
+            'billing_address': address if rng.chance(0.8) else pools.address(rng),
+            'payment_method': payment_method,
+            'payment_status': _payment_status(status, payment_method),
+            'notes': None,
+            'created_at': created_at,
+            'updated_at': delivered_at or shipped_at or created_at,
+            'shipped_at': shipped_at,
+            'delivered_at': delivered_at
+        }
+
+# Toplu yükleme süresince uygulanan SQLite ayarları
+BULK_PRAGMAS = {'synchronous': 'OFF', 'cache_size': '-200000', 'temp_store': 'MEMORY'}
+
+# İkincil indeksleri yükleme süresince kaldırılıp sonra yeniden oluşturulan tablolar
+BULK_TABLES = (User.__table__, Product.__table__, Review.__table__, CartItem.__table__,
+               Order.__table__, OrderItem.__table__)
+
+def _apply_pragmas(connection, pragmas):
+    """SQLite PRAGMA değerlerini uygular, öncekileri döndürür"""
+    if connection.dialect.name != 'sqlite':
+        return {}
+    previous = {}
+    for name, value in pragmas.items():
+        previous[name] = connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+        connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+    return previous
+
+def generate_dataset(users=0, products=0, reviews=0, carts=0, orders=0, seed=42,
+                     chunk_size=10000, product_skew=1.1, user_skew=0.6, log=None):
+    """
+    Gerçekçi Türkçe verilerle büyük hacimli yapay veri üretir.
+
+    Kullanıcı, ürün, yorum, sepet ve sipariş satırları parça parça executemany
+    ile tek bir işlemde eklenir; ORM olayları atlandığı için arama indeksi,
+    puan özetleri, panel sayaçları ve sepet özetleri sonunda toplu olarak
+    yeniden oluşturulur. Ürün ve kullanıcı popülerliği Zipf dağılımlıdır
+    (product_skew, user_skew üsleri). Aynı tohum aynı veritabanında aynı veriyi
+    üretir (zamanlar çalıştırma anına göredir). Yorum, sepet ve siparişler tüm
+    aktif ürünleri ve yönetici olmayan kullanıcıları kullanır. Eklenen satır
+    sayılarını döndürür.
+    """
+    from utils.search import is_enabled, rebuild_search_index
+    from utils.ratings import rebuild_rating_stats
+    from utils.dashboard import reconcile_dashboard_stats
+    from utils.cache import bump_catalog_version, product_card_cache
+
+    log = log or (lambda message: None)
+    rng = _Random(seed)
+    pools = _Pools(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    categories = Category.query.order_by(Category.id).all()
+    if products and not categories:
+        raise ValueError('Ürün üretmek için önce kategoriler oluşturulmalı')
+
+    counts = dict.fromkeys(('users', 'products', 'reviews', 'cart_items', 'orders', 'order_items'), 0)
+    connection = db.session.connection()
+    previous_pragmas = _apply_pragmas(connection, BULK_PRAGMAS)
+    drop_indexes(BULK_TABLES)
+    try:
+        started = time.perf_counter()
+        password_hash = get_password_service().hash(SAMPLE_PASSWORD)
+        counts['users'] = _insert_chunks(connection, User.__table__, _user_rows(
+            rng, pools, _next_id(User), users, password_hash, now), chunk_size)
+        counts['products'] = _insert_chunks(connection, Product.__table__, _product_rows(
+            rng, pools, categories, _next_id(Product), products, now), chunk_size)
+        log(f'{counts["users"]} kullanıcı, {counts["products"]} ürün eklendi '
+            f'({time.perf_counter() - started:.1f} sn)')
+
+        if reviews or carts or orders:
+            user_ids = [user_id for user_id, in db.session.query(User.id)
+                        .filter(User.is_admin == False).order_by(User.id)]
+            product_rows = db.session.query(Product.id, Product.price).filter(
+                Product.is_active == True).order_by(Product.id).all()
+            if not (user_ids and product_rows):
+                raise ValueError('Yorum, sepet ve sipariş için kullanıcı ve aktif ürün gerekli')
+            product_ids = [row.id for row in product_rows]
+            prices = dict(product_rows)
+
+            product_weights = _zipf_cum_weights(len(product_ids), product_skew, rng)
+            user_weights = _zipf_cum_weights(len(user_ids), user_skew, rng)
+            pick_product = lambda: rng.weighted(product_ids, product_weights)
+            pick_user = lambda: rng.weighted(user_ids, user_weights)
+
+            counts['reviews'] = _insert_chunks(connection, Review.__table__, _review_rows(
+                rng, _next_id(Review), reviews, pick_user, pick_product, now), chunk_size)
+
+            cart_users = sorted(rng.rng.sample(user_ids, min(carts, len(user_ids))))
+            counts['cart_items'] = _insert_chunks(connection, CartItem.__table__, _cart_rows(
+                rng, _next_id(CartItem), cart_users, pick_product, now), chunk_size)
+
+            order_id, item_id = _next_id(Order), _next_id(OrderItem)
+            number_for = _order_number_source(connection)
+            for start in range(0, orders, chunk_size):
+                size = min(chunk_size, orders - start)
+                items = []
+                counts['orders'] += _insert_chunks(connection, Order.__table__, _order_rows(
+                    rng, pools, order_id + start, size, item_id, pick_user, pick_product,
+                    prices, now, number_for, items), chunk_size)
+                counts['order_items'] += _insert_chunks(connection, OrderItem.__table__,
+                                                        iter(items), chunk_size)
+                item_id += len(items)
+            log(f'{counts["reviews"]} yorum, {counts["cart_items"]} sepet kalemi, '
+                f'{counts["orders"]} sipariş eklendi ({time.perf_counter() - started:.1f} sn)')
+
+        ensure_indexes()
+        log(f'İndeksler oluşturuldu ({time.perf_counter() - started:.1f} sn)')
+
+        # Olayların atlandığı türetilmiş verileri toplu olarak yeniden oluştur
+        if counts['products'] and is_enabled(connection):
+            rebuild_search_index()
+        if counts['products'] or counts['reviews']:
+            rebuild_rating_stats()
+        reconcile_dashboard_stats()
+        db.session.commit()
+        if counts['cart_items']:
+            CartSummary.rebuild_missing()
+        log(f'Türetilmiş veriler yeniden oluşturuldu ({time.perf_counter() - started:.1f} sn)')
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        _apply_pragmas(db.session.connection(), previous_pragmas)
+        ensure_indexes()
+
+    product_card_cache.clear()
+    bump_catalog_version()
+    return counts
+
+@click.command('generate-data')
+@click.option('--users', type=int, default=10000, help='Eklenecek kullanıcı sayısı')
+@click.option('--products', type=int, default=50000, help='Eklenecek ürün sayısı')
+@click.option('--reviews', type=int, default=200000, help='Eklenecek yorum sayısı')
+@click.option('--carts', type=int, default=2000, help='Sepeti dolu kullanıcı sayısı')
+@click.option('--orders', type=int, default=50000, help='Eklenecek sipariş sayısı')
+@click.option('--seed', type=int, default=42, help='Rastgele sayı tohumu')
+@click.option('--chunk-size', type=int, default=10000, help='Her INSERT grubundaki satır sayısı')
+@with_appcontext
+def generate_data_command(users, products, reviews, carts, orders, seed, chunk_size):
+    """Büyük hacimli yapay Türkçe veri üretir (yük ve performans testleri için)"""
+    counts = generate_dataset(users=users, products=products, reviews=reviews, carts=carts,
+                              orders=orders, seed=seed, chunk_size=chunk_size, log=click.echo)
+    click.echo(', '.join(f'{name}: {value}' for name, value in counts.items()))
+    click.echo(f'Üretilen kullanıcıların şifresi: {SAMPLE_PASSWORD}')
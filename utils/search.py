@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ürün Arama İndeksi Modülü
+SQLite FTS5 tabanlı tam metin arama indeksi ve Türkçe metin normalleştirme
+"""
+
+import re
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+from app import db
+from models.product import Product
+
+# FTS5 sanal tablosunun adı
+FTS_TABLE = 'products_fts'
+
+# BM25 ağırlıkları: ad, marka, açıklama, model
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+# Türkçe aksan katlama çiftleri (sözlüklü str.translate'ten çok daha hızlı zincirleme replace)
+_TURKISH_FOLD = (
+    ('ı', 'i'), ('ş', 's'), ('ğ', 'g'), ('ç', 'c'), ('ö', 'o'), ('ü', 'u'),
+    ('â', 'a'), ('î', 'i'), ('û', 'u')
+)
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# İndekslenen ürün alanları
+INDEXED_FIELDS = ('name', 'brand', 'description', 'model')
+
+# Veritabanı URL'si -> FTS5 indeksi kullanılabilir mi
+_enabled_databases = {}
+
+def normalize_turkish(value):
+    """Metni Türkçe kurallarıyla küçük harfe çevirir ve aksanları katlar"""
+    if not value:
+        return ''
+    lowered = value.replace('İ', 'i').replace('I', 'ı').lower()
+    if lowered.isascii():
+        return lowered
+    for letter, plain in _TURKISH_FOLD:
+        lowered = lowered.replace(letter, plain)
+    return lowered
+
+def tokenize(value):
+    """Normalleştirilmiş metni kelimelere ayırır"""
+    return _TOKEN_RE.findall(normalize_turkish(value))
+
+def build_match_query(value):
+    """Kullanıcı sorgusundan güvenli bir FTS5 MATCH ifadesi oluşturur"""
+    tokens = tokenize(value)
+    if not tokens:
+        return None
+    # Her kelime önek araması olarak eklenir, kelimeler VE ile bağlanır
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def _database_key(connection):
+    return str(connection.engine.url)
+
+def is_enabled(connection=None):
+    """Geçerli veritabanında FTS5 indeksinin kullanılabilir olup olmadığını döndürür"""
+    connection = connection or db.session.connection()
+    key = _database_key(connection)
+    if key not in _enabled_databases:
+        # Başlangıçta ensure_search_index çalışmadıysa (kurulu veritabanı, sunucu kipi)
+        # sanal tablonun varlığına bir kez bakılır
+        _enabled_databases[key] = connection.dialect.name == 'sqlite' and connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first() is not None
+    return _enabled_databases[key]
+
+def _index_values(product):
+    return {
+        'rowid': product.id,
+        'name': normalize_turkish(product.name),
+        'brand': normalize_turkish(product.brand),
+        'description': normalize_turkish(product.description),
+        'model': normalize_turkish(product.model)
+    }
+
+def _delete_row(connection, product_id):
+    connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :rowid'),
+                       {'rowid': product_id})
+
+def _insert_rows(connection, rows):
+    connection.execute(text(
+        f'INSERT INTO {FTS_TABLE} (rowid, name, brand, description, model) '
+        f'VALUES (:rowid, :name, :brand, :description, :model)'
+    ), rows)
+
+def _insert_row(connection, product):
+    _insert_rows(connection, _index_values(product))
+
+def ensure_search_index():
+    """FTS5 tablosunu oluşturur, boşsa mevcut ürünlerle doldurur"""
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return False
+
+    try:
+        connection.execute(text(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            f"USING fts5(name, brand, description, model, tokenize='unicode61')"
+        ))
+    except Exception:
+        # SQLite FTS5 olmadan derlenmiş, LIKE aramasına geri dönülür
+        db.session.rollback()
+        _enabled_databases[_database_key(connection)] = False
+        return False
+
+    _enabled_databases[_database_key(connection)] = True
+
+    indexed = connection.execute(text(f'SELECT count(*) FROM {FTS_TABLE}')).scalar()
+    if not indexed and Product.query.count() > 0:
+        rebuild_search_index()
+
+    db.session.commit()
+    return True
+
+def rebuild_search_index():
+    """
+    Arama indeksini tüm ürünlerden tek bir INSERT ... SELECT ile yeniden oluşturur.
+
+    normalize_turkish SQLite fonksiyonu olarak kaydedilir; satırlar Python'a
+    taşınmadığı için milyonlarca üründe de hızlıdır.
+    """
+    connection = db.session.connection()
+    connection.connection.driver_connection.create_function(
+        'normalize_turkish', 1, normalize_turkish, deterministic=True
+    )
+    connection.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    columns = ', '.join(f'normalize_turkish({field})' for field in INDEXED_FIELDS)
+    return connection.execute(text(
+        f'INSERT INTO {FTS_TABLE} (rowid, name, brand, description, model) '
+        f'SELECT id, {columns} FROM {Product.__tablename__}'
+    )).rowcount
+
+def apply_search(query, value):
+    """
+    Ürün sorgusuna arama filtresi uygular.
+
+    FTS5 kullanılabiliyorsa BM25 sırası ile birlikte (sorgu, sıra sütunu),
+    aksi halde LIKE filtresi ve None döndürür.
+    """
+    match = build_match_query(value)
+    if match is None:
+        return query, None
+
+    if not is_enabled():
+        return query.filter(
+            Product.name.contains(value) |
+            Product.description.contains(value) |
+            Product.brand.contains(value)
+        ), None
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    matches = db.text(
+        f'SELECT rowid AS product_id, bm25({FTS_TABLE}, {weights}) AS rank '
+        f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match'
+    ).bindparams(match=match).columns(
+        db.column('product_id', db.Integer),
+        db.column('rank', db.Float)
+    ).subquery('search_matches')
+
+    query = query.join(matches, matches.c.product_id == Product.id)
+    # bm25() daha alakalı sonuçlar için daha küçük değer döndürür
+    return query, matches.c.rank.asc()
+
+@event.listens_for(Product, 'after_insert')
+def _index_inserted_product(mapper, connection, product):
+    if not is_enabled(connection):
+        return
+    # Yeni ürünler flush sonunda tek executemany ile indekslenir
+    session = inspect(product).session
+    if session is None:
+        _insert_row(connection, product)
+    else:
+        session.info.setdefault('search_rows', []).append(_index_values(product))
+
+@event.listens_for(Session, 'after_flush')
+def _index_flushed_products(session, flush_context):
+    rows = session.info.pop('search_rows', None)
+    if rows:
+        _insert_rows(session.connection(), rows)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_search_rows(session):
+    session.info.pop('search_rows', None)
+
+@event.listens_for(Product, 'after_update')
+def _index_updated_product(mapper, connection, product):
+    if not is_enabled(connection):
+        return
+    # Stok ve puan gibi aranmayan alanlardaki değişiklikler indeksi etkilemez
+    state = inspect(product)
+    if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+        _delete_row(connection, product.id)
+        _insert_row(connection, product)
+
+@event.listens_for(Product, 'after_delete')
+def _unindex_deleted_product(mapper, connection, product):
+    if is_enabled(connection):
+        _delete_row(connection, product.id)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Uygulama Başlatma Modülü
+Veritabanı şeması/başlangıç verisi kurulumu ve başlangıç süresi ölçümü
+
+create_app şema ve türetilmiş veri kurulumunu yalnızca veritabanı bu kodun
+şemasıyla henüz kurulmamışsa yapar: kurulum sonunda model şemasının özeti
+SQLite'ın PRAGMA user_version alanına yazılır, sonraki başlatmalar tek bir
+sorguyla yansıtma (reflection) ve sayım sorgularını atlar.
+DATABASE_AUTO_INIT=0 (sunucu kipi) ile create_app hiç veritabanı erişimi
+yapmaz; şema önceden `flask init-db` ile kurulur.
+"""
+
+import time
+import zlib
+from contextlib import contextmanager
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from app import db
+
+# Modellere yansımayan kurulum değişikliklerinde (ör. FTS tanımı) artırılır
+SCHEMA_REVISION = 1
+
+class StartupTimer:
+    """create_app aşamalarının sürelerini (ms) sırasıyla kaydeder"""
+
+    def __init__(self, import_ms=0.0):
+        self.import_ms = import_ms
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started) * 1000))
+
+    @property
+    def total_ms(self):
+        return sum(ms for _, ms in self.phases)
+
+    def as_dict(self):
+        """JSON'a uygun özet"""
+        return {
+            'import_ms': round(self.import_ms, 2),
+            'phases': {name: round(ms, 2) for name, ms in self.phases},
+            'total_ms': round(self.total_ms, 2)
+        }
+
+def schema_fingerprint():
+    """Model şemasının (tablo, sütun, indeks) 31 bitlik, sıfır olmayan özeti"""
+    parts = [f'revision:{SCHEMA_REVISION}']
+    for table in db.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f'{column.name}:{column.type!r}:{column.nullable}' for column in table.columns)
+        parts.extend(f'{index.name}:{[column.name for column in index.columns]}'
+                     for index in sorted(table.indexes, key=lambda index: index.name))
+    return zlib.crc32('\n'.join(parts).encode('utf-8')) & 0x7FFFFFFF or 1
+
+def _schema_objects():
+    """Modellerde tanımlı tablo ve indeks adları"""
+    names = []
+    for table in db.metadata.sorted_tables:
+        names.append(table.name)
+        names.extend(index.name for index in table.indexes)
+    return names
+
+def schema_is_current():
+    """
+    Veritabanı bu kodun şemasıyla kurulmuşsa True (yalnızca SQLite izlenir).
+
+    Damga ile birlikte tüm tablo ve indekslerin varlığına da tek sorguda
+    bakılır; drop_all sonrası kalan eski damga kurulumu atlatmaz.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return False
+    names = _schema_objects()
+    placeholders = ', '.join(f':name{position}' for position in range(len(names)))
+    stamp, present = connection.execute(text(
+        'SELECT (SELECT user_version FROM pragma_user_version), '
+        f'(SELECT count(*) FROM sqlite_master WHERE name IN ({placeholders}))'
+    ), {f'name{position}': name for position, name in enumerate(names)}).one()
+    db.session.commit()
+    return stamp == schema_fingerprint() and present == len(names)
+
+def add_missing_columns():
+    """
+    Mevcut tablolara modellerde sonradan tanımlanan boş bırakılabilir sütunları ekler.
+
+    create_all var olan tabloları değiştirmez; eklenen sütunların adlarını döndürür.
+    """
+    connection = db.session.connection()
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+def init_database(force=False, seed=True):
+    """
+    Şemayı, eksik indeksleri ve türetilmiş verileri kurar; isteğe bağlı başlangıç verisi ekler.
+
+    Veritabanı güncel şemayla kurulmuşsa (force verilmedikçe) hiçbir şey
+    yapmaz ve False döndürür.
+    """
+    if not force and schema_is_current():
+        return False
+
+    db.create_all()
+
+    # Mevcut tablolara yeni sütunları ekle
+    add_missing_columns()
+    db.session.commit()
+
+    # Mevcut veritabanlarına eksik indeksleri ekle
+    from utils.indexes import ensure_indexes
+    ensure_indexes()
+
+    # Ürün arama indeksini hazırla
+    from utils.search import ensure_search_index
+    ensure_search_index()
+
+    # Eksik ürün puan özetlerini oluştur
+    from utils.ratings import ensure_rating_stats
+    ensure_rating_stats()
+
+    # Eski iptal durumlarını düzelt (gerekirse panel sayaçları yeniden hesaplanır)
+    from utils.order_status import normalize_order_statuses
+    normalize_order_statuses()
+    
+    # Panel sayaçlarını hazırla
+    from utils.dashboard import ensure_dashboard_stats
+    ensure_dashboard_stats()
+
+    # Eksik sepet özetlerini oluştur
+    from models.order import CartSummary
+    CartSummary.rebuild_missing()
+
+    if seed:
+        from utils.sample_data import create_sample_data
+        create_sample_data()
+
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f'PRAGMA user_version = {schema_fingerprint()}'))
+    db.session.commit()
+    return True
+
+@click.command('init-db')
+@click.option('--seed/--no-seed', default=True, help='Kategorileri ve admin kullanıcısını ekle')
+@with_appcontext
+def init_db_command(seed):
+    """Şemayı, indeksleri ve türetilmiş verileri kurar (sunucu kipinden önce bir kez çalıştırın)"""
+    init_database(force=True, seed=seed)
+    click.echo('Veritabanı hazır.')
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Kategorileri ve admin kullanıcısını ekler (zaten varsa bir şey yapmaz)"""
+    from utils.sample_data import create_sample_data
+    create_sample_data()
+
+@click.command('startup-report')
+@with_appcontext
+def startup_report_command():
+    """Bu süreçte uygulamanın başlatılma aşamalarının sürelerini gösterir"""
+    timer = current_app.extensions['startup_timer']
+    click.echo(f'{"modül içe aktarma":<24} {timer.import_ms:8.1f} ms')
+    for name, ms in timer.phases:
+        click.echo(f'{name:<24} {ms:8.1f} ms')
+    click.echo(f'{"create_app toplam":<24} {timer.total_ms:8.1f} ms')
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arama Önerisi (Typeahead) Modülü
+Ürün adları, markalar ve kategoriler üzerinde süreç içi önek indeksi
+
+Her öneri metni Türkçe normalleştirilir (utils.search.normalize_turkish) ve
+her kelimesinden başlayan sonekleri anahtar olarak sıralı bir diziye eklenir;
+önek araması bisect ile anahtar aralığını bulur ve aralıktaki önerilerden
+popülerliği (1 + yorum sayısı + satış adedi; marka ve kategoride ürünlerinin toplamı) en
+yüksek olanları döndürür. Çok geniş aralıklar (ör. tek harf) için ilk sonuçlar
+önekle birlikte saklanır ve yalnızca o öneke düşen bir değişiklikte silinir.
+
+İndeks uygulama başlarken (sunucu kipinde ilk istekte) en popüler ürünlerden
+başlanarak bellek bütçesi (SUGGEST_MEMORY_MB) dolana kadar kurulur. Ürün ve
+kategori yazmaları ile puan güncellemeleri commit sonrasında ilgili satırlar
+yeniden okunarak indekse uygulanır; bütçe doluysa yeni ürünler eklenmez.
+"""
+
+import heapq
+import sys
+import threading
+from bisect import bisect_left
+from operator import itemgetter
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from models.product import Product, Category
+from utils.search import tokenize
+
+# Bir öneri için anahtar üretilen en fazla kelime ve anahtar uzunluğu
+MAX_KEY_TOKENS = 6
+MAX_KEY_LENGTH = 48
+
+# Bu sayıdan fazla anahtar eşleşen önekler için ilk MAX_SUGGESTIONS sonuç saklanır
+SCAN_LIMIT = 2000
+MAX_SUGGESTIONS = 20
+
+# Ürün satırları yüklenirken kullanılan grup boyutu
+LOAD_CHUNK_SIZE = 5000
+
+# Yeniden okunacak ürünlerin tutulduğu oturum anahtarı
+_SESSION_KEY = 'suggestion_refresh'
+
+# Değişmesi öneriyi etkileyen ürün alanları
+_SUGGESTION_FIELDS = ('name', 'brand', 'category_id', 'is_active', 'review_count', 'sales_count')
+
+# Ağırlık dışında bir öneri kaydı ve her anahtar için tahmini sabit bellek (bayt)
+_ENTRY_OVERHEAD = 400
+_KEY_OVERHEAD = 16
+
+class Suggestion:
+    """İndeksteki tek öneri (ürün, marka veya kategori)"""
+
+    __slots__ = ('kind', 'target', 'text', 'weight', 'keys')
+
+    def __init__(self, kind, target, text, weight, keys):
+        self.kind = kind
+        self.target = target
+        self.text = text
+        self.weight = weight
+        self.keys = keys
+
+    def as_dict(self):
+        return {'type': self.kind, 'text': self.text, 'id': self.target}
+
+def suggestion_keys(text):
+    """Metnin her kelimesinden başlayan normalleştirilmiş anahtarlar"""
+    tokens = tokenize(text)
+    return tuple(dict.fromkeys(' '.join(tokens[start:])[:MAX_KEY_LENGTH]
+                               for start in range(min(len(tokens), MAX_KEY_TOKENS))))
+
+def query_prefix(value):
+    """Kullanıcının yazdığı metinden aranacak normalleştirilmiş önek"""
+    prefix = ' '.join(tokenize(value))
+    if prefix and value[-1:].isspace():
+        # Tamamlanmış son kelime: yalnızca sonraki kelimesi de olan anahtarlar
+        prefix += ' '
+    return prefix[:MAX_KEY_LENGTH]
+
+def popularity(review_count, sales_count=0):
+    return 1 + (review_count or 0) + (sales_count or 0)
+
+class SuggestionIndex:
+    """Sıralı anahtar dizisi (bisect) üzerinde ağırlıklı önek indeksi"""
+
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        self.memory = 0
+        self.truncated = False
+        self.building = False
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._backlog = []
+        self._bulk = None
+        self._keys = []
+        self._owners = []
+        self._entries = {}
+        self._products = {}
+        self._top = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def built(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Kurulumun bitmesini bekler; kurulduysa True"""
+        return self._ready.wait(timeout)
+
+    # --- Kurulum ---
+
+    def start(self, app):
+        """İndeksi arka plan iş parçacığında kurar (kuruluyorsa veya kurulduysa bir şey yapmaz)"""
+        with self._lock:
+            if self.building or self.built:
+                return
+            self.building = True
+        threading.Thread(target=self._build_in_background, args=(app,),
+                         name='suggestions', daemon=True).start()
+
+    def _build_in_background(self, app):
+        try:
+            with app.app_context(), db.engine.connect() as connection:
+                self.build(connection)
+        except Exception:
+            app.logger.exception('Arama önerisi indeksi kurulamadı')
+            with self._lock:
+                self.building = False
+                self._backlog = []
+
+    def build(self, connection):
+        """
+        İndeksi veritabanından baştan kurar.
+
+        Okuma kilit dışında yeni bir indekse yapılır, sorgular eski indeksle
+        sürer; bu sırada commit edilen değişiklikler biriktirilip değiş
+        tokuştan sonra uygulanır.
+        """
+        with self._lock:
+            self.building = True
+        fresh = SuggestionIndex(self.memory_budget)
+        fresh._load(connection)
+        with self._lock:
+            for name in ('memory', 'truncated', '_keys', '_owners', '_entries', '_products'):
+                setattr(self, name, getattr(fresh, name))
+            self._top = {}
+            backlog, self._backlog = self._backlog, []
+            for rows, missing in backlog:
+                if rows is None:
+                    self._load_categories(connection)
+                else:
+                    self._apply(rows, missing)
+            self.building = False
+            self._ready.set()
+
+    def _load(self, connection):
+        # Anahtarlar önce toplanıp tek seferde sıralanır (tek tek insort karesel olurdu)
+        self._bulk = []
+        self._load_categories(connection)
+        rows = connection.execute(
+            select(Product.id, Product.name, Product.brand, Product.category_id,
+                   Product.review_count, Product.sales_count)
+            .where(Product.is_active == True)
+            .order_by((func.coalesce(Product.review_count, 0)
+                       + func.coalesce(Product.sales_count, 0)).desc(), Product.id)
+            .execution_options(yield_per=LOAD_CHUNK_SIZE)
+        )
+        for row in rows:
+            if not self._add_product(*row):
+                self.truncated = True
+                break
+        rows.close()
+        self._bulk.sort(key=itemgetter(0))
+        self._keys = [key for key, _ in self._bulk]
+        self._owners = [owner for _, owner in self._bulk]
+        self._bulk = None
+
+    def _load_categories(self, connection):
+        """Aktif kategorileri indekse ekler, pasifleri çıkarır (ürün ağırlıkları korunur)"""
+        weights = {}
+        for product_id, (_, category_id, weight) in self._products.items():
+            weights[category_id] = weights.get(category_id, 0) + weight
+        for owner in [owner for owner in self._entries if owner[0] == 'category']:
+            self._remove(owner)
+        for category_id, name in connection.execute(
+                select(Category.id, Category.name).where(Category.is_active == True)):
+            self._insert(('category', category_id), name, 1 + weights.get(category_id, 0))
+
+    # --- Anahtar dizisi ---
+
+    def _insert(self, owner, text, weight):
+        keys = suggestion_keys(text)
+        if not keys:
+            return
+        self._entries[owner] = Suggestion(owner[0], owner[1], text, weight, keys)
+        self.memory += _ENTRY_OVERHEAD + sys.getsizeof(text)
+        if self._bulk is not None:
+            self._bulk.extend((key, owner) for key in keys)
+            self.memory += sum(_KEY_OVERHEAD + sys.getsizeof(key) for key in keys)
+            return
+        for key in keys:
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._owners.insert(position, owner)
+            self.memory += _KEY_OVERHEAD + sys.getsizeof(key)
+        self._forget_top(keys)
+
+    def _remove(self, owner):
+        entry = self._entries.pop(owner, None)
+        if entry is None:
+            return
+        self.memory -= _ENTRY_OVERHEAD + sys.getsizeof(entry.text)
+        for key in entry.keys:
+            position = bisect_left(self._keys, key)
+            while self._owners[position] != owner:
+                position += 1
+            del self._keys[position]
+            del self._owners[position]
+            self.memory -= _KEY_OVERHEAD + sys.getsizeof(key)
+        self._forget_top(entry.keys)
+
+    def _reweight(self, owner, delta):
+        entry = self._entries.get(owner)
+        if entry is not None and delta:
+            entry.weight += delta
+            self._forget_top(entry.keys)
+
+    def _forget_top(self, keys):
+        """Değişen anahtarları kapsayan öneklerin saklanan sonuçlarını siler"""
+        if self._top:
+            for prefix in [prefix for prefix in self._top if any(key.startswith(prefix) for key in keys)]:
+                del self._top[prefix]
+
+    # --- Ürünler ---
+
+    def _add_product(self, product_id, name, brand, category_id, review_count, sales_count):
+        """Ürünü ve marka/kategori katkısını ekler; bellek bütçesi doluysa False"""
+        if self.memory >= self.memory_budget:
+            return False
+        weight = popularity(review_count, sales_count)
+        self._insert(('product', product_id), name, weight)
+        brand_key = ' '.join(tokenize(brand)) or None
+        self._products[product_id] = (brand_key, category_id, weight)
+        if brand_key:
+            owner = ('brand', brand_key)
+            if owner in self._entries:
+                self._reweight(owner, weight)
+            else:
+                self._insert(owner, brand, weight)
+        self._reweight(('category', category_id), weight)
+        return True
+
+    def _remove_product(self, product_id):
+        known = self._products.pop(product_id, None)
+        if known is None:
+            return
+        brand_key, category_id, weight = known
+        self._remove(('product', product_id))
+        if brand_key:
+            owner = ('brand', brand_key)
+            entry = self._entries.get(owner)
+            if entry is not None and entry.weight <= weight:
+                self._remove(owner)
+            else:
+                self._reweight(owner, -weight)
+        self._reweight(('category', category_id), -weight)
+
+    def apply(self, rows, missing=()):
+        """
+        Yeniden okunan ürün satırlarını uygular.
+
+        rows (id, ad, marka, kategori, yorum sayısı, satış adedi, aktif mi) satırları,
+        missing silinmiş ürün id'leridir.
+        """
+        with self._lock:
+            if self.building:
+                self._backlog.append((rows, missing))
+            if self.built:
+                self._apply(rows, missing)
+
+    def _apply(self, rows, missing):
+        for product_id in missing:
+            self._remove_product(product_id)
+        for product_id, name, brand, category_id, review_count, sales_count, is_active in rows:
+            entry = self._entries.get(('product', product_id))
+            known = self._products.get(product_id)
+            if (is_active and entry is not None and entry.text == name
+                    and known[:2] == (' '.join(tokenize(brand)) or None, category_id)):
+                # Yalnızca popülerlik değişti: anahtarlar yerinde kalır
+                delta = popularity(review_count, sales_count) - known[2]
+                self._products[product_id] = known[:2] + (known[2] + delta,)
+                self._reweight(('product', product_id), delta)
+                if known[0]:
+                    self._reweight(('brand', known[0]), delta)
+                self._reweight(('category', category_id), delta)
+                continue
+            self._remove_product(product_id)
+            if is_active and not self._add_product(product_id, name, brand, category_id,
+                                                   review_count, sales_count):
+                self.truncated = True
+
+    def reload_categories(self, connection):
+        with self._lock:
+            if self.building:
+                self._backlog.append((None, None))
+            if self.built:
+                self._load_categories(connection)
+
+    # --- Sorgu ---
+
+    def _rank(self, low, high, limit):
+        owners = set(self._owners[low:high])
+        entries = self._entries
+        return heapq.nsmallest(limit, owners,
+                               key=lambda owner: (-entries[owner].weight, entries[owner].text))
+
+    def suggest(self, value, limit=8):
+        """Yazılan metinle başlayan en popüler öneriler"""
+        prefix = query_prefix(value)
+        if not prefix:
+            return []
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        with self._lock:
+            low = bisect_left(self._keys, prefix)
+            high = bisect_left(self._keys, prefix + '\uffff', low)
+            if high - low > SCAN_LIMIT:
+                ranked = self._top.get(prefix)
+                if ranked is None:
+                    ranked = self._top[prefix] = self._rank(low, high, MAX_SUGGESTIONS)
+            else:
+                ranked = self._rank(low, high, limit)
+            return [self._entries[owner].as_dict() for owner in ranked[:limit]]
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'keys': len(self._keys),
+            'memory_bytes': self.memory,
+            'memory_budget': self.memory_budget,
+            'truncated': self.truncated,
+            'cached_prefixes': len(self._top),
+        }
+
+def init_suggestions(app, build=True):
+    """
+    Uygulamanın öneri indeksini oluşturur; build=True ise arka planda kurmaya başlar.
+
+    Sunucu kipinde (çatallanan çalışan süreçler iş parçacığını devralmaz)
+    kurulum ilk get_suggestion_index çağrısında başlar. Kurulum bitene
+    kadar öneri listesi boş döner.
+    """
+    index = SuggestionIndex(app.config['SUGGEST_MEMORY_MB'] * 1024 * 1024)
+    app.extensions['suggestion_index'] = index
+    if build:
+        index.start(app)
+    return index
+
+def get_suggestion_index():
+    """Geçerli uygulamanın öneri indeksi; kurulmadıysa kurulumu başlatır"""
+    index = current_app.extensions['suggestion_index']
+    if not index.built:
+        index.start(current_app._get_current_object())
+    return index
+
+def refresh_suggestions(product_ids, session=None):
+    """Ürünleri commit sonrasında indekste yenilenmek üzere işaretler"""
+    session = session or db.session()
+    session.info.setdefault(_SESSION_KEY, set()).update(product_ids)
+
+@event.listens_for(Product, 'after_insert')
+@event.listens_for(Product, 'after_delete')
+def _product_written(mapper, connection, product):
+    refresh_suggestions([product.id], inspect(product).session)
+
+@event.listens_for(Product, 'after_update')
+def _product_changed(mapper, connection, product):
+    state = inspect(product)
+    # Stok ve fiyat gibi önerilerde görünmeyen alanlar indeksi etkilemez
+    if any(state.attrs[field].history.has_changes() for field in _SUGGESTION_FIELDS):
+        refresh_suggestions([product.id], state.session)
+
+@event.listens_for(Category, 'after_insert')
+@event.listens_for(Category, 'after_update')
+@event.listens_for(Category, 'after_delete')
+def _category_written(mapper, connection, category):
+    refresh_suggestions(['categories'], inspect(category).session)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_refresh(session):
+    pending = session.info.pop(_SESSION_KEY, None)
+    if not pending or not has_app_context():
+        return
+    index = current_app.extensions.get('suggestion_index')
+    if index is None or not (index.built or index.building):
+        return
+
+    product_ids = sorted(item for item in pending if item != 'categories')
+    # Commit tamamlandı; oturum bu kancada SQL çalıştıramadığı için ayrı bağlantı kullanılır
+    with db.engine.connect() as connection:
+        if 'categories' in pending:
+            index.reload_categories(connection)
+        for start in range(0, len(product_ids), LOAD_CHUNK_SIZE):
+            chunk = product_ids[start:start + LOAD_CHUNK_SIZE]
+            rows = connection.execute(
+                select(Product.id, Product.name, Product.brand, Product.category_id,
+                       Product.review_count, Product.sales_count, Product.is_active)
+                .where(Product.id.in_(chunk))
+            ).all()
+            found = {row[0] for row in rows}
+            index.apply(rows, [product_id for product_id in chunk if product_id not in found])
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_refresh(session):
+    session.info.pop(_SESSION_KEY, None)